@@ -3,7 +3,7 @@ import os
 import sys
 import time
 import base64
-from datetime import datetime
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
 # --- MANDATORY LOCKDOWN: REDIRECT ALL OPENAI CALLS ---
@@ -13,20 +13,27 @@ os.environ["OTEL_SDK_DISABLED"] = "true"
 os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
 # ---------------------------------------------------
 
-from src.crew.research_crew import ResearchCrew
+from src.crew.checkpoint import STAGES, RunCheckpoints, list_checkpointed_runs, find_latest_report_run
+from src.crew.profiles import load_profiles, get_profile, DEFAULT_PROFILE
+from src.jobs import start_workers, submit_job, get_job, job_assets, job_events
 from src.llm.multi_provider import MultiProviderLLM
+from src.llm.router import get_router
+from src.llm.circuit_breaker import breaker_states
 from src.translation import get_supported_languages
-from src.database import get_all_research, get_research_by_id, delete_research_record
+from src.database import get_all_research, get_research_by_id, delete_research_record, get_llm_calls
+from src.llm.telemetry import summarize_calls, llm_context
+from src.utils.tracing import span, flush_trace, list_traces, load_trace, summarize_trace, trace_path
 from src.audio.stt import speech_to_text  
 from fpdf import FPDF
 from gtts import gTTS
 
-# ✅ NEW IMPORT: The Safe Media Factory
-from src.utils.media_factory import generate_multilingual_assets
-
 # Load environment variables
 load_dotenv()
 
+# Background research workers (started once per server process)
+start_workers()
+JOB_POLL_SECONDS = 2
+
 # Page config
 st.set_page_config(
     page_title="AutoResearch Crew Pro",
@@ -74,6 +81,97 @@ def generate_audio(text, lang='en'):
         st.error(f"TTS Error: {str(e)}")
         return None
 
+# --- RESULT RENDERING (shared by live jobs and resumed runs) ---
+def render_research_results(report_path, multilingual_data, export_pdf=True, run_id=None, assets_skipped=False):
+    tab1, tab2, tab3 = st.tabs(["📝 English Report", "📄 PDF Preview", "🌍 Multilingual Hub"])
+
+    # TAB 1: Main English Markdown
+    with tab1:
+        if os.path.exists(report_path):
+            with open(report_path, 'r', encoding='utf-8') as f:
+                report_content = f.read()
+            st.markdown(report_content)
+            st.download_button("📥 Download Markdown", report_content, file_name=os.path.basename(report_path))
+        else:
+            st.error("Report file missing.")
+
+    # TAB 2: English PDF Preview
+    with tab2:
+        if export_pdf and os.path.exists(report_path):
+            pdf_path = report_path.replace(".md", ".pdf")
+            # Generate PDF using the FPDF function (good for English)
+            if not os.path.exists(pdf_path):
+                with st.spinner("Generating professional PDF..."):
+                    with open(report_path, 'r', encoding='utf-8') as f:
+                        content_for_pdf = f.read()
+                    with llm_context(run_id=run_id), span("pdf", "media"):
+                        generate_pdf(content_for_pdf, pdf_path)
+                    if run_id:
+                        flush_trace(run_id)
+            
+            if os.path.exists(pdf_path):
+                display_pdf_preview(pdf_path)
+                with open(pdf_path, "rb") as f:
+                    st.download_button("📥 Download Full PDF Report", f, file_name=os.path.basename(pdf_path), mime="application/pdf")
+            else:
+                st.warning("PDF generation failed.")
+        else:
+            st.info("PDF generation disabled or source file missing.")
+
+    # TAB 3: THE NEW ROBUST AUDIO & TRANSLATION HUB
+    with tab3:
+        if multilingual_data:
+            st.write("### 🌐 Select Language")
+            
+            # 1. Language Selector
+            selected_lang_key = st.selectbox("Choose a language:", list(multilingual_data.keys()))
+            
+            # 2. Get Data Safe Check
+            lang_data = multilingual_data.get(selected_lang_key)
+            
+            if lang_data:
+                col1, col2 = st.columns([1, 1])
+                
+                # --- Audio Section ---
+                with col1:
+                    st.subheader("🎧 Audio Summary")
+                    if lang_data.get('audio_path') and os.path.exists(lang_data['audio_path']):
+                        st.audio(lang_data['audio_path'])
+                        with open(lang_data['audio_path'], "rb") as audio_file:
+                            st.download_button(
+                                label=f"⬇️ Download Audio ({selected_lang_key})",
+                                data=audio_file,
+                                file_name=f"Audio_{selected_lang_key}.mp3",
+                                mime="audio/mp3"
+                            )
+                    else:
+                        st.info("Audio generation skipped for this language.")
+
+                # --- Report Section (Replaces PDF for complex languages) ---
+                with col2:
+                    st.subheader("📄 Translated Report")
+                    if os.path.exists(lang_data['report_path']):
+                        st.success(f"Translation ready.")
+                        with open(lang_data['report_path'], "rb") as report_file:
+                            st.download_button(
+                                label=f"⬇️ Download Report ({selected_lang_key})",
+                                data=report_file,
+                                file_name=f"Report_{selected_lang_key}.md",
+                                mime="text/markdown"
+                            )
+                    else:
+                         st.warning("Translation file unavailable.")
+
+                # --- Text Preview ---
+                st.divider()
+                st.caption(f"Text Preview ({selected_lang_key}):")
+                st.text_area(label="Generated Report", value=lang_data['text'], height=300)
+            
+        elif assets_skipped:
+            st.info("⚡ This run's profile skips translation and audio. Pick 'standard' or 'deep' to generate them.")
+        else:
+            st.warning("Multilingual assets could not be generated. Please check your internet connection.")
+
 # --- CUSTOM 2025 MODERN CSS ---
 st.markdown("""
     <style>
@@ -101,7 +199,7 @@ with st.sidebar:
     else: st.error(f"❌ Missing: {', '.join(missing_keys)}")
 
     st.divider()
-    page = st.radio("📑 Navigation", ["🔍 New Research", "📚 Research History", "🎤 Voice Input", "⚙️ Settings"])
+    page = st.radio("📑 Navigation", ["🔍 New Research", "📚 Research History", "📈 LLM Telemetry", "🧭 Run Traces", "🎤 Voice Input", "⚙️ Settings"])
     
     st.divider()
     
@@ -109,17 +207,27 @@ with st.sidebar:
     st.header("🤖 LLM Provider Status")
     llm_manager = MultiProviderLLM()
     active_providers = llm_manager.providers_available 
+    router_stats = get_router().snapshot()
 
     if active_providers:
         st.success(f"✅ {len(active_providers)} provider(s) active")
         for p_id in active_providers:
             p_data = llm_manager.PROVIDERS.get(p_id, {"name": p_id.title(), "priority": 0})
+            p_stats = router_stats.get(p_id)
             with st.expander(f"🔹 {p_data['name']}"):
                 st.write(f"**Priority:** Level {p_data['priority']}")
-                st.write(f"**Status:** Online")
+                st.write(f"**Status:** {'Cooling down' if p_stats and p_stats['cooling_down'] else 'Online'}")
+                if p_stats and p_stats['samples']:
+                    st.write(f"**Latency:** {p_stats['ewma_latency']:.2f}s avg • {p_stats['p95_latency']:.2f}s p95")
+                    st.write(f"**Error Rate:** {p_stats['error_rate']:.0%}")
     else:
         st.error("❌ No LLM providers found.")
 
+    # --- CIRCUIT BREAKERS (only those that have seen traffic) ---
+    open_breakers = {name: state for name, state in breaker_states().items() if state['state'] != 'closed'}
+    for name, state in open_breakers.items():
+        st.warning(f"🔌 {name}: circuit {state['state'].replace('_', '-')} ({state['open_for']:.0f}s left)")
+
 # --- MAIN CONTENT ---
 if page == "🔍 New Research":
     col1, col2 = st.columns([2, 1])
@@ -152,128 +260,64 @@ if page == "🔍 New Research":
         supported_display = {k: v for k, v in all_languages.items() if k in supported_codes}
         
         selected_language = st.selectbox("🌍 Language", options=list(supported_display.keys()), format_func=lambda x: supported_display[x])
+        profiles = load_profiles()
+        profile_names = list(profiles)
+        selected_profile = st.selectbox(
+            "⚡ Depth", options=profile_names,
+            index=profile_names.index(DEFAULT_PROFILE) if DEFAULT_PROFILE in profile_names else 0,
+            format_func=lambda name: name.title()
+        )
+        st.caption(profiles[selected_profile].description)
         st.subheader("📤 Exports")
-        export_pdf = st.checkbox("Generate PDF Report", value=True)
-        export_audio = st.checkbox("Generate Voice Summary", value=True)
+        export_pdf = st.checkbox("Generate PDF Report", value=profiles[selected_profile].pdf, key=f"pdf_{selected_profile}")
+        export_audio = st.checkbox("Generate Voice Summary", value=profiles[selected_profile].audio, key=f"audio_{selected_profile}")
+        refresh_mode = st.checkbox("🔁 Refresh last report on this topic", value=False,
+                                   help="Only searches content newer than the last run and patches the changed sections.")
 
     st.divider()
 
-    # --- EXECUTION LOGIC ---
+    # --- EXECUTION LOGIC (runs in a background worker; this script only submits and polls) ---
     if st.button("🚀 Start Nuclear Research", type="primary"):
         if not topic:
             st.error("Please provide a topic first.")
         else:
             st.session_state.research_topic = topic
-            
-            try:
-                # Use standard Status Spinner (Thread-Safe)
-                with st.status("🤖 Agents are working...", expanded=True) as status:
-                    st.write("🔄 Initializing Specialist Agents...")
-                    st.write("📡 Connecting to Knowledge Base...")
-                    
-                    crew_engine = ResearchCrew(topic=topic, language=selected_language, show_logs=True)
-                    results = crew_engine.run()
-                    
-                    status.update(label="✅ All Agents Finished!", state="complete", expanded=False)
-
-                if results and 'report_path' in results:
-                    st.success("✅ Research Completed Successfully!")
-                    
-                    # --- NEW: GENERATE MULTILINGUAL ASSETS (TEXT + AUDIO) ---
-                    # This runs the new robust factory that does not depend on OpenAI
-                    with st.spinner("🎧 Generating Multilingual Audio & Reports (En, Hi, Ar, Es, Fr)..."):
-                        multilingual_data = generate_multilingual_assets(results['report_path'])
-
-                    # --- OUTPUT TABS ---
-                    # We renamed the third tab to reflect its new powers
-                    tab1, tab2, tab3 = st.tabs(["📝 English Report", "📄 PDF Preview", "🌍 Multilingual Hub"])
-
-                    # TAB 1: Main English Markdown
-                    with tab1:
-                        if os.path.exists(results['report_path']):
-                            with open(results['report_path'], 'r', encoding='utf-8') as f:
-                                report_content = f.read()
-                            st.markdown(report_content)
-                            st.download_button("📥 Download Markdown", report_content, file_name=os.path.basename(results['report_path']))
-                        else:
-                            st.error("Report file missing.")
-
-                    # TAB 2: English PDF Preview
-                    with tab2:
-                        if export_pdf and os.path.exists(results['report_path']):
-                            pdf_path = results['report_path'].replace(".md", ".pdf")
-                            # Generate PDF using the FPDF function (good for English)
-                            if not os.path.exists(pdf_path):
-                                with st.spinner("Generating professional PDF..."):
-                                    with open(results['report_path'], 'r', encoding='utf-8') as f:
-                                        content_for_pdf = f.read()
-                                    generate_pdf(content_for_pdf, pdf_path)
-                            
-                            if os.path.exists(pdf_path):
-                                display_pdf_preview(pdf_path)
-                                with open(pdf_path, "rb") as f:
-                                    st.download_button("📥 Download Full PDF Report", f, file_name=os.path.basename(pdf_path), mime="application/pdf")
-                            else:
-                                st.warning("PDF generation failed.")
-                        else:
-                            st.info("PDF generation disabled or source file missing.")
-
-                    # TAB 3: THE NEW ROBUST AUDIO & TRANSLATION HUB
-                    with tab3:
-                        if multilingual_data:
-                            st.write("### 🌐 Select Language")
-                            
-                            # 1. Language Selector
-                            selected_lang_key = st.selectbox("Choose a language:", list(multilingual_data.keys()))
-                            
-                            # 2. Get Data Safe Check
-                            lang_data = multilingual_data.get(selected_lang_key)
-                            
-                            if lang_data:
-                                col1, col2 = st.columns([1, 1])
-                                
-                                # --- Audio Section ---
-                                with col1:
-                                    st.subheader("🎧 Audio Summary")
-                                    if os.path.exists(lang_data['audio_path']):
-                                        st.audio(lang_data['audio_path'])
-                                        with open(lang_data['audio_path'], "rb") as audio_file:
-                                            st.download_button(
-                                                label=f"⬇️ Download Audio ({selected_lang_key})",
-                                                data=audio_file,
-                                                file_name=f"Audio_{selected_lang_key}.mp3",
-                                                mime="audio/mp3"
-                                            )
-                                    else:
-                                        st.info("Audio generation skipped for this language.")
-
-                                # --- Report Section (Replaces PDF for complex languages) ---
-                                with col2:
-                                    st.subheader("📄 Translated Report")
-                                    if os.path.exists(lang_data['report_path']):
-                                        st.success(f"Translation ready.")
-                                        with open(lang_data['report_path'], "rb") as report_file:
-                                            st.download_button(
-                                                label=f"⬇️ Download Report ({selected_lang_key})",
-                                                data=report_file,
-                                                file_name=f"Report_{selected_lang_key}.md",
-                                                mime="text/markdown"
-                                            )
-                                    else:
-                                         st.warning("Translation file unavailable.")
-
-                                # --- Text Preview ---
-                                st.divider()
-                                st.caption(f"Text Preview ({selected_lang_key}):")
-                                st.text_area(label="Generated Report", value=lang_data['text'], height=300)
-                            
-                        else:
-                            st.warning("Multilingual assets could not be generated. Please check your internet connection.")
-                else:
-                    st.error("Crew failed to produce a final report.")
-            
-            except Exception as e:
-                st.error(f"❌ Execution Stopped: {str(e)}")
+            st.session_state.export_pdf = export_pdf
+            previous_run = find_latest_report_run(topic, selected_language) if refresh_mode else None
+            if refresh_mode and previous_run is None:
+                st.info("No previous report on this topic in this language yet - running full research.")
+            job_id = submit_job(topic, selected_language, refresh_of=previous_run, profile=selected_profile,
+                                audio=export_audio)
+            # Kept in the URL too, so a browser refresh picks the job back up
+            st.session_state.active_job_id = job_id
+            st.query_params["job"] = str(job_id)
+
+    active_job_id = st.session_state.get("active_job_id") or st.query_params.get("job")
+    if active_job_id:
+        job = get_job(int(active_job_id))
+        if job is None:
+            st.warning(f"Job #{active_job_id} not found.")
+        elif job.status in ('queued', 'running'):
+            status = st.status(
+                f"🤖 Job #{job.id}: {'waiting for a free worker' if job.status == 'queued' else 'agents are working'}...",
+                expanded=True
+            )
+            for event in job_events(job)[-8:]:
+                status.write(event['message'])
+            # The writer streams into the report file, so show it as it grows
+            if job.report_path and os.path.exists(job.report_path):
+                with open(job.report_path, 'r', encoding='utf-8') as f:
+                    st.markdown(f.read() + " ▌")
+            time.sleep(JOB_POLL_SECONDS)
+            st.rerun()
+        elif job.status == 'completed':
+            st.success(f"✅ Research Completed Successfully! (job #{job.id})")
+            render_research_results(job.report_path, job_assets(job), st.session_state.get("export_pdf", True),
+                                    run_id=job.run_id, assets_skipped=not get_profile(job.profile).languages)
+        else:
+            st.error(f"❌ Execution Stopped: {job.error}")
+            if job.run_id:
+                st.info(f"💾 Completed stages were saved. Retry run `{job.run_id}` from 📚 Research History.")
 
 # --- OTHER PAGES ---
 elif page == "📚 Research History":
@@ -296,6 +340,103 @@ elif page == "📚 Research History":
                     with open(record.report_path, 'r', encoding='utf-8') as f:
                         st.text_area("Preview", f.read()[:500] + "...", height=150, key=f"hist_{record.id}")
 
+    # --- CHECKPOINTED RUNS (retry from any stage without re-paying for earlier ones) ---
+    st.subheader("♻️ Checkpointed Runs")
+    checkpointed_runs = list_checkpointed_runs(limit=20)
+    if not checkpointed_runs:
+        st.info("No checkpointed runs yet.")
+    for run in checkpointed_runs:
+        run_id = run['run_id']
+        finished = "report" in run['stages']
+        with st.expander(f"{'✅' if finished else '⚠️'} {run_id} | {run['topic']}"):
+            st.write(f"**Completed stages:** {' → '.join(s for s in STAGES if s in run['stages'])}")
+            missing = [s for s in STAGES if s not in run['stages']]
+            stage = st.selectbox(
+                "Retry from stage", STAGES,
+                index=STAGES.index(missing[0]) if missing else len(STAGES) - 1,
+                key=f"stage_{run_id}"
+            )
+            if st.button("🔁 Retry from stage", key=f"retry_{run_id}"):
+                RunCheckpoints(run_id).reset_from(stage)
+                job_id = submit_job(run['topic'], run['language'] or 'en', run_id=run_id,
+                                    refresh_of=run.get('refresh_of'), profile=run.get('profile'))
+                st.session_state.active_job_id = job_id
+                st.query_params["job"] = str(job_id)
+                st.success(f"♻️ Queued as job #{job_id} - follow its progress on 🔍 New Research.")
+
+elif page == "📈 LLM Telemetry":
+    st.header("📈 LLM Telemetry")
+    window = st.selectbox("Time window", ["Last hour", "Last 24 hours", "Last 7 days", "All time"], index=1)
+    since = {
+        "Last hour": datetime.utcnow() - timedelta(hours=1),
+        "Last 24 hours": datetime.utcnow() - timedelta(days=1),
+        "Last 7 days": datetime.utcnow() - timedelta(days=7),
+        "All time": None
+    }[window]
+
+    calls = get_llm_calls(since=since)
+    if not calls:
+        st.info("No LLM calls recorded in this window yet.")
+    else:
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Calls", len(calls))
+        m2.metric("Errors", sum(1 for c in calls if not c.success))
+        m3.metric("Tokens", f"{sum((c.prompt_tokens or 0) + (c.completion_tokens or 0) for c in calls):,}")
+        m4.metric("Est. Cost", f"${sum(c.cost_usd or 0.0 for c in calls):.4f}")
+
+        st.subheader("⏱️ By Role")
+        st.dataframe(summarize_calls(calls, group_by="role"), use_container_width=True)
+        st.subheader("🤖 By Provider")
+        st.dataframe(summarize_calls(calls, group_by="provider"), use_container_width=True)
+
+        with st.expander("🧾 Recent Calls"):
+            st.dataframe([{
+                "time": c.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+                "run": c.run_id,
+                "role": c.role,
+                "provider": c.provider,
+                "model": c.model,
+                "latency_s": round(c.latency_seconds or 0.0, 2),
+                "ttft_s": round(c.ttft_seconds, 2) if c.ttft_seconds is not None else None,
+                "prompt_tokens": c.prompt_tokens,
+                "completion_tokens": c.completion_tokens,
+                "retries": c.retries,
+                "ok": c.success,
+            } for c in calls[:200]], use_container_width=True)
+
+elif page == "🧭 Run Traces":
+    st.header("🧭 Run Traces")
+    trace_runs = list_traces()
+    if not trace_runs:
+        st.info("No traces yet. Every research run writes one to output/traces/.")
+    else:
+        trace_run = st.selectbox("Run", trace_runs)
+        trace = load_trace(trace_run)
+        spans = [e for e in trace["traceEvents"] if e.get("ph") == "X"]
+        if spans:
+            start = min(e["ts"] for e in spans)
+            end = max(e["ts"] + e["dur"] for e in spans)
+            m1, m2 = st.columns(2)
+            m1.metric("Wall Time", f"{(end - start) / 1_000_000:.1f}s")
+            m2.metric("Spans", len(spans))
+
+            st.subheader("⏱️ Where the time goes")
+            st.dataframe(summarize_trace(trace), use_container_width=True)
+
+            with st.expander("🧾 Timeline"):
+                st.dataframe([{
+                    "start_s": round((e["ts"] - start) / 1_000_000, 2),
+                    "duration_s": round(e["dur"] / 1_000_000, 2),
+                    "span": e["name"],
+                    "category": e["cat"],
+                    "thread": e["tid"],
+                    "attributes": e.get("args", {}),
+                } for e in sorted(spans, key=lambda e: e["ts"])], use_container_width=True)
+
+        with open(trace_path(trace_run), "rb") as f:
+            st.download_button("📥 Download Chrome Trace JSON", f, file_name=f"trace_{trace_run}.json", mime="application/json")
+        st.caption("Open the file in chrome://tracing or https://ui.perfetto.dev for a flame view.")
+
 elif page == "🎤 Voice Input":
     st.header("🎤 Voice Command Center")
     st.info("Record your voice or upload an audio file to auto-fill the search bar.")
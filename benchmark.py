@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end pipeline benchmark for AutoResearch Crew.
+
+Record a cassette once (needs real API keys and network):
+  python benchmark.py record "AI in healthcare" --cassette benchmarks/cassettes/healthcare.json
+
+Replay it with no network, as often as you like:
+  python benchmark.py pipeline --cassette benchmarks/cassettes/healthcare.json --runs 3
+  python benchmark.py pipeline --cassette benchmarks/cassettes/healthcare.json --latency-ms 0
+  python benchmark.py pipeline --cassette benchmarks/cassettes/healthcare.json --latency-scale 0.5 --output bench.json
+
+Compare the HTML text extraction engines over saved pages:
+  python benchmark.py html --fetch https://en.wikipedia.org/wiki/Artificial_intelligence
+  python benchmark.py html --fixtures benchmarks/html --repeat 5 --output html_bench.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import time
+from dotenv import load_dotenv
+
+from src.utils.replay import configure_replay, DEFAULT_CASSETTE
+
+# Keys only need to exist in replay mode: no request ever leaves the process
+_PLACEHOLDER_KEYS = ["GROQ_API_KEY", "TAVILY_API_KEY", "SERPER_API_KEY"]
+
+DEFAULT_HTML_FIXTURES = "benchmarks/html"
+
+
+def _prepare_environment(replaying: bool) -> None:
+    # Every call must reach the cassette, not the local response/page caches
+    os.environ["LLM_CACHE_DISABLED"] = "1"
+    os.environ["PAGE_CACHE_DISABLED"] = "1"
+    # Hedged requests would make the number of provider calls timing-dependent
+    os.environ["LLM_HEDGING"] = "0"
+    os.environ.pop("TRACING_DISABLED", None)
+    if replaying:
+        for key in _PLACEHOLDER_KEYS:
+            if not os.getenv(key):
+                os.environ[key] = "replay"
+
+
+def _stage_rows(run_id: str):
+    """Per-stage wall time and CPU time from the run's trace."""
+    from src.utils.tracing import load_trace
+    rows = {}
+    for event in load_trace(run_id).get("traceEvents", []):
+        if event.get("ph") == "X" and event["name"].startswith("stage:"):
+            stage = event["name"][len("stage:"):]
+            rows[stage] = {
+                "wall_s": event["dur"] / 1_000_000,
+                "cpu_s": event.get("args", {}).get("cpu_s", 0.0),
+            }
+    return rows
+
+
+def run_once(topic: str, language: str, assets: bool, profile=None, cassette=None) -> dict:
+    """One pipeline run. With a replay `cassette`, it is rewound first so every run replays the recorded run."""
+    from src.crew import ResearchCrew
+    from src.utils.tracing import span, flush_trace
+    from src.llm.telemetry import llm_context
+
+    if cassette is not None:
+        cassette.rewind()
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    crew = ResearchCrew(topic=topic, language=language, show_logs=False, profile=profile)
+    results = crew.run()
+    if assets and crew.profile.languages:
+        from src.utils.media_factory import generate_multilingual_assets
+        with llm_context(run_id=crew.run_id), span("multilingual_assets", "media"):
+            generate_multilingual_assets(results['report_path'], languages=crew.profile.languages,
+                                         audio=crew.profile.audio, run_id=crew.run_id)
+        flush_trace(crew.run_id)
+    return {
+        "run_id": crew.run_id,
+        "profile": crew.profile.name,
+        "wall_s": time.perf_counter() - wall_started,
+        "cpu_s": time.process_time() - cpu_started,
+        "stages": _stage_rows(crew.run_id),
+        "replay": cassette.stats() if cassette is not None else None,
+    }
+
+
+def _summarize(runs: list) -> dict:
+    stages = {}
+    for run in runs:
+        for stage, row in run["stages"].items():
+            stages.setdefault(stage, {"wall_s": [], "cpu_s": []})
+            stages[stage]["wall_s"].append(row["wall_s"])
+            stages[stage]["cpu_s"].append(row["cpu_s"])
+    injected_per_run = statistics.mean(r["replay"]["injected_latency_s"] for r in runs)
+    wall = statistics.median(r["wall_s"] for r in runs)
+    return {
+        "runs": len(runs),
+        "wall_s_median": round(wall, 3),
+        "cpu_s_median": round(statistics.median(r["cpu_s"] for r in runs), 3),
+        "injected_latency_s_per_run": round(injected_per_run, 3),
+        "replayed_calls": sum(r["replay"]["calls"] for r in runs),
+        "replay_misses": sum(r["replay"]["misses"] for r in runs),
+        "stages": {
+            stage: {
+                "wall_s_median": round(statistics.median(values["wall_s"]), 3),
+                "cpu_s_median": round(statistics.median(values["cpu_s"]), 3),
+            }
+            for stage, values in stages.items()
+        },
+        "run_ids": [r["run_id"] for r in runs],
+    }
+
+
+def _print_summary(summary: dict) -> None:
+    print("\n" + "=" * 80)
+    print(f"⏱️  Pipeline benchmark ({summary['runs']} run(s), medians)")
+    print("=" * 80)
+    print(f"{'stage':<12}{'wall (s)':>12}{'cpu (s)':>12}")
+    for stage, row in summary["stages"].items():
+        print(f"{stage:<12}{row['wall_s_median']:>12.3f}{row['cpu_s_median']:>12.3f}")
+    print("-" * 36)
+    print(f"{'total':<12}{summary['wall_s_median']:>12.3f}{summary['cpu_s_median']:>12.3f}")
+    print(f"\n📼 Replayed calls: {summary['replayed_calls']}  (misses: {summary['replay_misses']})")
+    print(f"💤 Injected latency per run: {summary['injected_latency_s_per_run']:.3f}s")
+
+
+def cmd_record(args) -> int:
+    _prepare_environment(replaying=False)
+    cassette = configure_replay("record", args.cassette)
+    try:
+        result = run_once(args.topic, args.language, args.assets, args.profile)
+    finally:
+        cassette.save({"topic": args.topic, "language": args.language, "assets": args.assets,
+                       "profile": args.profile})
+    print(f"\n✅ Recorded run {result['run_id']} in {result['wall_s']:.1f}s")
+    return 0
+
+
+def cmd_pipeline(args) -> int:
+    _prepare_environment(replaying=True)
+    cassette = configure_replay("replay", args.cassette, args.latency_ms, args.latency_scale)
+    metadata = cassette.metadata
+    topic = args.topic or metadata.get("topic")
+    if not topic:
+        print("❌ The cassette has no topic recorded; pass --topic.")
+        return 1
+    language = metadata.get("language", "en")
+    assets = args.assets or metadata.get("assets", False)
+    # Replaying a different profile than the recorded one makes calls the cassette never saw
+    profile = args.profile or metadata.get("profile")
+
+    runs = []
+    for i in range(args.runs):
+        print(f"\n▶️  Replay run {i + 1}/{args.runs}: {topic}")
+        runs.append(run_once(topic, language, assets, profile, cassette))
+
+    summary = _summarize(runs)
+    _print_summary(summary)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+    return 0
+
+
+def _fetch_fixtures(urls: list, directory: str) -> None:
+    """Saves the raw HTML of each URL as a fixture (file name derived from the URL)."""
+    from src.utils.http_session import get_session
+    from src.utils.singleflight import normalize_url
+    os.makedirs(directory, exist_ok=True)
+    for url in urls:
+        name = re.sub(r'[^a-z0-9]+', '-', normalize_url(url).split('://', 1)[-1].lower()).strip('-')[:80]
+        try:
+            response = get_session().get(url, timeout=20)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"⚠️ Could not fetch {url}: {e}")
+            continue
+        path = os.path.join(directory, f"{name}.html")
+        with open(path, "wb") as f:
+            f.write(response.content)
+        print(f"💾 {url} → {path} ({len(response.content) / 1024:.0f} KB)")
+
+
+def _bench_engine(extract, fixtures: list, repeat: int) -> dict:
+    """Median wall time per page (over `repeat` runs), CPU time and output size of one engine."""
+    page_times, output_chars = [], {}
+    cpu_started = time.process_time()
+    for name, html in fixtures:
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            text = extract(html)
+            times.append(time.perf_counter() - started)
+        page_times.append(statistics.median(times))
+        output_chars[name] = len(text)
+    total_bytes = sum(len(html) for _, html in fixtures)
+    return {
+        "ms_per_page_median": round(statistics.median(page_times) * 1000, 2),
+        "mb_per_s": round(total_bytes / 1_000_000 / max(sum(page_times), 1e-9), 2),
+        "cpu_s": round((time.process_time() - cpu_started) / repeat, 3),
+        "output_chars": sum(output_chars.values()),
+        "pages": output_chars,
+    }
+
+
+def cmd_html(args) -> int:
+    from src.utils.html_extract import ENGINES, available_engines
+
+    if args.fetch:
+        _fetch_fixtures(args.fetch, args.fixtures)
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(args.fixtures, "*.htm*"))):
+        with open(path, "rb") as f:
+            fixtures.append((os.path.basename(path), f.read()))
+    if not fixtures:
+        print(f"❌ No HTML fixtures in {args.fixtures}; save some with --fetch <url> ...")
+        return 1
+
+    engines = args.engines or available_engines()
+    missing = [name for name in engines if name not in available_engines()]
+    if missing:
+        print(f"❌ Unavailable engine(s): {', '.join(missing)} (available: {', '.join(available_engines())})")
+        return 1
+
+    total_kb = sum(len(html) for _, html in fixtures) / 1024
+    print(f"\n🧹 {len(fixtures)} fixture(s), {total_kb:.0f} KB of HTML, {args.repeat} run(s) each")
+    results = {name: _bench_engine(ENGINES[name], fixtures, args.repeat) for name in engines}
+
+    baseline = results.get("bs4")
+    print("\n" + "=" * 80)
+    print(f"{'engine':<10}{'ms/page':>12}{'MB/s':>10}{'cpu (s)':>10}{'chars':>12}{'vs bs4':>10}{'speedup':>10}")
+    print("=" * 80)
+    for name, row in results.items():
+        size = f"{row['output_chars'] / max(1, baseline['output_chars']):.0%}" if baseline else "-"
+        speedup = f"{baseline['ms_per_page_median'] / max(row['ms_per_page_median'], 1e-6):.1f}x" if baseline else "-"
+        print(f"{name:<10}{row['ms_per_page_median']:>12.2f}{row['mb_per_s']:>10.2f}{row['cpu_s']:>10.3f}"
+              f"{row['output_chars']:>12}{size:>10}{speedup:>10}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"fixtures": len(fixtures), "repeat": args.repeat, "engines": results}, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+    return 0
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        description='AutoResearch Crew - offline record/replay benchmark',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record = commands.add_parser('record', help='Run live and record every outbound response')
+    record.add_argument('topic', type=str, help='Research topic to record')
+    record.add_argument('--language', type=str, default='en')
+    record.add_argument('--cassette', type=str, default=DEFAULT_CASSETTE)
+    record.add_argument('--assets', action='store_true', help='Also record translation + TTS')
+    record.add_argument('--profile', type=str, default=None, help='Pipeline depth profile (fast / standard / deep)')
+    record.set_defaults(func=cmd_record)
+
+    pipeline = commands.add_parser('pipeline', help='Replay a cassette and time each stage')
+    pipeline.add_argument('--cassette', type=str, default=DEFAULT_CASSETTE)
+    pipeline.add_argument('--topic', type=str, default=None, help='Defaults to the recorded topic')
+    pipeline.add_argument('--runs', type=int, default=3)
+    pipeline.add_argument('--latency-ms', type=float, default=None,
+                          help='Fixed latency injected per call (default: the recorded latency)')
+    pipeline.add_argument('--latency-scale', type=float, default=1.0,
+                          help='Multiplier for the recorded latency')
+    pipeline.add_argument('--assets', action='store_true', help='Include translation + TTS')
+    pipeline.add_argument('--profile', type=str, default=None, help='Defaults to the recorded profile')
+    pipeline.add_argument('--output', type=str, default=None, help='Write the summary as JSON')
+    pipeline.set_defaults(func=cmd_pipeline)
+
+    html = commands.add_parser('html', help='Compare HTML text extraction engines over saved pages')
+    html.add_argument('--fixtures', type=str, default=DEFAULT_HTML_FIXTURES, help='Directory of saved .html pages')
+    html.add_argument('--fetch', type=str, nargs='+', default=None, help='Save these URLs as fixtures first')
+    html.add_argument('--engines', type=str, nargs='+', default=None, help='Default: every available engine')
+    html.add_argument('--repeat', type=int, default=5)
+    html.add_argument('--output', type=str, default=None, help='Write the results as JSON')
+    html.set_defaults(func=cmd_html)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    exit(main())
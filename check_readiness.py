@@ -1,6 +1,6 @@
 import os
 import sys
-import requests
+from src.utils.http_session import get_session
 import pydantic
 from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
@@ -85,7 +85,7 @@ def test_llm_connectivity():
 
     # 3. Test Ollama (Local Extractor)
     try:
-        requests.get("http://localhost:11434", timeout=2)
+        get_session(retries=False).get("http://localhost:11434", timeout=2)
         get_extractor_llm().invoke(test_msg)
         results.append(check_status("Ollama Local (Extractor Brain)", True))
     except:
@@ -7,8 +7,11 @@ import argparse
 import os
 from dotenv import load_dotenv
 from src.crew import ResearchCrew
+from src.crew.checkpoint import STAGES, list_checkpointed_runs
+from src.crew.batch import load_batch_topics, run_batch, BATCH_WORKERS
+from src.crew.profiles import list_profiles, DEFAULT_PROFILE
 from src.utils import validate_env_variables
-from src.llm import LLMManager
+from src.llm.llm_manager import get_llm_manager
 
 def main():
     """Main CLI entry point."""
@@ -25,6 +28,13 @@ Examples:
   python run.py "Python programming basics"
   python run.py "AI in healthcare" --language es --audio
   python run.py "Climate change" --provider groq --pdf
+  python run.py "AI in healthcare" --refresh
+  python run.py "AI in healthcare" --profile fast
+  python run.py --list-runs
+  python run.py --batch topics.txt --workers 4 --manifest output/nightly.jsonl
+  cat topics.txt | python run.py --batch -
+  python run.py --resume 20250101-120000
+  python run.py --resume 20250101-120000 --from-stage report
 
 Available Providers:
   openai      OpenAI GPT models (requires payment)
@@ -37,6 +47,7 @@ Available Providers:
     parser.add_argument(
         'topic',
         type=str,
+        nargs='?',
         help='Research topic to investigate'
     )
     parser.add_argument(
@@ -62,6 +73,53 @@ Available Providers:
         action='store_true',
         help='Generate PDF report'
     )
+    parser.add_argument(
+        '--profile',
+        type=str,
+        choices=list_profiles(),
+        default=None,
+        help=f'Pipeline depth profile from config/profiles.yaml (default: {DEFAULT_PROFILE})'
+    )
+    parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Incrementally refresh the latest report on this topic in --language (new sources only)'
+    )
+    parser.add_argument(
+        '--resume',
+        type=str,
+        metavar='RUN_ID',
+        help='Resume a previous run from its last completed stage'
+    )
+    parser.add_argument(
+        '--from-stage',
+        type=str,
+        choices=STAGES,
+        help='With --resume: recompute this stage and everything after it'
+    )
+    parser.add_argument(
+        '--batch',
+        type=str,
+        metavar='FILE',
+        help="Run many topics from a file ('-' for stdin): one per line, 'topic<TAB>lang' or JSON"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=BATCH_WORKERS,
+        help='With --batch: number of topics researched concurrently'
+    )
+    parser.add_argument(
+        '--manifest',
+        type=str,
+        default=None,
+        help='With --batch: JSONL file for per-topic results (default output/batch_<time>.jsonl)'
+    )
+    parser.add_argument(
+        '--list-runs',
+        action='store_true',
+        help='List recent checkpointed runs'
+    )
     parser.add_argument(
         '--setup',
         action='store_true',
@@ -74,13 +132,25 @@ Available Providers:
     if args.setup:
         os.system('python setup_llm.py')
         return 0
+
+    if args.list_runs:
+        runs = list_checkpointed_runs()
+        if not runs:
+            print("No checkpointed runs found.")
+        for run in runs:
+            state = "done" if "report" in run['stages'] else f"stopped after '{run['stages'][-1]}'"
+            print(f"{run['run_id']}  [{state}]  {run['topic']}")
+        return 0
+
+    if not args.topic and not args.resume and not args.batch:
+        parser.error("a research topic is required (or use --resume RUN_ID / --batch FILE)")
     
     # Show available providers
     print("\n" + "="*80)
     print("🧠 AutoResearch Crew - Enhanced Edition")
     print("="*80)
     
-    llm_manager = LLMManager()
+    llm_manager = get_llm_manager()
     provider_info = llm_manager.get_provider_info()
     
     print(f"\n🤖 Available Providers: {', '.join(provider_info['active_providers'])}")
@@ -106,20 +176,43 @@ Available Providers:
     if args.provider:
         os.environ['LLM_PROVIDER'] = args.provider
         print(f"\n📌 Using provider: {args.provider}")
-    
-    print(f"\n📋 Topic: {args.topic}")
+
+    # Batch mode: one process, shared limiters/caches, bounded concurrency
+    if args.batch:
+        items = load_batch_topics(args.batch, default_language=args.language)
+        if not items:
+            print("\n❌ No topics found in batch input.")
+            return 1
+        rows = run_batch(items, workers=args.workers, manifest_path=args.manifest, profile=args.profile)
+        failed = [row for row in rows if row['status'] != 'completed']
+        print("\n" + "="*80)
+        print(f"📦 Batch Complete: {len(rows) - len(failed)}/{len(rows)} succeeded")
+        print("="*80)
+        for row in failed:
+            print(f"❌ {row['topic']}: {row.get('error')}")
+        return 1 if failed else 0
+
+    if args.resume:
+        print(f"\n♻️  Resuming run: {args.resume}" + (f" (from stage '{args.from_stage}')" if args.from_stage else ""))
+    else:
+        print(f"\n📋 Topic: {args.topic}")
     print(f"🌍 Language: {args.language}")
     print(f"🎤 Audio: {'Yes' if args.audio else 'No'}")
     print(f"📄 PDF: {'Yes' if args.pdf else 'No'}")
     print()
     
+    crew = None
     try:
         # Initialize and run crew
-        crew = ResearchCrew(
-            topic=args.topic,
-            language=args.language,
-            enable_audio=args.audio
-        )
+        if args.resume:
+            crew = ResearchCrew.resume(args.resume, from_stage=args.from_stage, profile=args.profile)
+        else:
+            crew = (ResearchCrew.refresh if args.refresh else ResearchCrew)(
+                topic=args.topic,
+                language=args.language,
+                profile=args.profile
+            )
+        print(f"⚡ Profile: {crew.profile.name} - {crew.profile.description}\n")
         
         results = crew.run()
         
@@ -127,6 +220,8 @@ Available Providers:
         print("✅ Research Complete!")
         print("="*80)
         print(f"\n📄 Report: {results['report_path']}")
+        if results.get('refreshed_from'):
+            print(f"🔁 Refreshed from run: {results['refreshed_from']}")
         
         if results.get('pdf_path'):
             print(f"📄 PDF: {results['pdf_path']}")
@@ -140,14 +235,19 @@ Available Providers:
         if results.get('notion_url'):
             print(f"📤 Notion: {results['notion_url']}")
         
-        print(f"\n⏱️  Duration: {results['duration']:.2f}s")
-        print(f"💾 Database ID: {results['db_record_id']}")
+        if results.get('duration'):
+            print(f"\n⏱️  Duration: {results['duration']:.2f}s")
+        if results.get('db_record_id'):
+            print(f"💾 Database ID: {results['db_record_id']}")
+        print(f"🆔 Run ID: {results.get('run_id', crew.run_id)}")
         print("\n✨ All done!\n")
         
         return 0
         
     except Exception as e:
         print(f"\n❌ Error: {e}")
+        if crew is not None:
+            print(f"\n💾 Completed stages are checkpointed. Resume with: python run.py --resume {crew.run_id}")
         print("\n💡 Troubleshooting:")
         print("1. Check your API keys in .env")
         print("2. Try a different provider: python run.py --setup")
@@ -1,65 +1,187 @@
 import os
-import requests
-from typing import Type
+from typing import Dict, List, Optional, Type
 from pydantic import BaseModel, Field
 from crewai import Agent
 from crewai.tools import BaseTool
 from src.llm.multi_provider import get_ollama_llm
-from bs4 import BeautifulSoup # Standard in CrewAI environments
+from src.llm.rate_limiter import get_rate_limiter
+from src.llm.circuit_breaker import get_breaker
+from src.utils.http_session import fetch_page
+from src.utils.page_cache import get_page_cache
+from src.llm.token_budget import trim_to_tokens, extractor_page_budget, EXTRACTOR_PAGE_BUDGET
+from src.utils.singleflight import singleflight, normalize_url
+from src.utils.tracing import traced
+from src.utils.replay import replayable
+from src.utils.html_extract import extract_text, TextMeter
+
+# Stop downloading once this much raw text has arrived: the page budget (~4 chars/token)
+# with room for the navigation and boilerplate the extractor will strip
+SCRAPE_TEXT_TARGET = int(os.getenv("SCRAPE_TEXT_TARGET", str(EXTRACTOR_PAGE_BUDGET * 4 * 3)))
+
+# Tavily's extract endpoint accepts at most 20 URLs per request
+TAVILY_EXTRACT_BATCH = int(os.getenv("TAVILY_EXTRACT_BATCH", "20"))
 
 class TavilyContentInput(BaseModel):
     url: str = Field(..., description="The URL of the webpage to read")
 
-class TavilyContentTool(BaseTool):
-    name: str = "read_webpage_content"
-    description: str = "Reads the full text content from a single URL. Uses API with manual fallback."
-    args_schema: Type[BaseModel] = TavilyContentInput
+def _tavily_client():
+    """Tavily client after the breaker check and a rate-limit token (raises while the circuit is open)."""
+    from tavily import TavilyClient
+    if get_breaker("tavily").is_open():
+        raise RuntimeError("Tavily circuit is open")
+    limiter = get_rate_limiter("tavily", os.getenv("TAVILY_API_KEY"))
+    if limiter is not None:
+        limiter.acquire()
+    return TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
 
-    def _run(self, url: str) -> str:
-        # 1. Attempt Tavily API (Primary)
-        try:
-            from tavily import TavilyClient
-            client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
-            
-            # Try the modern 'extract' method first
-            if hasattr(client, 'extract'):
-                response = client.extract(urls=[url])
-                if response and 'results' in response:
-                    return response['results'][0].get('raw_content', "")
-            
-            # Fallback to 'search' (Legacy Tavily versions)
-            # We use the URL as the query, which often returns the page context
-            response = client.search(query=url, include_raw_content=True, max_results=1)
-            if response and 'results' in response and len(response['results']) > 0:
-                return response['results'][0].get('content', "")
+def _extract_with_tavily(url: str):
+    """Full page text via Tavily, or None if Tavily is unavailable or returned nothing."""
+    try:
+        breaker = get_breaker("tavily")
+        client = _tavily_client()
+        
+        # Try the modern 'extract' method first
+        if hasattr(client, 'extract'):
+            response = breaker.call(client.extract, urls=[url])
+            if response and response.get('results'):
+                return response['results'][0].get('raw_content') or None
+        
+        # Fallback to 'search' (Legacy Tavily versions)
+        # We use the URL as the query, which often returns the page context
+        response = breaker.call(client.search, query=url, include_raw_content=True, max_results=1)
+        if response and 'results' in response and len(response['results']) > 0:
+            return response['results'][0].get('content') or None
 
-        except Exception as e:
-            print(f"⚠️ Tavily API extraction failed: {e}. Switching to manual fallback...")
+    except Exception as e:
+        print(f"⚠️ Tavily API extraction failed: {e}. Switching to manual fallback...")
+    return None
+
+def _scrape(url: str, headers: dict = None):
+    """
+    Streamed, byte-capped GET of a page: (response, main-content text). The download stops
+    once SCRAPE_TEXT_TARGET characters of text have arrived; non-text responses raise.
+    """
+    page = fetch_page(url, headers=headers,
+                      make_stop=lambda charset: TextMeter(SCRAPE_TEXT_TARGET, encoding=charset).feed)
+    if page.status_code == 304:
+        return page, None
+    return page, extract_text(page.body, encoding=page.encoding)
+
+def _validators(response):
+    return response.headers.get("ETag"), response.headers.get("Last-Modified")
+
+def _revalidate(url: str, cached):
+    """
+    Conditional GET for a stale cache entry. Returns the page text (the cached one on 304,
+    freshly parsed on 200), or None if the server could not answer.
+    """
+    cache = get_page_cache()
+    try:
+        response, text = _scrape(url, headers=cached.conditional_headers())
+        if response.status_code == 304:
+            cache.mark_validated(url, *_validators(response))
+            return cached.text
+        if text:
+            cache.set(url, text, *_validators(response))
+        return text or None
+    except Exception as e:
+        print(f"⚠️ Revalidation of {url} failed: {e}")
+        return None
+
+@replayable("tool:tavily_extract", lambda urls: [normalize_url(url) for url in urls])
+def _tavily_extract_chunk(urls: List[str]) -> Dict[str, str]:
+    """One multi-URL extract request: {normalized url: raw content} for the URLs Tavily could read."""
+    response = get_breaker("tavily").call(_tavily_client().extract, urls=urls)
+    return {
+        normalize_url(result.get('url', '')): result['raw_content']
+        for result in (response or {}).get('results', [])
+        if result.get('raw_content')
+    }
 
-        # 2. Attempt Manual Scrape (Bulletproof Fallback)
-        # This runs if Tavily fails or doesn't have the method.
+@traced("tool:tavily_extract_batch", "tool")
+def extract_with_tavily_batch(urls: List[str], batch_size: int = TAVILY_EXTRACT_BATCH) -> Dict[str, str]:
+    """
+    Extracts many URLs with one Tavily request per `batch_size` URLs and maps the results
+    back to the URLs as given. URLs missing from the result (failed, or a failed chunk) are left out.
+    """
+    extracted: Dict[str, str] = {}
+    for start in range(0, len(urls), batch_size):
+        chunk = urls[start:start + batch_size]
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            # Parse text with BeautifulSoup
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove scripts and styles for clean text
-            for script in soup(["script", "style", "nav", "footer"]):
-                script.decompose()
-                
-            text = soup.get_text(separator=' ', strip=True)
-            
-            # Return first 15k chars to avoid overwhelming the LLM
-            return text[:15000] if text else "No text content found on page."
+            contents = _tavily_extract_chunk(chunk)
+        except Exception as e:
+            print(f"⚠️ Tavily batch extract failed for {len(chunk)} URL(s): {e}")
+            continue
+        for url in chunk:
+            if normalize_url(url) in contents:
+                extracted[url] = contents[normalize_url(url)]
+    print(f"📦 Tavily extracted {len(extracted)}/{len(urls)} URL(s) in {-(-len(urls) // batch_size)} request(s)")
+    return extracted
+
+def needs_extraction(url: str) -> bool:
+    """True unless the page cache can answer for `url` (fresh, or stale but revalidatable)."""
+    cache = get_page_cache()
+    cached = cache.get(url) if cache is not None else None
+    return cached is None or (not cached.fresh and not cached.can_revalidate)
+
+@traced("tool:read_webpage_content", "tool")
+@singleflight("read_webpage_content", lambda url, **_: normalize_url(url))
+@replayable("tool:read_webpage_content", lambda url, **_: normalize_url(url))
+def read_webpage(url: str, extracted: Optional[str] = None, use_tavily: bool = True) -> str:
+    """
+    Full text of one URL: page cache first (revalidated once stale), then Tavily,
+    then a manual scrape. Never raises. Callers that already batch-extracted the
+    URL pass its text as `extracted`; `use_tavily=False` goes straight to scraping
+    (the batch already tried Tavily for it).
+    """
+    # 0. Page cache: fresh hits cost nothing, stale ones a conditional GET
+    cache = get_page_cache()
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None:
+        if cached.fresh:
+            return trim_to_tokens(cached.text, extractor_page_budget())
+        if cached.can_revalidate:
+            text = _revalidate(url, cached)
+            if text:
+                return trim_to_tokens(text, extractor_page_budget())
+
+    # 1. Attempt Tavily API (Primary), unless a batch request already did
+    text = extracted or (_extract_with_tavily(url) if use_tavily else None)
+    # Tavily text carries no validators (an extra origin HEAD per page would undo batching),
+    # so it expires on the TTL; only our own scrapes can be revalidated
+    etag, last_modified = None, None
 
+    # 2. Attempt Manual Scrape (Bulletproof Fallback)
+    # This runs if Tavily fails or doesn't have the method.
+    if not text:
+        try:
+            # Streams through the shared pooled session (browser User-Agent, gzip/br), capped in bytes
+            response, text = _scrape(url)
+            etag, last_modified = _validators(response)
         except Exception as e:
+            if cached is not None:
+                # Stale text beats no text
+                print(f"⚠️ Serving stale cached copy of {url}: {e}")
+                return trim_to_tokens(cached.text, extractor_page_budget())
             return f"Error: Could not extract content from {url}. Reason: {str(e)}"
 
+    if not text:
+        return "No text content found on page."
+    if cache is not None:
+        cache.set(url, text, etag, last_modified)
+    # Cap each page to its token budget to avoid overwhelming the LLM
+    return trim_to_tokens(text, extractor_page_budget())
+
+class TavilyContentTool(BaseTool):
+    name: str = "read_webpage_content"
+    description: str = "Reads the full text content from a single URL. Uses API with manual fallback."
+    args_schema: Type[BaseModel] = TavilyContentInput
+    # Per-page share when an agent may read several pages into one context
+    page_budget: int = EXTRACTOR_PAGE_BUDGET
+
+    def _run(self, url: str) -> str:
+        return trim_to_tokens(read_webpage(url), self.page_budget)
+
 def create_content_extractor_agent(topic: str, show_logs: bool = True) -> Agent:
     # Using Ollama (Local) for efficient reading
     llm = get_ollama_llm(temperature=0.1) 
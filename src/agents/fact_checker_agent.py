@@ -4,10 +4,13 @@ from typing import Type
 from pydantic import BaseModel, Field
 from crewai import Agent
 from crewai.tools import BaseTool
-from crewai_tools import SerperDevTool
 from langchain_community.tools import WikipediaQueryRun
 from langchain_community.utilities import WikipediaAPIWrapper
 from src.llm.multi_provider import get_fact_checker_llm
+from src.agents.research_agent import GuardedSerperDevTool
+from src.utils.singleflight import singleflight, normalize_query
+from src.utils.tracing import traced
+from src.utils.replay import replayable
 
 # --- CUSTOM TOOL WRAPPER ---
 class WikipediaToolInput(BaseModel):
@@ -19,6 +22,9 @@ class WikipediaTool(BaseTool):
     description: str = "Search Wikipedia for factual verification and background information."
     args_schema: Type[BaseModel] = WikipediaToolInput
 
+    @traced("tool:wikipedia_search", "tool")
+    @singleflight("wikipedia_search", lambda self, query: normalize_query(query))
+    @replayable("tool:wikipedia_search", lambda self, query: normalize_query(query))
     def _run(self, query: str) -> str:
         api_wrapper = WikipediaAPIWrapper(top_k_results=3, doc_content_chars_max=4000)
         wiki = WikipediaQueryRun(api_wrapper=api_wrapper)
@@ -37,7 +43,7 @@ def create_fact_checker_agent(topic: str, show_logs: bool = True) -> Agent:
         }
 
     # Initialize tools as BaseTool instances
-    serper_tool = SerperDevTool()
+    serper_tool = GuardedSerperDevTool()
     wiki_tool = WikipediaTool() # Using our wrapper
     
     llm = get_fact_checker_llm()
@@ -5,7 +5,13 @@ from pydantic import BaseModel, Field
 from crewai import Agent
 from crewai.tools import BaseTool
 from langchain_community.tools import DuckDuckGoSearchRun
+from crewai_tools import SerperDevTool
 from src.llm.multi_provider import get_researcher_llm
+from src.llm.rate_limiter import get_rate_limiter
+from src.llm.circuit_breaker import get_breaker
+from src.utils.singleflight import singleflight, normalize_query
+from src.utils.tracing import traced
+from src.utils.replay import replayable
 
 # --- INTERNAL TOOLS ---
 
@@ -17,11 +23,22 @@ class WebSearchTool(BaseTool):
     description: str = "Search the web using Tavily AI for recent data and news."
     args_schema: Type[BaseModel] = WebSearchInput
 
+    @traced("tool:web_search", "tool")
+    @singleflight("web_search", lambda self, query: normalize_query(query))
+    @replayable("tool:web_search", lambda self, query: normalize_query(query))
     def _run(self, query: str) -> str:
         try:
             from tavily import TavilyClient
+            breaker = get_breaker("tavily")
+            if breaker.is_open():
+                return "Web search error: Tavily is temporarily unavailable (circuit open)."
             client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
-            response = client.search(query=query, search_depth="advanced", include_answer=True, max_results=5)
+            limiter = get_rate_limiter("tavily", os.getenv("TAVILY_API_KEY"))
+            if limiter is not None:
+                limiter.acquire()
+            response = breaker.call(
+                client.search, query=query, search_depth="advanced", include_answer=True, max_results=5
+            )
             results = []
             if response.get('answer'):
                 results.append(f"--- TAVILY AI SUMMARY ---\n{response['answer']}\n")
@@ -31,6 +48,17 @@ class WebSearchTool(BaseTool):
         except Exception as e:
             return f"Web search error: {str(e)}"
 
+class GuardedSerperDevTool(SerperDevTool):
+    """SerperDevTool behind the 'serper' circuit breaker, so a dead key or outage fails fast."""
+
+    @traced("tool:serper_search", "tool")
+    @replayable("tool:serper_search", lambda self, **kwargs: kwargs)
+    def _run(self, **kwargs):
+        try:
+            return get_breaker("serper").call(super()._run, **kwargs)
+        except Exception as e:
+            return f"Serper search error: {str(e)}"
+
 class DuckDuckGoTool(BaseTool):
     """
     A custom wrapper for LangChain's DuckDuckGoSearchRun to ensure 
@@ -39,6 +67,9 @@ class DuckDuckGoTool(BaseTool):
     name: str = "duckduckgo_search"
     description: str = "Search the web using DuckDuckGo for current events and information."
 
+    @traced("tool:duckduckgo_search", "tool")
+    @singleflight("duckduckgo_search", lambda self, query: normalize_query(query))
+    @replayable("tool:duckduckgo_search", lambda self, query: normalize_query(query))
     def _run(self, query: str) -> str:
         try:
             ddg_search = DuckDuckGoSearchRun()
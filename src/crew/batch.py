@@ -0,0 +1,111 @@
+"""
+=========================================================
+📦 BATCH RESEARCH — MANY TOPICS, ONE PROCESS
+=========================================================
+Runs a list of topics on a bounded worker pool. All crews share
+the process-wide rate limiters, LLM clients, response cache and
+provider detection. Every result (or failure) is appended to a
+JSONL manifest as soon as it finishes.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .research_crew import ResearchCrew
+
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "2"))
+
+
+def parse_batch_line(line: str, default_language: str = 'en') -> Optional[Dict]:
+    """
+    One topic per line: plain text, `topic<TAB>language`, or a JSON object
+    with "topic" and optional "language" / "profile". Blank lines and # comments are skipped.
+    Raises ValueError / KeyError for a malformed line.
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    if line.startswith('{'):
+        item = json.loads(line)
+        return {'topic': item['topic'], 'language': item.get('language', default_language),
+                'profile': item.get('profile')}
+    topic, _, language = line.partition('\t')
+    return {'topic': topic.strip(), 'language': language.strip() or default_language}
+
+
+def load_batch_topics(source: str, default_language: str = 'en') -> List[Dict]:
+    """Reads topics from a file path, or from stdin when `source` is '-'."""
+    if source == '-':
+        lines = sys.stdin.readlines()
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    items = []
+    for number, line in enumerate(lines, 1):
+        try:
+            item = parse_batch_line(line, default_language)
+        except (ValueError, KeyError) as e:
+            # One bad line must not abort the whole batch
+            print(f"⚠️ Skipping batch line {number}: {e!r}")
+            continue
+        if item:
+            items.append(item)
+    return items
+
+
+def run_batch(
+    items: List[Dict],
+    workers: int = BATCH_WORKERS,
+    manifest_path: Optional[str] = None,
+    profile: Optional[str] = None
+) -> List[Dict]:
+    """
+    Runs every item, never letting one failure stop the others. Returns the manifest rows.
+    `profile` applies to items that do not name their own.
+    """
+    manifest_path = manifest_path or f"output/batch_{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+    if os.path.dirname(manifest_path):
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    manifest_lock = threading.Lock()
+    rows: List[Dict] = []
+
+    def run_one(index: int, item: Dict) -> Dict:
+        started = time.perf_counter()
+        row = {
+            'index': index,
+            'topic': item['topic'],
+            'language': item['language'],
+            'started_at': datetime.utcnow().isoformat()
+        }
+        crew = None
+        try:
+            crew = ResearchCrew(topic=item['topic'], language=item['language'], show_logs=False,
+                                profile=item.get('profile') or profile)
+            row['profile'] = crew.profile.name
+            results = crew.run()
+            row.update(status='completed', report_path=results.get('report_path'))
+        except Exception as e:
+            row.update(status='failed', error=str(e))
+        row['run_id'] = crew.run_id if crew else None
+        row['duration_seconds'] = round(time.perf_counter() - started, 2)
+        return row
+
+    print(f"📦 Running {len(items)} topic(s) on {workers} worker(s) -> {manifest_path}")
+    with open(manifest_path, 'a', encoding='utf-8') as manifest, \
+            ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="batch") as pool:
+        futures = [pool.submit(run_one, i, item) for i, item in enumerate(items)]
+        for future in as_completed(futures):
+            row = future.result()
+            with manifest_lock:
+                manifest.write(json.dumps(row, ensure_ascii=False) + "\n")
+                manifest.flush()
+                rows.append(row)
+            icon = "✅" if row['status'] == 'completed' else "❌"
+            print(f"{icon} [{len(rows)}/{len(items)}] {row['topic']} ({row['duration_seconds']:.1f}s)")
+
+    return sorted(rows, key=lambda r: r['index'])
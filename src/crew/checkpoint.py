@@ -0,0 +1,97 @@
+"""
+=========================================================
+💾 STAGE CHECKPOINTS — RESUME FAILED RESEARCH RUNS
+=========================================================
+Each ResearchCrew stage persists its output (keyed by run id
+and stage) to the `stage_checkpoints` table. Resuming a run
+reuses every completed stage and only pays for what is left.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.database.crud import (
+    save_stage_checkpoint,
+    get_stage_checkpoints,
+    delete_stage_checkpoints,
+    get_checkpointed_runs,
+    get_latest_completed_run
+)
+
+# Pipeline order: plan -> search -> pages (fetched sources) -> facts (verified) -> context (compacted) -> report
+STAGES = ["plan", "search", "pages", "facts", "context", "report"]
+
+
+class RunCheckpoints:
+    """Checkpoint store of a single run. Storage errors are logged, never raised."""
+
+    def __init__(
+        self,
+        run_id: str,
+        topic: Optional[str] = None,
+        language: Optional[str] = None,
+        profile: Optional[str] = None,
+        refresh_of: Optional[str] = None
+    ):
+        self.run_id = run_id
+        self.topic = topic
+        self.language = language
+        self.profile = profile
+        # A refresh run's delta-only checkpoints only make sense on top of this previous run
+        self.refresh_of = refresh_of
+        self.outputs: Dict[str, str] = {}
+        self.saved_at: Dict[str, datetime] = {}
+        try:
+            for record in get_stage_checkpoints(run_id):
+                self.outputs[record.stage] = record.output
+                self.saved_at[record.stage] = record.created_at
+                self.topic = self.topic or record.topic
+                self.language = self.language or record.language
+                self.profile = self.profile or record.profile
+                self.refresh_of = self.refresh_of or record.refresh_of
+        except Exception as e:
+            print(f"⚠️ Could not load checkpoints for {run_id}: {e}")
+
+    def get(self, stage: str) -> Optional[str]:
+        return self.outputs.get(stage)
+
+    def save(self, stage: str, output: str) -> None:
+        self.outputs[stage] = output
+        self.saved_at[stage] = datetime.utcnow()
+        try:
+            save_stage_checkpoint(self.run_id, stage, output, topic=self.topic, language=self.language,
+                                  profile=self.profile, refresh_of=self.refresh_of)
+        except Exception as e:
+            print(f"⚠️ Checkpoint '{stage}' not saved: {e}")
+
+    def reset_from(self, stage: str) -> None:
+        """Forgets `stage` and every later stage so they run again."""
+        later = STAGES[STAGES.index(stage):]
+        for name in later:
+            self.outputs.pop(name, None)
+            self.saved_at.pop(name, None)
+        delete_stage_checkpoints(self.run_id, later)
+
+    @property
+    def completed_stages(self) -> List[str]:
+        return [stage for stage in STAGES if stage in self.outputs]
+
+    @property
+    def last_updated(self) -> Optional[datetime]:
+        return max(self.saved_at.values()) if self.saved_at else None
+
+
+def list_checkpointed_runs(limit: int = 20, unfinished_only: bool = False) -> List[Dict]:
+    """Recent checkpointed runs, optionally only those that never reached the report stage."""
+    runs = get_checkpointed_runs(limit)
+    if unfinished_only:
+        runs = [run for run in runs if "report" not in run['stages']]
+    return runs
+
+
+def find_latest_report_run(topic: str, language: Optional[str] = None) -> Optional[str]:
+    """Run id of the most recent run of `topic` that produced a report in `language`, if any."""
+    try:
+        return get_latest_completed_run(topic, language)
+    except Exception as e:
+        print(f"⚠️ Could not look up previous runs: {e}")
+        return None
@@ -0,0 +1,115 @@
+"""
+=========================================================
+🕸️ DAG TASK SCHEDULER FOR CREW TASKS
+=========================================================
+Dependencies are the ones already declared on each Task via
+`context=[...]`. A task starts as soon as everything it depends
+on has finished, so independent branches (e.g. extract+verify
+per URL) run side by side on a bounded worker pool. Results come
+back in declaration order, whatever order they finished in.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional
+
+from crewai import Task
+
+from src.llm.telemetry import context_snapshot, llm_context
+from src.utils.tracing import span
+from src.crew.schemas import compact_output
+
+DAG_MAX_WORKERS = int(os.getenv("DAG_MAX_WORKERS", "4"))
+
+# Same separator CrewAI uses when it joins context outputs
+_CONTEXT_DIVIDER = "\n\n----------\n\n"
+
+
+class TaskGraph:
+    """Runs CrewAI tasks in dependency order with bounded parallelism."""
+
+    def __init__(self, tasks: List[Task], max_workers: int = DAG_MAX_WORKERS, verbose: bool = True):
+        self.tasks = list(tasks)
+        self.max_workers = max_workers
+        self.verbose = verbose
+        self.index = {id(task): i for i, task in enumerate(self.tasks)}
+        self.dependencies: Dict[int, List[int]] = {}
+        for i, task in enumerate(self.tasks):
+            deps = []
+            for dep in (task.context if isinstance(task.context, list) else []):
+                if id(dep) not in self.index:
+                    raise ValueError(f"Task '{task.description[:40]}' depends on a task outside the graph")
+                deps.append(self.index[id(dep)])
+            self.dependencies[i] = deps
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        state: Dict[int, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(i: int) -> None:
+            if state.get(i) == 1:
+                raise ValueError("Task graph contains a cycle")
+            if state.get(i) == 2:
+                return
+            state[i] = 1
+            for dep in self.dependencies[i]:
+                visit(dep)
+            state[i] = 2
+
+        for i in range(len(self.tasks)):
+            visit(i)
+
+    def _context_for(self, i: int, outputs: Dict[int, str]) -> Optional[str]:
+        deps = self.dependencies[i]
+        if not deps:
+            return None
+        return _CONTEXT_DIVIDER.join(outputs[d] for d in deps)
+
+    def run(self) -> List[Optional[str]]:
+        """
+        Executes the graph and returns each task's output in declaration order (minified
+        schema JSON for tasks with `output_pydantic`, raw text otherwise).
+        A failed task yields None and its dependents are skipped; other branches carry on.
+        """
+        outputs: Dict[int, str] = {}
+        failed = set()
+        pending = set(range(len(self.tasks)))
+        tags = context_snapshot()
+
+        def execute(i: int, context: Optional[str]) -> str:
+            task = self.tasks[i]
+            role = getattr(task.agent, "role", "agent")
+            with llm_context(**tags), span(f"task:{role}", "task", index=i, depends_on=len(self.dependencies[i])):
+                return compact_output(task.execute_sync(agent=task.agent, context=context))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crew-dag") as pool:
+            running = {}
+            while pending or running:
+                for i in sorted(pending):
+                    deps = self.dependencies[i]
+                    if any(d in failed for d in deps):
+                        failed.add(i)
+                        pending.discard(i)
+                        print(f"⏭️ Skipping task {i + 1}: a dependency failed")
+                    elif all(d in outputs for d in deps):
+                        pending.discard(i)
+                        running[pool.submit(execute, i, self._context_for(i, outputs))] = i
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    try:
+                        outputs[i] = future.result()
+                    except Exception as e:
+                        failed.add(i)
+                        print(f"❌ Task {i + 1} failed: {e}")
+
+        if self.verbose:
+            print(f"🕸️ {len(outputs)}/{len(self.tasks)} task(s) done in {time.perf_counter() - started:.1f}s")
+        return [outputs.get(i) for i in range(len(self.tasks))]
+
+
+def run_task_graph(tasks: List[Task], max_workers: int = DAG_MAX_WORKERS) -> List[Optional[str]]:
+    return TaskGraph(tasks, max_workers=max_workers).run()
@@ -0,0 +1,105 @@
+"""
+=========================================================
+📥 CONCURRENT URL EXTRACTION STAGE
+=========================================================
+Replaces the extractor agent's one-URL-per-tool-call loop:
+URLs are parsed out of the search output, extracted with one
+batched Tavily request, and only the misses are scraped in
+parallel (with a per-domain cap so one site is never hammered).
+The cleaned pages go to the extractor LLM in a single prompt.
+"""
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from src.agents.content_extractor_agent import read_webpage, extract_with_tavily_batch, needs_extraction
+from src.llm.telemetry import context_snapshot, llm_context
+from src.utils.singleflight import normalize_url
+from src.utils.tracing import span
+
+EXTRACT_MAX_WORKERS = int(os.getenv("EXTRACT_MAX_WORKERS", "8"))
+EXTRACT_PER_DOMAIN = int(os.getenv("EXTRACT_PER_DOMAIN", "2"))
+
+_URL_PATTERN = re.compile(r'https?://[^\s<>"\'\)\]\}]+')
+_TRAILING_PUNCTUATION = '.,;:!?*`'
+
+
+def extract_urls(text: str, limit: int = 3) -> List[str]:
+    """First `limit` distinct http(s) URLs in the order they appear in `text`."""
+    urls, seen = [], set()
+    for match in _URL_PATTERN.findall(text or ""):
+        url = match.rstrip(_TRAILING_PUNCTUATION)
+        key = normalize_url(url)
+        if key in seen:
+            continue
+        seen.add(key)
+        urls.append(url)
+        if len(urls) >= limit:
+            break
+    return urls
+
+
+class DomainLimiter:
+    """At most `per_domain` concurrent fetches against the same host."""
+
+    def __init__(self, per_domain: int = EXTRACT_PER_DOMAIN):
+        self.per_domain = per_domain
+        self.semaphores: Dict[str, threading.Semaphore] = {}
+        self.lock = threading.Lock()
+
+    def slot(self, url: str) -> threading.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        with self.lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.Semaphore(self.per_domain)
+            return self.semaphores[host]
+
+
+def fetch_pages(
+    urls: List[str],
+    max_workers: int = EXTRACT_MAX_WORKERS,
+    per_domain: int = EXTRACT_PER_DOMAIN
+) -> List[Tuple[str, str]]:
+    """
+    Reads all URLs; returns (url, text) pairs in input order. URLs the page cache cannot
+    answer are extracted together in one Tavily batch first; the workers then only scrape
+    what the batch missed.
+    """
+    if not urls:
+        return []
+    domains = DomainLimiter(per_domain)
+    tags = context_snapshot()
+
+    batched = [url for url in urls if needs_extraction(url)]
+    extracted = extract_with_tavily_batch(batched) if batched else {}
+    batched = set(batched)
+
+    def fetch(url: str) -> str:
+        with llm_context(**tags), domains.slot(url), span("fetch_page", "io", url=url) as attrs:
+            text = read_webpage(url, extracted=extracted.get(url), use_tavily=url not in batched)
+            attrs["chars"] = len(text or "")
+            return text
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls)), thread_name_prefix="extract") as pool:
+        pages = list(zip(urls, pool.map(fetch, urls)))
+    print(f"📥 Fetched {len(urls)} page(s) in {time.perf_counter() - started:.1f}s")
+    return pages
+
+
+def readable_pages(pages: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Drops pages that could not be read (read_webpage reports failures as 'Error: ...')."""
+    return [(url, text) for url, text in pages if text and not text.startswith("Error:")]
+
+
+def build_extraction_context(pages: List[Tuple[str, str]], start: int = 1) -> str:
+    """Combined source material for the extractor, one numbered block (S<n>) per readable page."""
+    blocks = [
+        f"### SOURCE S{idx}: {url}\n{text.strip()}"
+        for idx, (url, text) in enumerate(readable_pages(pages), start)
+    ]
+    return "\n\n".join(blocks)
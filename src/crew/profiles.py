@@ -0,0 +1,85 @@
+"""
+=========================================================
+⚡ PIPELINE DEPTH PROFILES (FAST / STANDARD / DEEP)
+=========================================================
+A profile decides how much work a run does: whether the
+planner and fact checker run, how many sources are read,
+iteration caps, and which languages/media are generated.
+Profiles live in config/profiles.yaml; the defaults below
+are used when the file is missing or unreadable.
+"""
+import os
+from typing import Dict, List, Optional
+
+import yaml
+
+PROFILES_PATH = "config/profiles.yaml"
+DEFAULT_PROFILE = os.getenv("RESEARCH_PROFILE", "standard")
+
+ALL_LANGUAGES = ['en', 'hi', 'ar', 'es', 'fr']
+
+_DEFAULTS = {
+    'fast': {
+        'description': "Quick answer: no planning or fact checking, 2 sources, English report only",
+        'planner': False, 'max_sources': 2, 'fact_check': False, 'max_iter': 3, 'tool_max_iter': 2,
+        'languages': [], 'audio': False, 'pdf': False,
+    },
+    'standard': {
+        'description': "Balanced: planned search, 3 fact-checked sources, 5 languages with audio",
+        'planner': True, 'max_sources': 3, 'fact_check': True, 'max_iter': None, 'tool_max_iter': 3,
+        'languages': ALL_LANGUAGES, 'audio': True, 'pdf': True,
+    },
+    'deep': {
+        'description': "Thorough: planned search, 6 fact-checked sources, 5 languages with audio",
+        'planner': True, 'max_sources': 6, 'fact_check': True, 'max_iter': None, 'tool_max_iter': 5,
+        'languages': ALL_LANGUAGES, 'audio': True, 'pdf': True,
+    },
+}
+
+
+class PipelineProfile:
+    """Settings of one named profile (missing keys fall back to 'standard')."""
+
+    def __init__(self, name: str, settings: Dict):
+        merged = {**_DEFAULTS['standard'], **(settings or {})}
+        self.name = name
+        self.description: str = merged['description']
+        self.planner: bool = bool(merged['planner'])
+        self.max_sources: int = max(1, int(merged['max_sources']))
+        self.fact_check: bool = bool(merged['fact_check'])
+        self.max_iter: Optional[int] = merged['max_iter']
+        self.tool_max_iter: int = int(merged['tool_max_iter'])
+        self.languages: List[str] = [lang for lang in (merged['languages'] or []) if lang in ALL_LANGUAGES]
+        self.audio: bool = bool(merged['audio'])
+        self.pdf: bool = bool(merged['pdf'])
+
+    def agent_limits(self) -> Dict:
+        """Extra Agent(...) kwargs; empty when CrewAI's own default cap applies."""
+        return {'max_iter': self.max_iter} if self.max_iter else {}
+
+    def __repr__(self):
+        return f"<PipelineProfile('{self.name}')>"
+
+
+def load_profiles() -> Dict[str, PipelineProfile]:
+    """Profiles from config/profiles.yaml, or the built-in defaults."""
+    try:
+        with open(PROFILES_PATH, 'r') as f:
+            settings = yaml.safe_load(f) or {}
+    except Exception:
+        settings = _DEFAULTS
+    return {name: PipelineProfile(name, values) for name, values in settings.items()}
+
+
+def list_profiles() -> List[str]:
+    return list(load_profiles())
+
+
+def get_profile(name: Optional[str] = None) -> PipelineProfile:
+    """Named profile; unknown or empty names fall back to the default profile."""
+    profiles = load_profiles()
+    name = name or DEFAULT_PROFILE
+    if name not in profiles:
+        print(f"⚠️ Unknown profile '{name}' - using '{DEFAULT_PROFILE}'.")
+        name = DEFAULT_PROFILE
+    return profiles.get(name) or PipelineProfile(name, _DEFAULTS.get(name, {}))
@@ -0,0 +1,127 @@
+"""
+=========================================================
+🔁 INCREMENTAL REFRESH OF AN EXISTING REPORT
+=========================================================
+A refresh run starts from a previous run's checkpoints:
+only content published since that run is searched for, only
+URLs it has not read yet are fetched, and the writer returns
+just the sections that changed, which are merged into the old
+report instead of regenerating it.
+"""
+import math
+import os
+import re
+from datetime import datetime
+from typing import List, Tuple
+
+from src.llm.circuit_breaker import get_breaker
+from src.llm.rate_limiter import get_rate_limiter
+from src.utils.http_session import get_session
+from src.utils.singleflight import normalize_url
+from src.utils.tracing import traced
+from src.utils.replay import replayable
+
+SERPER_URL = "https://google.serper.dev/search"
+
+_SECTION_HEADER = re.compile(r'^##\s+(.+?)\s*$', re.MULTILINE)
+
+
+# ---------- RECENT-ONLY SEARCH ----------
+def _days_since(since: datetime) -> int:
+    return max(1, math.ceil((datetime.utcnow() - since).total_seconds() / 86400))
+
+
+def _serper_time_filter(days: int) -> str:
+    """Google's `tbs` recency filter covering at least `days` days."""
+    if days <= 1:
+        return "qdr:d"
+    if days <= 7:
+        return "qdr:w"
+    if days <= 31:
+        return "qdr:m"
+    return "qdr:y"
+
+
+def _search_tavily(topic: str, days: int, max_results: int) -> List[Tuple[str, str]]:
+    from tavily import TavilyClient
+    api_key = os.getenv("TAVILY_API_KEY")
+    limiter = get_rate_limiter("tavily", api_key)
+    if limiter is not None:
+        limiter.acquire()
+    response = get_breaker("tavily").call(
+        TavilyClient(api_key=api_key).search,
+        query=topic, topic="news", days=days, max_results=max_results
+    )
+    return [(r.get('title', ''), r.get('url')) for r in response.get('results', []) if r.get('url')]
+
+
+def _search_serper(topic: str, days: int, max_results: int) -> List[Tuple[str, str]]:
+    def post():
+        # A search query is idempotent, so 429/5xx answers may be retried
+        response = get_session(retry_post=True).post(
+            SERPER_URL,
+            json={"q": topic, "tbs": _serper_time_filter(days), "num": max_results},
+            headers={"X-API-KEY": os.getenv("SERPER_API_KEY", ""), "Content-Type": "application/json"},
+            timeout=15
+        )
+        response.raise_for_status()
+        return response.json()
+
+    body = get_breaker("serper").call(post)
+    return [(r.get('title', ''), r.get('link')) for r in body.get('organic', []) if r.get('link')]
+
+
+@traced("tool:search_recent", "tool")
+@replayable("tool:search_recent", lambda topic, since, max_results=6: {"topic": topic, "max_results": max_results})
+def search_recent(topic: str, since: datetime, max_results: int = 6) -> str:
+    """Search results published since `since` (Tavily news first, Serper as fallback), one URL per line."""
+    days = _days_since(since)
+    results: List[Tuple[str, str]] = []
+    for search in (_search_tavily, _search_serper):
+        try:
+            results = search(topic, days, max_results)
+        except Exception as e:
+            print(f"⚠️ Recent search via {search.__name__.split('_')[-1]} failed: {e}")
+            continue
+        if results:
+            break
+    print(f"🔁 Found {len(results)} result(s) from the last {days} day(s)")
+    return "\n".join(f"{idx}. {title}\n   URL: {url}" for idx, (title, url) in enumerate(results, 1))
+
+
+def unseen_urls(urls: List[str], seen: List[str]) -> List[str]:
+    """URLs (in order) that were not already read by the previous run."""
+    known = {normalize_url(url) for url in seen}
+    return [url for url in urls if normalize_url(url) not in known]
+
+
+# ---------- SECTION PATCHING ----------
+def split_sections(markdown: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """Splits a report into its preamble (title/intro) and (header, full section text) pairs."""
+    matches = list(_SECTION_HEADER.finditer(markdown or ""))
+    if not matches:
+        return (markdown or "").strip(), []
+    preamble = markdown[:matches[0].start()].strip()
+    sections = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(markdown)
+        sections.append((match.group(1).strip(), markdown[match.start():end].strip()))
+    return preamble, sections
+
+
+def merge_sections(report: str, patch: str) -> str:
+    """
+    Applies a writer patch: sections whose header matches an existing one replace it
+    in place, new sections are appended. Anything outside '##' sections in the patch is ignored.
+    """
+    preamble, sections = split_sections(report)
+    _, patched = split_sections(patch)
+    updates = {header.lower(): text for header, text in patched}
+
+    merged = []
+    for header, text in sections:
+        merged.append(updates.pop(header.lower(), text))
+    merged.extend(text for header, text in patched if header.lower() in updates)
+
+    parts = ([preamble] if preamble else []) + merged
+    return "\n\n".join(parts) + "\n"
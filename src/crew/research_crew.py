@@ -1,140 +1,425 @@
 import os
+import re
+import json
 import time
-import requests
-from crewai import Agent, Crew, Process, Task
+import uuid
+from datetime import datetime
+from typing import Optional
+from crewai import Agent, Task
 from src.llm.multi_provider import (
     get_planner_llm, 
     get_researcher_llm, 
     get_fact_checker_llm, 
-    get_extractor_llm
+    get_extractor_llm,
+    get_summarizer_llm,
+    call_llm,
+    MultiProviderLLM
 )
-from crewai_tools import SerperDevTool
 from src.agents.content_extractor_agent import TavilyContentTool 
+from src.crew.extraction import extract_urls, fetch_pages, readable_pages, build_extraction_context
+from src.crew.dag import run_task_graph
+from src.crew.checkpoint import RunCheckpoints, STAGES, find_latest_report_run
+from src.crew.refresh import search_recent, unseen_urls, merge_sections
+from src.crew.profiles import get_profile
+from src.crew.schemas import (
+    SearchPlan, SourceList, ExtractedFacts, VerifiedFacts, compact_output, parse_output, render_facts, source_id
+)
+from src.agents.research_agent import GuardedSerperDevTool
+from src.llm.response_cache import get_response_cache, make_cache_key
+from src.llm.router import get_router
+from src.llm.rate_limiter import get_rate_limiter, retry_with_exponential_backoff
+from src.llm.circuit_breaker import get_breaker, release_retry_budget, retry_after_seconds, ProviderHTTPError
+from src.utils.http_session import get_session
+from src.llm.token_budget import (
+    compact_context, count_tokens, trim_to_tokens, extractor_page_budget, writer_context_budget, WRITER_MODEL
+)
+from src.llm.telemetry import llm_context, record_llm_call
+from src.llm.hedging import HEDGING_ENABLED, hedged_call, raise_if_cancelled
+from src.utils.singleflight import coalesce
+from src.utils.tracing import span, flush_trace
+from src.utils.replay import replay_call, is_replaying
+
+def _parse_reset(value) -> float:
+    """Parses Groq reset headers such as '2m59.56s', '7.66s' or '120ms' into seconds."""
+    if not value:
+        return 0.0
+    total = 0.0
+    for amount, unit in re.findall(r'([\d.]+)(ms|h|m|s)', value):
+        total += float(amount) * {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}[unit]
+    return total
 
 class ResearchCrew:
-    def __init__(self, topic: str, language: str = 'en', show_logs: bool = True):
+    def __init__(
+        self,
+        topic: str,
+        language: str = 'en',
+        show_logs: bool = True,
+        stream: bool = False,
+        on_token=None,
+        run_id: Optional[str] = None,
+        on_progress=None,
+        refresh_of: Optional[str] = None,
+        profile: Optional[str] = None
+    ):
         self.topic = topic
         self.language = language
         self.show_logs = show_logs
+        # on_token(chunk, text_so_far) is called for every streamed piece of the report
+        self.on_token = on_token
+        self.stream = stream or on_token is not None
+        # on_progress(message) is called as each pipeline stage starts or is restored
+        self.on_progress = on_progress
         self.timestamp = time.strftime("%Y%m%d-%H%M%S")
-        self.report_path = f"output/report_{self.timestamp}.md"
+        # Passing an existing run_id resumes that run from its checkpoints.
+        # The random suffix keeps concurrent runs started in the same second apart.
+        self.run_id = run_id or f"{self.timestamp}-{uuid.uuid4().hex[:6]}"
+        self.report_path = f"output/report_{self.run_id}.md"
+        self.checkpoints = RunCheckpoints(self.run_id, topic, language, profile=profile, refresh_of=refresh_of)
+        # Depth profile (fast / standard / deep, see config/profiles.yaml); a resumed run keeps its own
+        self.profile = get_profile(self.checkpoints.profile)
+        self.checkpoints.profile = self.profile.name
+        # Previous run this one incrementally refreshes (see src/crew/refresh.py); a resumed run keeps its own
+        refresh_of = self.checkpoints.refresh_of
+        self.previous = RunCheckpoints(refresh_of) if refresh_of else None
+        # Sources are extracted/verified in parallel, so this can grow without linear wall time
+        self.max_sources = int(os.getenv("RESEARCH_MAX_SOURCES") or self.profile.max_sources)
+
+    @classmethod
+    def resume(cls, run_id: str, from_stage: Optional[str] = None, **kwargs) -> "ResearchCrew":
+        """
+        Rebuilds a crew for a checkpointed run. With `from_stage`, that stage and
+        everything after it are discarded and recomputed. A refresh run stays a refresh
+        of the same previous run.
+        """
+        checkpoints = RunCheckpoints(run_id)
+        if not checkpoints.completed_stages:
+            raise ValueError(f"No checkpoints found for run '{run_id}'.")
+        if from_stage:
+            if from_stage not in STAGES:
+                raise ValueError(f"Unknown stage '{from_stage}'. Choose from: {', '.join(STAGES)}")
+            checkpoints.reset_from(from_stage)
+        return cls(topic=checkpoints.topic, language=checkpoints.language or 'en', run_id=run_id,
+                   refresh_of=checkpoints.refresh_of, **kwargs)
+
+    @classmethod
+    def refresh(cls, topic: str, language: str = 'en', **kwargs) -> "ResearchCrew":
+        """
+        Crew that refreshes the latest finished report on `topic` in the same language,
+        or a full run if there is none.
+        """
+        previous_run = find_latest_report_run(topic, language)
+        if previous_run is None:
+            print(f"ℹ️ No previous '{language}' report on '{topic}' - running full research.")
+        return cls(topic=topic, language=language, refresh_of=previous_run, **kwargs)
 
     def run(self):
-        # --- 1. DEFINE AGENTS ---
+        # Tag every LLM call made during this run for telemetry
+        with llm_context(run_id=self.run_id):
+            try:
+                with span("research_run", "crew", topic=self.topic, language=self.language, profile=self.profile.name,
+                          refresh_of=self.previous.run_id if self.previous else None):
+                    return self._run()
+            finally:
+                release_retry_budget(self.run_id)
+                flush_trace(self.run_id)
+
+    def _run(self):
+        if self.previous is not None and self.previous.get("report"):
+            return self._run_refresh()
+
+        # Completed stages of a resumed run are loaded from checkpoints instead of re-run
+        if self.checkpoints.completed_stages:
+            print(f"♻️ Resuming run {self.run_id} (done: {', '.join(self.checkpoints.completed_stages)})")
+
+        # --- 1. PLAN ---
+        # We use Groq for the high-level reasoning (profiles without a planner search the topic directly)
+        plan_output = self._stage("plan", self._plan if self.profile.planner else lambda: f"Search for: {self.topic}")
+
+        # --- 2. SEARCH ---
+        print("🚀 Starting Research Phase...")
+        search_output = self._stage("search", lambda: self._search(plan_output))
+
+        # --- 3. CONCURRENT EXTRACTION (all URLs fetched in parallel, no agent tool loop) ---
+        pages = json.loads(self._stage("pages", lambda: json.dumps(
+            readable_pages(fetch_pages(extract_urls(search_output, limit=self.max_sources)))
+        )))
+
+        # --- 4. EXTRACT + VERIFY PER SOURCE (independent branches run in parallel) ---
+        research_result = self._stage("facts", lambda: self._extract_and_verify(pages, search_output))
+        print("✅ Research Phase Complete.")
+
+        # --- 5. DIRECT WRITE PHASE (Bypassing Agents) ---
+        print("✍️  Starting Direct Write Phase...")
         
-        # We use Groq for the high-level reasoning
-        groq_brain = get_planner_llm()
+        try:
+            # Keep the writer prompt inside the token budget (avoids 413 / context-length errors)
+            context_data = self._stage("context", lambda: compact_context(
+                str(research_result),
+                writer_context_budget(),
+                summarize=self._summarize_chunk
+            ))
+            # We explicitly ask Groq to write the report via HTTP
+            final_text = self._stage("report", lambda: self._write_report_checked(context_data))
+            print("✅ Report Written Successfully via Direct Link.")
+        except Exception as e:
+            print(f"❌ Direct Write Failed: {e}")
+            print(f"💾 Research saved - resume with: python run.py --resume {self.run_id}")
+            final_text = f"# Research Facts (Writing Failed)\n\n{research_result}"
+
+        # --- 6. SAVE & RETURN (Triggers PDF/Audio in App.py) ---
+        os.makedirs('output', exist_ok=True)
+        with open(self.report_path, 'w', encoding='utf-8') as f:
+            f.write(str(final_text))
+            
+        return {'report_path': self.report_path, 'run_id': self.run_id}
 
+    def _run_refresh(self):
+        """
+        Incremental run on top of self.previous: recent-only search, unseen URLs only,
+        and a section-level patch of the old report. In a refresh run the 'facts' and
+        'context' checkpoints hold only the new material; 'pages' holds all sources read so far.
+        """
+        previous = self.previous
+        since = previous.last_updated or datetime.utcnow()
+        self._progress(f"🔁 Refreshing run {previous.run_id} (last updated {since:%Y-%m-%d %H:%M} UTC)")
+        previous_report = previous.get("report")
+        previous_pages = json.loads(previous.get("pages") or "[]")
+
+        self._stage("plan", lambda: previous.get("plan") or "")
+        search_output = self._stage("search", lambda: search_recent(self.topic, since, self.max_sources * 2))
+        pages = json.loads(self._stage("pages", lambda: json.dumps(previous_pages + readable_pages(fetch_pages(
+            unseen_urls(extract_urls(search_output, limit=self.max_sources * 2), [url for url, _ in previous_pages])[:self.max_sources]
+        )))))
+        new_pages = pages[len(previous_pages):]
+
+        if not new_pages:
+            self._progress("✅ No new sources since the last run - report unchanged.")
+            final_text = self._stage("report", lambda: previous_report)
+        else:
+            new_facts = self._stage("facts", lambda: self._extract_and_verify(
+                new_pages, search_output, first_index=len(previous_pages) + 1
+            ))
+            context_data = self._stage("context", lambda: compact_context(
+                new_facts, writer_context_budget(), summarize=self._summarize_chunk
+            ))
+            try:
+                final_text = self._stage("report", lambda: merge_sections(
+                    previous_report,
+                    self._write_report_checked(context_data, prompt=self._patch_prompt(previous_report, context_data, since))
+                ))
+                print("✅ Report patched with new findings.")
+            except Exception as e:
+                print(f"❌ Report patch failed: {e}")
+                print(f"💾 Research saved - resume with: python run.py --resume {self.run_id}")
+                final_text = f"{previous_report}\n\n## New Findings (Patch Failed)\n\n{new_facts}"
+
+        os.makedirs('output', exist_ok=True)
+        with open(self.report_path, 'w', encoding='utf-8') as f:
+            f.write(str(final_text))
+
+        return {'report_path': self.report_path, 'run_id': self.run_id, 'refreshed_from': previous.run_id}
+
+    def _patch_prompt(self, previous_report: str, context_data: str, since) -> str:
+        return f"""
+        You are updating an existing research report in {self.language} with NEW findings.
+
+        EXISTING REPORT:
+        {trim_to_tokens(previous_report, writer_context_budget())}
+
+        NEW SOURCE MATERIAL (published since {since:%Y-%m-%d}):
+        {context_data}
+
+        INSTRUCTIONS:
+        1. Output ONLY the sections that must change or be added, each starting with a '## Header' line.
+        2. To update an existing section, reuse its exact header and output the whole updated section.
+        3. Always include a '## What's New' section summarizing the new findings.
+        4. Do not repeat unchanged sections. Output ONLY markdown.
+        """
+
+    def _stage(self, name: str, compute) -> str:
+        """Returns the checkpointed output of `name`, or computes and checkpoints it."""
+        cached = self.checkpoints.get(name)
+        if cached is not None:
+            self._progress(f"♻️ Reusing '{name}' stage from checkpoint.")
+            return cached
+        self._progress(f"⏳ Running '{name}' stage...")
+        with span(f"stage:{name}", "stage") as attrs:
+            cpu_started = time.process_time()
+            output = compute()
+            attrs["cpu_s"] = round(time.process_time() - cpu_started, 4)
+        self.checkpoints.save(name, output)
+        return output
+
+    def _progress(self, message: str) -> None:
+        print(message)
+        if self.on_progress:
+            try:
+                self.on_progress(message)
+            except Exception as e:
+                print(f"⚠️ Progress callback failed: {e}")
+
+    def _plan(self) -> str:
         planner = Agent(
             role="Strategic Planner",
             goal=f"Plan the research for {self.topic}",
             backstory="You are a strategic thinker.",
-            llm=groq_brain,
-            verbose=self.show_logs
+            llm=get_planner_llm(),
+            verbose=self.show_logs,
+            **self.profile.agent_limits()
+        )
+        plan_task = Task(
+            description=f"Plan research for: {self.topic}",
+            expected_output="3-5 web search queries.",
+            output_pydantic=SearchPlan,
+            agent=planner
         )
+        with span("task:plan", "task", agent=planner.role):
+            return compact_output(plan_task.execute_sync(agent=planner))
 
+    def _search(self, plan_output: str) -> str:
         researcher = Agent(
             role="Senior Data Discovery Specialist",
-            goal=f"Find EXACTLY 3 high-quality URLs for {self.topic}",
+            goal=f"Find EXACTLY {self.max_sources} high-quality URLs for {self.topic}",
             backstory="Expert at finding info.",
             llm=get_researcher_llm(),
-            tools=[SerperDevTool()],
-            verbose=self.show_logs
+            tools=[GuardedSerperDevTool()],
+            verbose=self.show_logs,
+            **self.profile.agent_limits()
         )
+        search_task = Task(
+            description=f"Find {self.max_sources} relevant URLs for {self.topic}.\n\nRESEARCH PLAN:\n{plan_output}",
+            expected_output=f"{self.max_sources} sources (url and title).",
+            output_pydantic=SourceList,
+            agent=researcher
+        )
+        with span("task:search", "task", agent=researcher.role):
+            return compact_output(search_task.execute_sync(agent=researcher))
+
+    def _extract_and_verify(self, pages, search_output: str, first_index: int = 1) -> str:
+        """
+        Runs the extract[/verify] branches and renders their structured outputs as compact
+        writer notes. Sources are numbered from `first_index` (refresh runs continue the
+        previous run's numbering).
+        """
+        branch_tasks = []
+        sources = []
+        # One page per extract call: it must fit the smallest model the extractor may be routed to
+        page_budget = extractor_page_budget()
+        if pages:
+            for index, (url, text) in enumerate(pages, first_index):
+                sid = source_id(index)
+                sources.append((sid, url))
+                branch_tasks += self._source_branch(
+                    f"Extract the key facts about {self.topic} from the source material below. "
+                    f"Keep figures, dates and names. This is source {sid}: number its facts {sid}.1, {sid}.2, ...\n\n"
+                    f"SOURCE MATERIAL:\n{build_extraction_context([(url, trim_to_tokens(text, page_budget))], start=index)}",
+                    has_material=True
+                )
+        else:
+            # Nothing could be parsed/fetched: let the agent read the URLs itself
+            branch_tasks += self._source_branch(
+                "Read the URLs in the search results below and extract key facts. "
+                f"Number the sources S{first_index}, S{first_index + 1}, ... in the order listed "
+                "and give each fact the id '<source id>.<n>'.\n\n"
+                f"SEARCH RESULTS:\n{search_output}",
+                has_material=False
+            )
+
+        outputs = run_task_graph(branch_tasks)
+        # Final output of each branch in source order (the verify task, or the extract task without fact checking)
+        per_branch = 2 if self.profile.fact_check else 1
+        verified = []
+        for start in range(0, len(outputs), per_branch):
+            extracted, final = outputs[start], outputs[start + per_branch - 1]
+            if per_branch > 1 and not self._has_verdicts(final):
+                # Verification failed or came back empty: keep the unverified facts rather than none
+                final = extracted
+            if final and final.strip():
+                verified.append(final)
+        if not verified:
+            raise RuntimeError("No source could be extracted and verified.")
+        return render_facts(verified, sources)
 
+    @staticmethod
+    def _has_verdicts(output: Optional[str]) -> bool:
+        """False for a missing/blank verify output or one that validated with no verdicts at all."""
+        if not output or not output.strip():
+            return False
+        verified = parse_output(output, VerifiedFacts)
+        return verified is None or bool(verified.verdicts)
+
+    def _write_report_checked(self, context_data: str, prompt: Optional[str] = None) -> str:
+        """Writer call that raises on failure, so an error message is never checkpointed as a report."""
+        report = self._write_report_directly(context_data, prompt=prompt)
+        if str(report).startswith("Error"):
+            raise RuntimeError(report)
+        return report
+
+    def _source_branch(self, extract_description: str, has_material: bool):
+        """
+        Extract -> verify task pair for one source (just the extract task when the profile
+        skips fact checking). Each branch gets its own agents because CrewAI agents keep
+        per-task executor state and branches run concurrently.
+        """
         extractor = Agent(
             role="Content Extractor",
             goal="Extract key facts from the provided URLs.",
             backstory="Efficient reading machine.",
             llm=get_extractor_llm(),
-            tools=[TavilyContentTool()],
+            # One shot when the page was pre-fetched; tool-using agent as a fallback
+            tools=[] if has_material else [
+                TavilyContentTool(page_budget=extractor_page_budget(self.profile.tool_max_iter))
+            ],
             verbose=self.show_logs,
-            max_iter=3
+            max_iter=1 if has_material else self.profile.tool_max_iter
+        )
+        extract_task = Task(
+            description=extract_description,
+            expected_output="Fact records: id and one self-contained claim each.",
+            output_pydantic=ExtractedFacts,
+            agent=extractor
         )
+        if not self.profile.fact_check:
+            return [extract_task]
 
         fact_checker = Agent(
             role="Chief Fact Verification Officer",
             goal="Verify extracted data.",
             backstory="Skeptical fact checker.",
             llm=get_fact_checker_llm(),
-            verbose=self.show_logs
-        )
-
-        # ❌ WRITER AGENT REMOVED (We will write manually to avoid errors)
-
-        # --- 2. DEFINE TASKS ---
-        plan_task = Task(
-            description=f"Plan research for: {self.topic}",
-            expected_output="Search queries list.",
-            agent=planner
-        )
-
-        search_task = Task(
-            description=f"Find 3 relevant URLs for {self.topic}.",
-            expected_output="List of 3 URLs.",
-            agent=researcher,
-            context=[plan_task]
-        )
-
-        extract_task = Task(
-            description="Read the 3 URLs and extract key facts.",
-            expected_output="Summarized facts.",
-            agent=extractor,
-            context=[search_task]
+            verbose=self.show_logs,
+            **self.profile.agent_limits()
         )
-
         verify_task = Task(
-            description="Verify data and output a clean list of facts.",
-            expected_output="Verified facts.",
+            description=(
+                "Verify each extracted fact. Keep its id; mark it confirmed, corrected (give the "
+                "corrected claim), unverified, or rejected if it is wrong or off-topic."
+            ),
+            expected_output="One verdict per fact id.",
+            output_pydantic=VerifiedFacts,
             agent=fact_checker,
             context=[extract_task]
         )
+        return [extract_task, verify_task]
 
-        # --- 3. RUN CREW ---
-        crew = Crew(
-            agents=[planner, researcher, extractor, fact_checker],
-            tasks=[plan_task, search_task, extract_task, verify_task],
-            process=Process.sequential,
-            verbose=True,
-            # 🔥 CRITICAL FIX: Disable internal planning to stop "Task Execution Planner" crash
-            planning=False, 
-            # Force manager to Groq just in case
-            manager_llm=groq_brain 
+    def _summarize_chunk(self, chunk: str, max_tokens: int) -> str:
+        """Map step of context compaction: condense one chunk of research notes."""
+        prompt = (
+            f"Condense these research notes about '{self.topic}' into at most {max_tokens} tokens. "
+            "Keep every concrete fact, figure, date, name and source URL. Drop filler.\n\n"
+            f"{chunk}"
         )
+        return call_llm(get_summarizer_llm(), [{"role": "user", "content": prompt}])
 
-        print("🚀 Starting Research Phase...")
-        research_result = crew.kickoff()
-        print("✅ Research Phase Complete.")
-
-        # --- 4. DIRECT WRITE PHASE (Bypassing Agents) ---
-        print("✍️  Starting Direct Write Phase...")
-        
-        try:
-            # We explicitly ask Groq to write the report via HTTP
-            final_text = self._write_report_directly(str(research_result))
-            print("✅ Report Written Successfully via Direct Link.")
-        except Exception as e:
-            print(f"❌ Direct Write Failed: {e}")
-            final_text = f"# Research Facts (Writing Failed)\n\n{research_result}"
-
-        # --- 5. SAVE & RETURN (Triggers PDF/Audio in App.py) ---
-        os.makedirs('output', exist_ok=True)
-        with open(self.report_path, 'w', encoding='utf-8') as f:
-            f.write(str(final_text))
-            
-        return {'report_path': self.report_path}
-
-    def _write_report_directly(self, context_data):
+    def _write_report_directly(self, context_data, prompt: Optional[str] = None):
         """
-        Directly hits the Groq API to write the report.
+        Directly hits the Groq API to write the report (or, with `prompt`, any writer task).
         Bypasses all CrewAI/LiteLLM routing logic.
         """
         api_key = os.getenv("GROQ_API_KEY")
         if not api_key: return "Error: No GROQ_API_KEY found."
 
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        
-        prompt = f"""
+        prompt = prompt or f"""
         You are a professional technical writer.
         Write a detailed report in {self.language}.
         
@@ -150,7 +435,7 @@ class ResearchCrew:
         """
 
         payload = {
-            "model": "llama-3.3-70b-versatile",
+            "model": WRITER_MODEL,
             "messages": [
                 {"role": "system", "content": "You are a helpful report writer."},
                 {"role": "user", "content": prompt}
@@ -158,11 +443,162 @@ class ResearchCrew:
             "temperature": 0.7
         }
         
+        # Serve repeated/retried topics from the response cache
+        cache = get_response_cache()
+        cache_key = make_cache_key("groq", payload["model"], payload["temperature"], payload["messages"])
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached and cached.strip():
+                print("💾 Report served from LLM response cache.")
+                if self.on_token:
+                    self.on_token(cached, cached)
+                return cached
+
+        backup = self._hedge_backup_llm() if HEDGING_ENABLED and not self.stream else None
+
+        def generate():
+            if backup is None:
+                return self._request_groq_report(payload, prompt, api_key)
+            # Race Groq against the next healthy writer provider once Groq passes its p95
+            content, winner = hedged_call(
+                "writer",
+                lambda cancel: self._request_groq_report(payload, prompt, api_key, cancel),
+                lambda cancel: call_llm(backup, payload["messages"])
+            )
+            if winner == "backup":
+                print("🏁 Report written by the hedge provider.")
+            return content
+
+        try:
+            if self.stream:
+                # Streaming writes into this run's own report file, so it is never shared
+                content = generate()
+            else:
+                # Concurrent sessions writing the same report share one generation
+                content = coalesce(f"writer:{cache_key}", generate)
+        except Exception as e:
+            return f"Error generating report: {e}"
+
+        if not (content or "").strip():
+            # e.g. an empty answer from the hedge provider
+            return "Error generating report: empty response"
+        if cache is not None:
+            cache.set(cache_key, content, "groq", payload["model"])
+        return content
+
+    def _hedge_backup_llm(self):
+        """Next-best non-Groq provider for the writer role, or None if there is none."""
+        factory = MultiProviderLLM(temperature=0.7)
+        for provider in get_router().rank("writer", factory.providers_available):
+            if provider != "groq":
+                return getattr(factory, provider)()
+        return None
+
+    @retry_with_exponential_backoff(max_attempts=3, initial_wait=2, max_wait=30)
+    def _request_groq_report(self, payload, prompt, api_key, cancel=None):
+        """
+        Groq completion behind the 'groq' breaker, retried within the run's retry budget.
+        `cancel` (from hedged_call) stops it before the rate-limit wait or the request.
+        """
+        with span("llm:groq", "llm", model=payload["model"], role="writer", stream=self.stream):
+            content = replay_call(
+                "llm", {"messages": payload["messages"]},
+                lambda: get_breaker("groq").call(self._post_groq_report, payload, prompt, api_key, cancel)
+            )
+        if is_replaying() and self.on_token:
+            self.on_token(content, content)
+        return content
+
+    def _post_groq_report(self, payload, prompt, api_key, cancel=None):
+        """One Groq chat completion (optionally streamed). Raises on HTTP errors."""
+        url = "https://api.groq.com/openai/v1/chat/completions"
+        payload = dict(payload)
         headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+        if self.stream:
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
 
-        response = requests.post(url, json=payload, headers=headers)
-        
-        if response.status_code == 200:
-            return response.json()['choices'][0]['message']['content']
+        raise_if_cancelled(cancel)
+        limiter = get_rate_limiter("groq", api_key)
+        if limiter is not None:
+            limiter.acquire()
+        raise_if_cancelled(cancel)
+
+        router = get_router()
+        started = time.perf_counter()
+        # No transport-level retries here: the decorator above retries within the run budget
+        response = get_session(retries=False).post(url, json=payload, headers=headers, stream=self.stream, timeout=(10, 180))
+
+        # Feed remaining quota back into the provider router
+        remaining = response.headers.get("x-ratelimit-remaining-requests")
+        if remaining is not None and remaining.isdigit():
+            router.update_quota("groq", int(remaining), _parse_reset(response.headers.get("x-ratelimit-reset-requests")))
+
+        if response.status_code != 200:
+            elapsed = time.perf_counter() - started
+            router.record_failure("groq", elapsed)
+            record_llm_call("groq", payload["model"], elapsed, role="writer", success=False, error=response.text)
+            if response.status_code == 429:
+                router.update_quota("groq", 0, retry_after_seconds(response.headers) or 0.0)
+            raise ProviderHTTPError(response)
+
+        usage = {}
+        ttft = None
+        if self.stream:
+            content, usage, ttft = self._consume_report_stream(response, started)
         else:
-            return f"Error generating report: {response.text}"
\ No newline at end of file
+            body = response.json()
+            content = body['choices'][0]['message']['content']
+            usage = body.get('usage') or {}
+        elapsed = time.perf_counter() - started
+        if not (content or "").strip():
+            # A stream that ended without a single delta is a failed call, not an empty report:
+            # raising sends it through the retry/backup path and keeps it out of the cache
+            router.record_failure("groq", elapsed)
+            record_llm_call("groq", payload["model"], elapsed, role="writer", success=False, error="empty completion")
+            raise RuntimeError("Groq returned an empty report")
+        router.record_success("groq", elapsed)
+        record_llm_call(
+            "groq", payload["model"], elapsed,
+            prompt_tokens=usage.get("prompt_tokens") or count_tokens(prompt),
+            completion_tokens=usage.get("completion_tokens") or count_tokens(content),
+            ttft=ttft,
+            role="writer"
+        )
+        return content
+
+    def _consume_report_stream(self, response, started):
+        """
+        Reads the SSE token stream, appending each chunk to the report file as it
+        arrives so the UI (and anyone tailing the file) sees content immediately.
+        Returns (text, usage, time_to_first_token).
+        """
+        text = ""
+        usage = {}
+        ttft = None
+        os.makedirs(os.path.dirname(self.report_path), exist_ok=True)
+        with open(self.report_path, 'w', encoding='utf-8') as f:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    event = json.loads(data)
+                except ValueError:
+                    continue
+                # Groq reports usage on the final chunk (top-level or under x_groq)
+                usage = event.get('usage') or (event.get('x_groq') or {}).get('usage') or usage
+                choices = event.get('choices') or []
+                chunk = choices[0].get('delta', {}).get('content') if choices else None
+                if not chunk:
+                    continue
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                text += chunk
+                f.write(chunk)
+                f.flush()
+                if self.on_token:
+                    self.on_token(chunk, text)
+        return text, usage, ttft
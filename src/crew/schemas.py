@@ -0,0 +1,106 @@
+"""
+=========================================================
+🧾 STRUCTURED TASK OUTPUTS (PLAN → SOURCES → FACTS → VERDICTS)
+=========================================================
+Every crew task declares a pydantic `output_pydantic` schema,
+so downstream tasks receive compact JSON (URL lists, fact
+records with source ids, verification verdicts) instead of
+re-reading prose. The writer gets the verified facts rendered
+as one short line each, grouped under a numbered source list.
+"""
+import re
+from typing import List, Literal, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, Field, ValidationError
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+class SearchPlan(BaseModel):
+    queries: List[str] = Field(..., description="3-5 focused web search queries")
+
+
+class Source(BaseModel):
+    url: str
+    title: str = ""
+
+
+class SourceList(BaseModel):
+    sources: List[Source] = Field(..., description="Relevant sources, best first")
+
+
+class FactRecord(BaseModel):
+    id: str = Field(..., description="'<source id>.<n>', e.g. 'S2.3'")
+    claim: str = Field(..., description="One self-contained fact: keep figures, dates and names")
+
+
+class ExtractedFacts(BaseModel):
+    facts: List[FactRecord]
+
+
+class Verdict(BaseModel):
+    id: str = Field(..., description="Id of the fact being judged")
+    status: Literal["confirmed", "corrected", "unverified", "rejected"]
+    claim: str = Field(..., description="The fact as it should be reported (corrected if needed)")
+
+
+class VerifiedFacts(BaseModel):
+    verdicts: List[Verdict]
+
+
+# ---------- SERIALIZATION ----------
+def compact_output(task_output) -> str:
+    """A task's output for downstream context: minified schema JSON, or the raw text if it did not validate."""
+    structured = getattr(task_output, "pydantic", None)
+    if isinstance(structured, BaseModel):
+        return structured.model_dump_json(exclude_defaults=True)
+    return task_output.raw
+
+
+def parse_output(text: Optional[str], model: Type[Model]) -> Optional[Model]:
+    """Validates `text` (or the first JSON object inside it) against `model`; None if it does not fit."""
+    if not text:
+        return None
+    candidates = [text]
+    match = re.search(r'\{.*\}', text, re.DOTALL)
+    if match and match.group(0) != text:
+        candidates.append(match.group(0))
+    for candidate in candidates:
+        try:
+            return model.model_validate_json(candidate)
+        except (ValidationError, ValueError):
+            continue
+    return None
+
+
+def source_id(index: int) -> str:
+    return f"S{index}"
+
+
+def render_facts(branch_outputs: List[str], sources: List[Tuple[str, str]]) -> str:
+    """
+    Writer-ready notes: a numbered source list plus one line per fact, tagged with its
+    source id and verdict. Rejected facts are dropped; branches whose output did not
+    validate are kept as-is, so nothing a model wrote is silently lost.
+    """
+    lines, unstructured = [], []
+    for output in branch_outputs:
+        verified = parse_output(output, VerifiedFacts)
+        if verified is not None:
+            for verdict in verified.verdicts:
+                if verdict.status != "rejected":
+                    lines.append(f"- [{verdict.id.split('.')[0]}] {verdict.claim} ({verdict.status})")
+            continue
+        extracted = parse_output(output, ExtractedFacts)
+        if extracted is not None:
+            lines.extend(f"- [{fact.id.split('.')[0]}] {fact.claim}" for fact in extracted.facts)
+            continue
+        unstructured.append(output)
+
+    parts = []
+    if sources:
+        parts.append("SOURCES:\n" + "\n".join(f"[{sid}] {url}" for sid, url in sources))
+    if lines:
+        parts.append("FACTS:\n" + "\n".join(lines))
+    parts.extend(unstructured)
+    return "\n\n".join(parts)
@@ -1,16 +1,33 @@
-from .models import Base, ResearchHistory, engine, SessionLocal
+from .models import Base, ResearchHistory, LLMCallRecord, StageCheckpoint, ResearchJob, engine, SessionLocal
 from .crud import (
     create_research_record,
     get_research_by_id,
     get_all_research,
     get_research_by_topic,
     delete_research_record,
-    update_research_status
+    update_research_status,
+    create_llm_call_record,
+    get_llm_calls,
+    save_stage_checkpoint,
+    get_stage_checkpoints,
+    delete_stage_checkpoints,
+    get_checkpointed_runs,
+    get_latest_completed_run,
+    create_job,
+    claim_next_job,
+    update_job,
+    append_job_event,
+    get_job,
+    get_jobs,
+    requeue_stale_jobs
 )
 
 __all__ = [
     'Base',
     'ResearchHistory',
+    'LLMCallRecord',
+    'StageCheckpoint',
+    'ResearchJob',
     'engine',
     'SessionLocal',
     'create_research_record',
@@ -18,5 +35,19 @@ __all__ = [
     'get_all_research',
     'get_research_by_topic',
     'delete_research_record',
-    'update_research_status'
+    'update_research_status',
+    'create_llm_call_record',
+    'get_llm_calls',
+    'save_stage_checkpoint',
+    'get_stage_checkpoints',
+    'delete_stage_checkpoints',
+    'get_checkpointed_runs',
+    'get_latest_completed_run',
+    'create_job',
+    'claim_next_job',
+    'update_job',
+    'append_job_event',
+    'get_job',
+    'get_jobs',
+    'requeue_stale_jobs'
 ]
\ No newline at end of file
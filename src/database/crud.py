@@ -1,7 +1,9 @@
 from sqlalchemy.orm import Session
-from .models import ResearchHistory, SessionLocal
-from datetime import datetime
-from typing import List, Optional
+from sqlalchemy import func
+from .models import ResearchHistory, LLMCallRecord, StageCheckpoint, ResearchJob, SessionLocal
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 
 def get_db():
     """Get database session."""
@@ -108,4 +110,235 @@ def delete_research_record(record_id: int) -> bool:
             return True
         return False
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def create_llm_call_record(**fields) -> LLMCallRecord:
+    """Persist one LLM call's telemetry."""
+    db = SessionLocal()
+    try:
+        record = LLMCallRecord(created_at=datetime.utcnow(), **fields)
+        db.add(record)
+        db.commit()
+        db.refresh(record)
+        return record
+    finally:
+        db.close()
+
+def get_llm_calls(
+    since: Optional[datetime] = None,
+    run_id: Optional[str] = None,
+    limit: int = 5000
+) -> List[LLMCallRecord]:
+    """Get recent LLM call telemetry, newest first."""
+    db = SessionLocal()
+    try:
+        query = db.query(LLMCallRecord)
+        if since:
+            query = query.filter(LLMCallRecord.created_at >= since)
+        if run_id:
+            query = query.filter(LLMCallRecord.run_id == run_id)
+        return query.order_by(LLMCallRecord.created_at.desc()).limit(limit).all()
+    finally:
+        db.close()
+
+def save_stage_checkpoint(
+    run_id: str,
+    stage: str,
+    output: str,
+    topic: Optional[str] = None,
+    language: Optional[str] = None,
+    profile: Optional[str] = None,
+    refresh_of: Optional[str] = None
+) -> StageCheckpoint:
+    """Create or overwrite the checkpoint of one run stage."""
+    db = SessionLocal()
+    try:
+        record = db.query(StageCheckpoint).filter(
+            StageCheckpoint.run_id == run_id, StageCheckpoint.stage == stage
+        ).first()
+        if record is None:
+            record = StageCheckpoint(run_id=run_id, stage=stage)
+            db.add(record)
+        record.output = output
+        record.topic = topic
+        record.language = language
+        record.profile = profile
+        record.refresh_of = refresh_of
+        record.created_at = datetime.utcnow()
+        db.commit()
+        db.refresh(record)
+        return record
+    finally:
+        db.close()
+
+def get_stage_checkpoints(run_id: str) -> List[StageCheckpoint]:
+    """Get all checkpoints of a run, oldest first."""
+    db = SessionLocal()
+    try:
+        return db.query(StageCheckpoint).filter(
+            StageCheckpoint.run_id == run_id
+        ).order_by(StageCheckpoint.created_at).all()
+    finally:
+        db.close()
+
+def delete_stage_checkpoints(run_id: str, stages: List[str]) -> int:
+    """Delete the given stages of a run; returns how many rows were removed."""
+    db = SessionLocal()
+    try:
+        deleted = db.query(StageCheckpoint).filter(
+            StageCheckpoint.run_id == run_id, StageCheckpoint.stage.in_(stages)
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+    finally:
+        db.close()
+
+def get_checkpointed_runs(limit: int = 20) -> List[Dict]:
+    """Recent runs that have checkpoints, newest first, with their completed stages."""
+    db = SessionLocal()
+    try:
+        latest = db.query(
+            StageCheckpoint.run_id, func.max(StageCheckpoint.created_at).label('updated_at')
+        ).group_by(StageCheckpoint.run_id).order_by(func.max(StageCheckpoint.created_at).desc()).limit(limit).all()
+        runs = []
+        for run_id, updated_at in latest:
+            rows = db.query(StageCheckpoint).filter(StageCheckpoint.run_id == run_id).all()
+            runs.append({
+                'run_id': run_id,
+                'topic': rows[0].topic if rows else None,
+                'language': rows[0].language if rows else 'en',
+                'profile': rows[0].profile if rows else None,
+                'refresh_of': rows[0].refresh_of if rows else None,
+                'stages': [row.stage for row in rows],
+                'updated_at': updated_at
+            })
+        return runs
+    finally:
+        db.close()
+
+def get_latest_completed_run(topic: str, language: Optional[str] = None) -> Optional[str]:
+    """
+    Run id of the newest run of this topic (case-insensitive) that has a 'report'
+    checkpoint, restricted to reports written in `language` when given.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(StageCheckpoint).filter(
+            StageCheckpoint.stage == 'report',
+            func.lower(StageCheckpoint.topic) == topic.strip().lower()
+        )
+        if language:
+            query = query.filter(StageCheckpoint.language == language)
+        record = query.order_by(StageCheckpoint.created_at.desc()).first()
+        return record.run_id if record else None
+    finally:
+        db.close()
+
+def create_job(
+    topic: str,
+    language: str = 'en',
+    run_id: Optional[str] = None,
+    refresh_of: Optional[str] = None,
+    profile: Optional[str] = None,
+    audio: Optional[bool] = None
+) -> ResearchJob:
+    """Queue a new research job (optionally continuing a run, or refreshing a previous one)."""
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        job = ResearchJob(topic=topic, language=language, status='queued', run_id=run_id,
+                          refresh_of=refresh_of, profile=profile, audio=audio, events='[]',
+                          created_at=now, updated_at=now)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+    finally:
+        db.close()
+
+def claim_next_job(worker: str) -> Optional[ResearchJob]:
+    """Atomically move the oldest queued job to 'running' for this worker."""
+    db = SessionLocal()
+    try:
+        while True:
+            job = db.query(ResearchJob).filter(
+                ResearchJob.status == 'queued'
+            ).order_by(ResearchJob.created_at, ResearchJob.id).first()
+            if job is None:
+                return None
+            now = datetime.utcnow()
+            # Conditional update: only one worker (thread or process) wins the job
+            claimed = db.query(ResearchJob).filter(
+                ResearchJob.id == job.id, ResearchJob.status == 'queued'
+            ).update({'status': 'running', 'worker': worker, 'started_at': now, 'updated_at': now},
+                     synchronize_session=False)
+            db.commit()
+            if claimed:
+                return db.query(ResearchJob).filter(ResearchJob.id == job.id).first()
+    finally:
+        db.close()
+
+def update_job(job_id: int, **fields) -> Optional[ResearchJob]:
+    """Update job columns (status, run_id, report_path, assets, error, ...)."""
+    db = SessionLocal()
+    try:
+        job = db.query(ResearchJob).filter(ResearchJob.id == job_id).first()
+        if job:
+            for key, value in fields.items():
+                setattr(job, key, value)
+            job.updated_at = datetime.utcnow()
+            if fields.get('status') in ('completed', 'failed'):
+                job.finished_at = job.updated_at
+            db.commit()
+            db.refresh(job)
+        return job
+    finally:
+        db.close()
+
+def append_job_event(job_id: int, message: str) -> None:
+    """Record a progress event; the latest one is also kept in `progress`."""
+    db = SessionLocal()
+    try:
+        job = db.query(ResearchJob).filter(ResearchJob.id == job_id).first()
+        if job:
+            now = datetime.utcnow()
+            events = json.loads(job.events or '[]')
+            events.append({'time': now.isoformat(), 'message': message})
+            job.events = json.dumps(events)
+            job.progress = message[:500]
+            job.updated_at = now
+            db.commit()
+    finally:
+        db.close()
+
+def get_job(job_id: int) -> Optional[ResearchJob]:
+    """Get job by ID."""
+    db = SessionLocal()
+    try:
+        return db.query(ResearchJob).filter(ResearchJob.id == job_id).first()
+    finally:
+        db.close()
+
+def get_jobs(limit: int = 50, status: Optional[str] = None) -> List[ResearchJob]:
+    """Get recent jobs, newest first."""
+    db = SessionLocal()
+    try:
+        query = db.query(ResearchJob)
+        if status:
+            query = query.filter(ResearchJob.status == status)
+        return query.order_by(ResearchJob.created_at.desc()).limit(limit).all()
+    finally:
+        db.close()
+
+def requeue_stale_jobs(stale_after_seconds: int) -> int:
+    """Put 'running' jobs whose worker went silent (e.g. the process died) back in the queue."""
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after_seconds)
+        requeued = db.query(ResearchJob).filter(
+            ResearchJob.status == 'running', ResearchJob.updated_at < cutoff
+        ).update({'status': 'queued', 'worker': None}, synchronize_session=False)
+        db.commit()
+        return requeued
+    finally:
+        db.close()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Float
+from sqlalchemy import create_engine, inspect, text, Column, Integer, String, DateTime, Text, Float, Boolean, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -34,5 +34,86 @@ class ResearchHistory(Base):
     def __repr__(self):
         return f"<ResearchHistory(id={self.id}, topic='{self.topic}', status='{self.status}')>"
 
+class LLMCallRecord(Base):
+    """Model for per-call LLM telemetry (tokens, latency, provider, cost)."""
+    __tablename__ = "llm_calls"
+
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    run_id = Column(String(100), index=True)
+    role = Column(String(50), index=True)
+    provider = Column(String(50), index=True)
+    model = Column(String(100))
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    latency_seconds = Column(Float)
+    ttft_seconds = Column(Float)
+    retries = Column(Integer, default=0)
+    success = Column(Boolean, default=True)
+    error = Column(String(500))
+    cost_usd = Column(Float, default=0.0)
+
+    def __repr__(self):
+        return f"<LLMCallRecord(id={self.id}, role='{self.role}', provider='{self.provider}', latency={self.latency_seconds})>"
+
+class StageCheckpoint(Base):
+    """Model for persisted ResearchCrew stage outputs, so failed runs can resume."""
+    __tablename__ = "stage_checkpoints"
+    __table_args__ = (UniqueConstraint('run_id', 'stage', name='uq_checkpoint_run_stage'),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(String(100), nullable=False, index=True)
+    stage = Column(String(50), nullable=False)
+    topic = Column(String(500))
+    language = Column(String(10), default='en')
+    profile = Column(String(20))         # pipeline depth profile (fast / standard / deep)
+    refresh_of = Column(String(100))     # previous run this one incrementally refreshes, if any
+    output = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<StageCheckpoint(run_id='{self.run_id}', stage='{self.stage}')>"
+
+class ResearchJob(Base):
+    """Model for queued research runs executed by background workers."""
+    __tablename__ = "research_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    topic = Column(String(500), nullable=False)
+    language = Column(String(10), default='en')
+    status = Column(String(20), default='queued', index=True)  # queued, running, completed, failed
+    run_id = Column(String(100), index=True)
+    refresh_of = Column(String(100))     # previous run to refresh incrementally, if any
+    profile = Column(String(20))         # pipeline depth profile (fast / standard / deep)
+    audio = Column(Boolean)              # TTS override; NULL follows the profile
+    progress = Column(String(500))       # latest progress message
+    events = Column(Text, default='[]')  # JSON list of {"time", "message"}
+    report_path = Column(String(500))
+    assets = Column(Text)                # JSON of the multilingual assets
+    error = Column(Text)
+    worker = Column(String(100))
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<ResearchJob(id={self.id}, topic='{self.topic}', status='{self.status}')>"
+
+def _add_missing_columns():
+    """create_all() never alters existing tables, so add new nullable columns to older databases."""
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                    ))
+
 # Create tables
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+Base.metadata.create_all(bind=engine)
+_add_missing_columns()
\ No newline at end of file
@@ -2,6 +2,10 @@ from notion_client import Client
 from notion_client.errors import APIResponseError
 import os
 from typing import Optional
+from src.utils.http_session import create_httpx_client
+
+# Dedicated keep-alive pool: notion-client sets its own base_url/auth on the client
+_notion_http = None
 
 def setup_notion() -> Optional[Client]:
     """Setup Notion client with API key."""
@@ -12,7 +16,10 @@ def setup_notion() -> Optional[Client]:
         return None
     
     try:
-        client = Client(auth=api_key)
+        global _notion_http
+        if _notion_http is None:
+            _notion_http = create_httpx_client()
+        client = Client(auth=api_key, client=_notion_http)
         # Test connection
         client.users.me()
         return client
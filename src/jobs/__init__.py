@@ -0,0 +1,4 @@
+from src.database.crud import get_job
+from .queue import start_workers, stop_workers, submit_job, job_assets, job_events
+
+__all__ = ['start_workers', 'stop_workers', 'submit_job', 'get_job', 'job_assets', 'job_events']
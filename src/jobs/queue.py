@@ -0,0 +1,166 @@
+"""
+=========================================================
+🧵 BACKGROUND RESEARCH JOB QUEUE
+=========================================================
+Research runs are queued in the `research_jobs` table and
+executed by worker threads, so the Streamlit script thread
+only submits and polls. Jobs survive browser refreshes, and a
+job whose worker died is requeued and resumes from its stage
+checkpoints.
+"""
+import json
+import os
+import threading
+from typing import List, Optional
+
+from src.llm.telemetry import llm_context
+from src.utils.tracing import span, flush_trace
+from src.database.crud import (
+    create_job,
+    claim_next_job,
+    update_job,
+    append_job_event,
+    requeue_stale_jobs
+)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+# A running job with no progress for this long is assumed orphaned (its process died)
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "1800"))
+# Attempts per job status write (SQLite may briefly report "database is locked")
+JOB_UPDATE_ATTEMPTS = int(os.getenv("JOB_UPDATE_ATTEMPTS", "3"))
+
+
+class JobWorker(threading.Thread):
+    """Claims queued jobs one at a time and runs them to completion."""
+
+    def __init__(self, index: int, stop_event: threading.Event):
+        super().__init__(name=f"research-worker-{os.getpid()}-{index}", daemon=True)
+        self.stop_event = stop_event
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                job = claim_next_job(self.name)
+            except Exception as e:
+                print(f"⚠️ Job queue unavailable: {e}")
+                job = None
+            if job is None:
+                self.stop_event.wait(JOB_POLL_INTERVAL)
+                continue
+            try:
+                self.process(job)
+            except Exception as e:
+                # Never let one job take the worker down; a job left 'running' is requeued when stale
+                print(f"⚠️ {self.name} could not finish job #{job.id}: {e}")
+
+    def process(self, job):
+        # Imported lazily: the crew pulls in every agent/LLM module
+        from src.crew.research_crew import ResearchCrew
+        from src.utils.media_factory import generate_multilingual_assets
+
+        def progress(message: str) -> None:
+            try:
+                append_job_event(job.id, message)
+            except Exception as e:
+                print(f"⚠️ Job event not saved: {e}")
+
+        def save(**fields) -> None:
+            for attempt in range(1, JOB_UPDATE_ATTEMPTS + 1):
+                try:
+                    update_job(job.id, **fields)
+                    return
+                except Exception as e:
+                    if attempt == JOB_UPDATE_ATTEMPTS:
+                        print(f"⚠️ Job #{job.id} status not saved: {e}")
+                        return
+                    self.stop_event.wait(attempt)
+
+        progress(f"🚀 Picked up by {self.name}")
+        try:
+            # Reusing the job's run_id makes a requeued job resume from its checkpoints
+            crew = ResearchCrew(
+                topic=job.topic,
+                language=job.language,
+                show_logs=False,
+                stream=True,
+                run_id=job.run_id,
+                on_progress=progress,
+                refresh_of=job.refresh_of,
+                profile=job.profile
+            )
+            save(run_id=crew.run_id, report_path=crew.report_path)
+            results = crew.run()
+
+            profile = crew.profile
+            # The submitter's "voice summary" choice wins over the profile default
+            audio = profile.audio if job.audio is None else job.audio
+            if profile.languages:
+                progress("🎧 Generating multilingual audio & reports..." if audio
+                         else "🌐 Generating multilingual reports...")
+                # Same run id, so translation/TTS spans land in the run's trace
+                with llm_context(run_id=crew.run_id), span("multilingual_assets", "media"):
+                    assets = generate_multilingual_assets(
+                        results['report_path'], languages=profile.languages, audio=audio,
+                        run_id=crew.run_id
+                    )
+                flush_trace(crew.run_id)
+            else:
+                progress(f"⚡ '{profile.name}' profile: skipping multilingual assets.")
+                assets = {}
+            save(status='completed', report_path=results['report_path'],
+                 assets=json.dumps(assets or {}, ensure_ascii=False))
+            progress("✅ Job completed.")
+        except Exception as e:
+            save(status='failed', error=str(e))
+            progress(f"❌ Job failed: {e}")
+
+
+# Global worker pool (one per process)
+_workers: List[JobWorker] = []
+_stop_event = threading.Event()
+_workers_lock = threading.Lock()
+
+
+def start_workers(count: int = JOB_WORKERS) -> int:
+    """Starts the worker pool once per process (safe to call on every Streamlit rerun)."""
+    with _workers_lock:
+        if not _workers:
+            requeued = requeue_stale_jobs(JOB_STALE_SECONDS)
+            if requeued:
+                print(f"♻️ Requeued {requeued} orphaned job(s).")
+            for index in range(max(1, count)):
+                worker = JobWorker(index, _stop_event)
+                worker.start()
+                _workers.append(worker)
+            print(f"🧵 Started {len(_workers)} research worker(s).")
+        return len(_workers)
+
+
+def stop_workers() -> None:
+    _stop_event.set()
+
+
+def submit_job(
+    topic: str,
+    language: str = 'en',
+    run_id: Optional[str] = None,
+    refresh_of: Optional[str] = None,
+    profile: Optional[str] = None,
+    audio: Optional[bool] = None
+) -> int:
+    """
+    Queues a research run and returns its job id. With `run_id` the job resumes that run;
+    with `refresh_of` it incrementally refreshes that previous run's report. `profile`
+    picks the pipeline depth (see config/profiles.yaml); `audio` overrides its TTS setting.
+    """
+    return create_job(topic, language, run_id=run_id, refresh_of=refresh_of, profile=profile, audio=audio).id
+
+
+def job_assets(job) -> Optional[dict]:
+    """Decoded multilingual assets of a completed job."""
+    return json.loads(job.assets) if job and job.assets else None
+
+
+def job_events(job) -> List[dict]:
+    return json.loads(job.events or '[]') if job else []
@@ -1,5 +1,6 @@
 from .multi_provider import (
     MultiProviderLLM,
+    get_routed_llm,
     get_planner_llm,
     get_researcher_llm,
     get_extractor_llm,
@@ -7,13 +8,17 @@ from .multi_provider import (
     get_summarizer_llm,
     get_writer_llm
 )
+from .router import ProviderRouter, get_router
 
 __all__ = [
     'MultiProviderLLM',
+    'get_routed_llm',
     'get_planner_llm',
     'get_researcher_llm',
     'get_extractor_llm',
     'get_fact_checker_llm',
     'get_summarizer_llm',
-    'get_writer_llm'
+    'get_writer_llm',
+    'ProviderRouter',
+    'get_router'
 ]
\ No newline at end of file
@@ -0,0 +1,230 @@
+"""
+=========================================================
+🔌 CIRCUIT BREAKERS & RETRY BUDGETS
+=========================================================
+One breaker per provider / external tool (Groq, Gemini, Ollama,
+Tavily, Serper, Google Translate). After consecutive failures the
+breaker opens and calls fail fast; it half-opens on a schedule (or
+when the server's Retry-After expires) to let one probe through.
+A per-run retry budget stops bad runs from retrying forever.
+"""
+import os
+import time
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+RECOVERY_TIMEOUT = float(os.getenv("BREAKER_RECOVERY_TIMEOUT", "30"))
+RUN_RETRY_BUDGET = int(os.getenv("RUN_RETRY_BUDGET", "10"))
+
+# Errors that will not fix themselves by retrying
+_FATAL_STATUS = {400, 401, 403, 404, 422}
+_FATAL_NAMES = ("Authentication", "PermissionDenied", "BadRequest", "NotFound", "InvalidRequest")
+# Of those, only credential errors say anything about the provider; the rest are about one request
+_AUTH_STATUS = {401, 403}
+_AUTH_NAMES = ("Authentication", "PermissionDenied")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit is open (retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class HedgeCancelled(Exception):
+    """Raised by a hedged attempt that stopped because the other attempt already won."""
+
+
+class ProviderHTTPError(Exception):
+    """Non-2xx HTTP response from a provider; keeps the response for status/Retry-After."""
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code}: {response.text[:300]}")
+        self.response = response
+        self.status_code = response.status_code
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures -> half-open after a cooldown."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD, recovery_timeout: float = RECOVERY_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_until = 0.0
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """True while calls would be rejected (no side effects)."""
+        with self.lock:
+            return self.state == self.OPEN and time.time() < self.opened_until
+
+    def before_call(self) -> None:
+        """Raises CircuitOpenError unless this call may proceed."""
+        with self.lock:
+            now = time.time()
+            if self.state == self.OPEN:
+                if now < self.opened_until:
+                    raise CircuitOpenError(self.name, self.opened_until - now)
+                self.state = self.HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == self.HALF_OPEN:
+                # Only one probe at a time while half-open
+                if self.probe_in_flight:
+                    raise CircuitOpenError(self.name, self.recovery_timeout)
+                self.probe_in_flight = True
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Frees the half-open probe slot without judging the provider either way."""
+        with self.lock:
+            self.probe_in_flight = False
+
+    def record_failure(self, retry_after: Optional[float] = None, fatal: bool = False) -> None:
+        with self.lock:
+            self.probe_in_flight = False
+            if retry_after is not None:
+                # The server said when to come back: pause exactly that long. Throttling is
+                # not a health failure, so it does not count toward the threshold.
+                self.state = self.OPEN
+                self.opened_until = time.time() + retry_after
+                print(f"🔌 {self.name} circuit paused for {retry_after:.0f}s (Retry-After)")
+                return
+            self.failures += 1
+            if fatal or self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_until = time.time() + self.recovery_timeout
+                print(f"🔌 {self.name} circuit opened for {self.recovery_timeout:.0f}s")
+
+    def call(self, fn, *args, **kwargs):
+        self.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except HedgeCancelled:
+            # Stopped on our side before reaching the provider
+            self.release_probe()
+            raise
+        except Exception as e:
+            if is_request_error(e):
+                # Only this request was bad (too long, bad URL...): says nothing about the
+                # provider's health, so neither close the breaker nor reset the failure streak
+                self.release_probe()
+            else:
+                self.record_failure(retry_after_seconds(e), fatal=is_auth_error(e))
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {"state": self.state, "failures": self.failures,
+                    "open_for": max(0.0, self.opened_until - time.time()) if self.state == self.OPEN else 0.0}
+
+
+class RetryBudget:
+    """Caps the total number of retries across all calls of a single research run."""
+
+    def __init__(self, max_retries: int = RUN_RETRY_BUDGET):
+        self.remaining = max_retries
+        self.lock = threading.Lock()
+
+    def try_spend(self) -> bool:
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+# ---------- ERROR INSPECTION ----------
+def _status_code(exc: BaseException) -> Optional[int]:
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def retry_after_seconds(source) -> Optional[float]:
+    """Retry-After (seconds or HTTP date) from an exception's response or a headers mapping."""
+    headers = source if hasattr(source, "get") else getattr(getattr(source, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Auth/validation errors and open circuits are never worth retrying."""
+    if isinstance(exc, (CircuitOpenError, HedgeCancelled)):
+        return False
+    if _status_code(exc) in _FATAL_STATUS:
+        return False
+    return not any(name in type(exc).__name__ for name in _FATAL_NAMES)
+
+
+def is_auth_error(exc: BaseException) -> bool:
+    """Bad or missing credentials: every further call to the provider would fail too."""
+    return _status_code(exc) in _AUTH_STATUS or any(name in type(exc).__name__ for name in _AUTH_NAMES)
+
+
+def is_request_error(exc: BaseException) -> bool:
+    """A non-retryable error caused by the request itself (400/404/422...), not by the provider."""
+    return not is_retryable(exc) and not is_auth_error(exc) and not isinstance(exc, (CircuitOpenError, HedgeCancelled))
+
+
+# ---------- REGISTRIES ----------
+_breakers: Dict[str, CircuitBreaker] = {}
+_budgets: Dict[str, RetryBudget] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def breaker_states() -> Dict[str, dict]:
+    with _registry_lock:
+        return {name: breaker.snapshot() for name, breaker in _breakers.items()}
+
+
+def get_retry_budget(run_id: Optional[str] = None) -> RetryBudget:
+    """Budget of the current run (from the telemetry context), shared by all its threads."""
+    if run_id is None:
+        from .telemetry import current_context
+        run_id = current_context("run_id") or "global"
+    with _registry_lock:
+        if run_id not in _budgets:
+            _budgets[run_id] = RetryBudget()
+        return _budgets[run_id]
+
+
+def release_retry_budget(run_id: str) -> None:
+    with _registry_lock:
+        _budgets.pop(run_id, None)
@@ -0,0 +1,97 @@
+"""
+=========================================================
+♻️ LLM CLIENT REGISTRY — BUILD ONCE, REUSE EVERYWHERE
+=========================================================
+Caches one client per (provider, model, temperature), shares a
+pooled HTTP session with LiteLLM, and memoizes provider
+availability detection with a TTL.
+"""
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.utils.http_session import get_session
+
+AVAILABILITY_TTL = float(os.getenv("LLM_AVAILABILITY_TTL", "60"))
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+
+_clients: Dict[Tuple[str, str, float], Any] = {}
+_clients_lock = threading.Lock()
+
+_availability: Dict[str, Tuple[float, bool]] = {}
+_availability_lock = threading.Lock()
+
+_http_pool_configured = False
+
+
+def get_client(provider: str, model: str, temperature: float, factory: Callable[[], Any]) -> Any:
+    """Returns the cached client for this key, building it with `factory` on first use."""
+    configure_shared_http_pool()
+    key = (provider, model, round(float(temperature), 3))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            _clients[key] = client
+        return client
+
+
+def clear_clients() -> None:
+    with _clients_lock:
+        _clients.clear()
+
+
+def configure_shared_http_pool() -> None:
+    """Points LiteLLM at one keep-alive httpx pool so agents and runs reuse TLS connections."""
+    global _http_pool_configured
+    if _http_pool_configured:
+        return
+    _http_pool_configured = True
+    try:
+        import httpx
+        import litellm
+        limits = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60)
+        if getattr(litellm, "client_session", None) is None:
+            litellm.client_session = httpx.Client(limits=limits, timeout=120)
+        if getattr(litellm, "aclient_session", None) is None:
+            litellm.aclient_session = httpx.AsyncClient(limits=limits, timeout=120)
+    except Exception as e:
+        print(f"⚠️ Shared HTTP pool unavailable, using per-call clients: {e}")
+
+
+# ---------- PROVIDER AVAILABILITY (TTL CACHED) ----------
+def _cached(name: str, probe: Callable[[], bool], ttl: float) -> bool:
+    now = time.monotonic()
+    with _availability_lock:
+        hit = _availability.get(name)
+        if hit and now - hit[0] < ttl:
+            return hit[1]
+    result = probe()
+    with _availability_lock:
+        _availability[name] = (now, result)
+    return result
+
+
+def is_ollama_running(ttl: float = AVAILABILITY_TTL) -> bool:
+    """Single cheap HTTP probe of the local Ollama daemon, cached for `ttl` seconds."""
+    def probe():
+        try:
+            return get_session(retries=False).get(f"{OLLAMA_BASE_URL}/api/tags", timeout=1).status_code == 200
+        except Exception:
+            return False
+    return _cached("ollama", probe, ttl)
+
+
+def detect_available_providers(ttl: float = AVAILABILITY_TTL) -> List[str]:
+    """Providers usable right now, in MultiProviderLLM priority order."""
+    available = []
+    if os.getenv('GROQ_API_KEY'): available.append('groq')
+    if os.getenv('GOOGLE_API_KEY'): available.append('gemini')
+    if is_ollama_running(ttl): available.append('ollama')
+    return available
+
+
+def invalidate_availability() -> None:
+    with _availability_lock:
+        _availability.clear()
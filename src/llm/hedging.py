@@ -0,0 +1,151 @@
+"""
+=========================================================
+🏁 HEDGED LLM REQUESTS — TAIL-LATENCY CONTROL
+=========================================================
+Opt-in (LLM_HEDGING=1). If a call has not returned by its role's
+p95 latency, the same prompt is fired at the next healthy provider
+and whichever finishes first wins. A per-minute budget caps how
+many hedges are sent. The losing attempt is cancelled
+cooperatively: it stops before its next rate-limit wait or request.
+"""
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Optional
+
+from .circuit_breaker import HedgeCancelled
+from .telemetry import context_snapshot, llm_context
+
+HEDGING_ENABLED = os.getenv("LLM_HEDGING", "").lower() in ("1", "true", "yes")
+MAX_HEDGES_PER_MINUTE = int(os.getenv("LLM_HEDGE_MAX_PER_MIN", "5"))
+DEFAULT_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", "20"))
+MIN_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "2"))
+MIN_SAMPLES = 5
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+# Cancel Event of the hedged attempt running on this thread, if any
+_attempt = threading.local()
+
+
+def raise_if_cancelled(cancel: Optional[threading.Event] = None) -> None:
+    """
+    Raises HedgeCancelled if `cancel` (default: the current thread's hedged attempt) is set.
+    LLM wrappers call this before waiting for a rate-limit token and before sending.
+    """
+    cancel = cancel or getattr(_attempt, "cancel", None)
+    if cancel is not None and cancel.is_set():
+        raise HedgeCancelled("the other hedged attempt already won")
+
+
+class HedgePolicy:
+    """Per-role latency history (for the hedge trigger) plus a sliding-window hedge budget."""
+
+    def __init__(self, max_per_minute: int = MAX_HEDGES_PER_MINUTE, window: int = 100):
+        self.max_per_minute = max_per_minute
+        self.window = window
+        self.latencies: Dict[str, deque] = {}
+        self.hedge_times = deque()
+        self.lock = threading.Lock()
+
+    def observe(self, role: str, latency: float) -> None:
+        with self.lock:
+            self.latencies.setdefault(role, deque(maxlen=self.window)).append(latency)
+
+    def delay_for(self, role: str) -> float:
+        """Seconds to wait before hedging: the role's p95, or a default until we have data."""
+        with self.lock:
+            samples = sorted(self.latencies.get(role, ()))
+        if len(samples) < MIN_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        p95 = samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))]
+        return max(MIN_HEDGE_DELAY, p95)
+
+    def try_spend(self) -> bool:
+        """Consumes one hedge from the per-minute budget if any is left."""
+        now = time.monotonic()
+        with self.lock:
+            while self.hedge_times and now - self.hedge_times[0] > 60:
+                self.hedge_times.popleft()
+            if len(self.hedge_times) >= self.max_per_minute:
+                return False
+            self.hedge_times.append(now)
+            return True
+
+
+def hedged_call(
+    role: str,
+    primary: Callable[[threading.Event], object],
+    backup: Optional[Callable[[threading.Event], object]],
+    policy: Optional["HedgePolicy"] = None
+):
+    """
+    Runs `primary`; if it is still running after the role's p95, also runs `backup`
+    and returns the first successful result. Each callable receives a cancel Event
+    that is set once the other side has won; it is also bound to the attempt's thread,
+    so raise_if_cancelled() inside the LLM wrappers stops the loser before it takes a
+    rate-limit token or sends its request. A request already on the wire finishes in
+    the background and its result is discarded. Failing over to `backup` after the
+    primary errors is charged to the hedge budget like a latency hedge.
+    Returns (result, winner) with winner in {"primary", "backup"}.
+    """
+    policy = policy or get_hedge_policy()
+    tags = context_snapshot()
+    events = {"primary": threading.Event(), "backup": threading.Event()}
+
+    def run(name, fn):
+        _attempt.cancel = events[name]
+        try:
+            with llm_context(**tags):
+                raise_if_cancelled()
+                started = time.perf_counter()
+                result = fn(events[name])
+                policy.observe(role, time.perf_counter() - started)
+                return result
+        finally:
+            _attempt.cancel = None
+
+    futures = {_executor.submit(run, "primary", primary): "primary"}
+    done, _ = wait(futures, timeout=policy.delay_for(role))
+
+    if not done and backup is not None and policy.try_spend():
+        print(f"🏁 {role} exceeded its p95 latency - hedging to a backup provider...")
+        futures[_executor.submit(run, "backup", backup)] = "backup"
+
+    last_error = None
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                last_error = e
+                # Primary failed before the hedge fired: fail over to the backup right away
+                if backup is not None and "backup" not in futures.values() and policy.try_spend():
+                    backup_future = _executor.submit(run, "backup", backup)
+                    futures[backup_future] = "backup"
+                    pending.add(backup_future)
+                continue
+            # Cancel the loser
+            for other_future, other_name in futures.items():
+                if other_name != name:
+                    events[other_name].set()
+                    other_future.cancel()
+            return result, name
+    raise last_error
+
+
+# Global instance
+_policy: Optional[HedgePolicy] = None
+_policy_lock = threading.Lock()
+
+
+def get_hedge_policy() -> HedgePolicy:
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            _policy = HedgePolicy()
+        return _policy
@@ -4,6 +4,7 @@ from langchain_openai import ChatOpenAI
 from langchain_groq import ChatGroq
 from langchain_community.llms import Ollama
 import time
+from .client_registry import is_ollama_running
 
 class LLMManager:
     """Manages multiple LLM providers with intelligent fallback."""
@@ -35,7 +36,7 @@ class LLMManager:
         }
     }
     
-    def _init_(self):
+    def __init__(self):
         self.active_providers = self._detect_available_providers()
         self.current_provider = None
         self.request_counts = {}
@@ -57,14 +58,9 @@ class LLMManager:
         if os.getenv('GROQ_API_KEY'):
             available.append('groq')
         
-        # Check Ollama (local)
-        try:
-            import ollama
-            # Test if Ollama is running
-            ollama.list()
+        # Check Ollama (local) - probe result is cached with a TTL
+        if is_ollama_running():
             available.append('ollama')
-        except:
-            pass
         
         return available
     
@@ -153,8 +149,15 @@ class LLMManager:
             }
         }
 
-# Global instance
-_llm_manager = LLMManager()
+# Global instance (created on first use, not at import time)
+_llm_manager: Optional[LLMManager] = None
+
+def get_llm_manager() -> LLMManager:
+    """Shared LLMManager instance."""
+    global _llm_manager
+    if _llm_manager is None:
+        _llm_manager = LLMManager()
+    return _llm_manager
 
 def get_llm_with_fallback(
     provider: Optional[str] = None,
@@ -162,4 +165,4 @@ def get_llm_with_fallback(
     temperature: float = 0.7
 ):
     """Get LLM with automatic fallback."""
-    return _llm_manager.get_llm(provider, model, temperature)
\ No newline at end of file
+    return get_llm_manager().get_llm(provider, model, temperature)
@@ -4,7 +4,18 @@
 =========================================================
 """
 import os
+import copy
+import time
+from functools import wraps
 from crewai import LLM
+from .response_cache import get_response_cache, make_cache_key
+from .rate_limiter import get_rate_limiter
+from .circuit_breaker import get_breaker, HedgeCancelled
+from .client_registry import get_client, detect_available_providers, OLLAMA_BASE_URL
+from .telemetry import with_telemetry, llm_context
+from .hedging import HEDGING_ENABLED, hedged_call, raise_if_cancelled
+from src.utils.singleflight import coalesce
+from src.utils.replay import replay_call
 
 # --- 1. NUCLEAR SANITIZER ---
 if "OPENAI_API_KEY" in os.environ:
@@ -18,6 +29,218 @@ try:
 except ImportError:
     HAS_LANGCHAIN_GOOGLE = False
 
+# --- 3. RATE LIMIT + CIRCUIT BREAKER + REPLAY + COALESCING + RESPONSE CACHE WIRING ---
+def _with_rate_limit(llm, provider: str, api_key=None):
+    """Makes every outbound call wait for a token from the provider's shared bucket."""
+    limiter = get_rate_limiter(provider, api_key)
+    if limiter is None:
+        return llm
+    method = "call" if hasattr(llm, "call") else "invoke"
+    original = getattr(llm, method)
+
+    @wraps(original)
+    def limited(*args, **kwargs):
+        limiter.acquire()
+        # A hedged attempt that lost while queued for its token never sends
+        raise_if_cancelled()
+        return original(*args, **kwargs)
+
+    object.__setattr__(llm, method, limited)
+    return llm
+
+
+def _with_circuit_breaker(llm, provider: str):
+    """Fails fast while the provider's breaker is open instead of queueing for a token."""
+    breaker = get_breaker(provider)
+    method = "call" if hasattr(llm, "call") else "invoke"
+    original = getattr(llm, method)
+
+    @wraps(original)
+    def guarded(*args, **kwargs):
+        raise_if_cancelled()
+        return breaker.call(original, *args, **kwargs)
+
+    object.__setattr__(llm, method, guarded)
+    return llm
+
+
+def _with_replay(llm):
+    """
+    Records provider responses to the cassette, or serves them back without touching
+    the network, when REPLAY_MODE is set. Keyed on the messages only, so a replay
+    does not depend on which provider the router picks.
+    """
+    method = "call" if hasattr(llm, "call") else "invoke"
+    original = getattr(llm, method)
+
+    @wraps(original)
+    def replayed(messages, *args, **kwargs):
+        return replay_call("llm", {"messages": messages}, lambda: original(messages, *args, **kwargs))
+
+    object.__setattr__(llm, method, replayed)
+    return llm
+
+
+def _with_coalescing(llm, provider: str, model: str, temperature: float):
+    """
+    Concurrent identical prompts share one provider call. Independent of the response
+    cache, so coalescing stays on when LLM_CACHE_DISABLED is set. Tool/structured calls
+    are never coalesced.
+    """
+    method = "call" if hasattr(llm, "call") else "invoke"
+    original = getattr(llm, method)
+
+    @wraps(original)
+    def coalesced(messages, *args, **kwargs):
+        if args or kwargs.get("tools") or kwargs.get("available_functions") or kwargs.get("response_model"):
+            return original(messages, *args, **kwargs)
+        key = make_cache_key(provider, model, temperature, messages)
+        return coalesce(f"llm:{key}", lambda: original(messages, *args, **kwargs))
+
+    object.__setattr__(llm, method, coalesced)
+    return llm
+
+
+def _with_response_cache(llm, provider: str, model: str, temperature: float):
+    """
+    Patches the LLM instance so identical prompts are served from the disk cache.
+    Covers CrewAI's `call` and LangChain's `invoke`. Tool/structured calls bypass the cache.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return llm
+
+    if hasattr(llm, "call"):
+        original_call = llm.call
+
+        @wraps(original_call)
+        def cached_call(messages, *args, **kwargs):
+            if args or kwargs.get("tools") or kwargs.get("available_functions") or kwargs.get("response_model"):
+                return original_call(messages, *args, **kwargs)
+            key = make_cache_key(provider, model, temperature, messages)
+            hit = cache.get(key)
+            if hit is not None:
+                return hit
+            result = original_call(messages, *args, **kwargs)
+            if isinstance(result, str):
+                cache.set(key, result, provider, model)
+            return result
+
+        object.__setattr__(llm, "call", cached_call)
+
+    elif hasattr(llm, "invoke"):
+        from langchain_core.messages import AIMessage
+        original_invoke = llm.invoke
+
+        @wraps(original_invoke)
+        def cached_invoke(messages, *args, **kwargs):
+            key = make_cache_key(provider, model, temperature, messages)
+            hit = cache.get(key)
+            if hit is not None:
+                return AIMessage(content=hit)
+            result = original_invoke(messages, *args, **kwargs)
+            content = getattr(result, "content", None)
+            if isinstance(content, str):
+                cache.set(key, content, provider, model)
+            return result
+
+        object.__setattr__(llm, "invoke", cached_invoke)
+
+    return llm
+
+
+# --- 4. CALL-TIME ROUTING ---
+# Call kwargs only a CrewAI LLM (`call`) understands; LangChain `invoke` would drop them
+TOOL_KWARGS = ("tools", "available_functions", "response_model")
+
+
+def _dispatch(llm, messages, kwargs):
+    """Calls either a CrewAI LLM (`call`) or a LangChain chat model (`invoke`) and returns text."""
+    if hasattr(llm, "call"):
+        return llm.call(messages, **kwargs)
+    result = llm.invoke(messages)
+    return getattr(result, "content", result)
+
+
+def call_llm(llm, messages, **kwargs) -> str:
+    """Uniform text completion for any LLM this module hands out."""
+    return str(_dispatch(llm, messages, kwargs))
+
+
+def _with_routing(llm, role: str, provider: str, temperature: float):
+    """
+    Re-routes every `call` through the ProviderRouter: the fastest healthy provider
+    for the role answers, and failures fall through to the next candidate.
+    """
+    if not hasattr(llm, "call"):
+        return llm
+
+    from .router import get_router
+    router = get_router()
+    original_call = llm.call
+    peers = {}
+
+    def peer(candidate):
+        if candidate not in peers:
+            peers[candidate] = getattr(MultiProviderLLM(temperature), candidate)()
+        return peers[candidate]
+
+    @wraps(original_call)
+    def routed_call(messages, *args, **kwargs):
+        if args:
+            return original_call(messages, *args, **kwargs)
+        available = MultiProviderLLM(temperature).providers_available
+        candidates = router.rank(role, available) or [provider]
+        if any(kwargs.get(name) for name in TOOL_KWARGS):
+            # Tool calls may only fail over to peers that can execute them
+            candidates = [c for c in candidates if c == provider or hasattr(peer(c), "call")] or [provider]
+
+        tried = set()
+
+        def attempt_on(candidate, attempt, cancel=None):
+            raise_if_cancelled(cancel)
+            tried.add(candidate)
+            target = None if candidate == provider else peer(candidate)
+            started = time.perf_counter()
+            try:
+                with llm_context(role=role, retries=attempt):
+                    result = original_call(messages, **kwargs) if target is None else _dispatch(target, messages, kwargs)
+                router.record_success(candidate, time.perf_counter() - started)
+                return result
+            except HedgeCancelled:
+                raise
+            except Exception as e:
+                router.record_failure(candidate, time.perf_counter() - started)
+                print(f"⚠️ {candidate} failed for {role}: {str(e)[:120]}. Rerouting...")
+                raise
+
+        last_error = None
+        if HEDGING_ENABLED and len(candidates) > 1:
+            # Race the two best providers once the first one exceeds the role's p95
+            first, second = candidates[0], candidates[1]
+            try:
+                result, _ = hedged_call(
+                    role,
+                    lambda cancel: attempt_on(first, 0, cancel),
+                    lambda cancel: attempt_on(second, 1, cancel)
+                )
+                return result
+            except Exception as e:
+                last_error = e
+                # The backup only runs if the hedge budget allowed it
+                candidates = [c for c in candidates if c not in tried]
+
+        for attempt, candidate in enumerate(candidates):
+            try:
+                return attempt_on(candidate, attempt)
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    object.__setattr__(llm, "call", routed_call)
+    return llm
+
+
 class MultiProviderLLM:
     
     PROVIDERS = {
@@ -32,14 +255,29 @@ class MultiProviderLLM:
         self.providers_available = self._check_available_providers()
 
     def _check_available_providers(self):
-        available = []
-        if os.getenv('GROQ_API_KEY'): available.append('groq')
-        if os.getenv('GOOGLE_API_KEY'): available.append('gemini')
-        available.append('ollama') 
-        return available
+        # Cached with a TTL so building an LLM never re-probes Ollama
+        return detect_available_providers()
+
+    def _shared(self, provider: str, model: str, build, api_key=None):
+        """
+        One pooled client per (provider, model, temperature). Each caller gets a shallow
+        copy, wired after copying, so the wrappers call the copy: per-agent tweaks
+        (stop words, routing) apply to that agent and never leak into other agents.
+        """
+        llm = copy.copy(get_client(provider, model, self.temperature, build))
+        llm = _with_rate_limit(llm, provider, api_key)
+        llm = _with_circuit_breaker(llm, provider)
+        llm = _with_replay(llm)
+        llm = with_telemetry(llm, provider, model)
+        # Cache outside coalescing: a hit never waits on an in-flight call for the same prompt
+        llm = _with_coalescing(llm, provider, model, self.temperature)
+        return _with_response_cache(llm, provider, model, self.temperature)
 
     # ---------- GROQ ----------
     def groq(self):
+        return self._shared("groq", "llama-3.3-70b-versatile", self._build_groq, os.getenv("GROQ_API_KEY"))
+
+    def _build_groq(self):
         return LLM(
             model="groq/llama-3.3-70b-versatile",
             api_key=os.getenv("GROQ_API_KEY"),
@@ -51,6 +289,10 @@ class MultiProviderLLM:
         """
         Uses ChatGoogleGenerativeAI to bypass LiteLLM entirely.
         """
+        model = "gemini-1.5-flash" if HAS_LANGCHAIN_GOOGLE else "gemini-3-flash-preview"
+        return self._shared("gemini", model, self._build_gemini, os.getenv("GOOGLE_API_KEY"))
+
+    def _build_gemini(self):
         if HAS_LANGCHAIN_GOOGLE:
             return ChatGoogleGenerativeAI(
                 model="gemini-1.5-flash",
@@ -67,9 +309,12 @@ class MultiProviderLLM:
 
     # ---------- OLLAMA (LOCAL) ----------
     def ollama(self):
+        return self._shared("ollama", "llama3.1", self._build_ollama)
+
+    def _build_ollama(self):
         return LLM(
             model="ollama/llama3.1",
-            base_url="http://localhost:11434",
+            base_url=OLLAMA_BASE_URL,
             temperature=self.temperature,
         )
 
@@ -78,27 +323,30 @@ class MultiProviderLLM:
 # 🧠 AGENT-SPECIFIC ASSIGNMENTS
 # ================================================================
 
+def get_routed_llm(role: str, temperature: float = 0.7):
+    """Builds an LLM for the currently fastest healthy provider and keeps routing per call."""
+    from .router import get_router
+    factory = MultiProviderLLM(temperature=temperature)
+    provider = get_router().choose(role, factory.providers_available) or 'groq'
+    return _with_routing(getattr(factory, provider)(), role, provider, temperature)
+
 def get_planner_llm():
-    return MultiProviderLLM(temperature=0.1).groq()
+    return get_routed_llm('planner', temperature=0.1)
 
 def get_researcher_llm():
-    return MultiProviderLLM(temperature=0.3).groq()
+    return get_routed_llm('researcher', temperature=0.3)
 
 def get_extractor_llm():
-    return MultiProviderLLM(temperature=0.1).ollama()
+    return get_routed_llm('extractor', temperature=0.1)
 
 def get_fact_checker_llm():
-    return MultiProviderLLM(temperature=0.1).ollama()
+    return get_routed_llm('fact_checker', temperature=0.1)
 
 def get_summarizer_llm():
-    return MultiProviderLLM(temperature=0.2).ollama()
+    return get_routed_llm('summarizer', temperature=0.2)
 
 def get_writer_llm():
-    google_key = os.getenv("GOOGLE_API_KEY", "")
-    if google_key and google_key.startswith("AIza"):
-        print("✅ Using Direct Gemini Connection")
-        return MultiProviderLLM(temperature=0.7).gemini()
-    return MultiProviderLLM(temperature=0.7).groq()
+    return get_routed_llm('writer', temperature=0.7)
 
 
 # ================================================================
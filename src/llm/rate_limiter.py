@@ -1,61 +1,207 @@
+import os
 import time
+import asyncio
+import hashlib
+import sqlite3
 from functools import wraps
-from collections import defaultdict
 import threading
-from typing import Callable, Any
+from typing import Callable, Any, Dict, Optional
 from tenacity import (
     retry,
     stop_after_attempt,
     wait_exponential,
-    retry_if_exception_type
+    retry_if_exception
 )
-from openai import RateLimitError
+from .circuit_breaker import is_retryable, retry_after_seconds, get_retry_budget
+
+# Requests per minute per provider (free-tier defaults). 0 disables limiting.
+PROVIDER_LIMITS = {
+    'groq': int(os.getenv('GROQ_RPM', '30')),
+    'gemini': int(os.getenv('GEMINI_RPM', '15')),
+    'ollama': int(os.getenv('OLLAMA_RPM', '0')),
+    'tavily': int(os.getenv('TAVILY_RPM', '60')),
+}
+
+# Set to e.g. data/rate_limits.db so every Streamlit worker process shares one quota
+SHARED_STATE_PATH = os.getenv('RATE_LIMIT_SHARED_PATH', '')
+
+
+class TokenBucket:
+    """
+    Reservation-based token bucket.
+
+    Each caller reserves its tokens under the lock and is told how long to wait;
+    the sleep happens outside the lock, so throttled callers never block each other
+    and are served in the order they arrived (FIFO).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate              # tokens per second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Take `tokens` (possibly going into debt) and return seconds to wait."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= tokens
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self, tokens: float = 1) -> None:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1) -> None:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """Token bucket whose state lives in SQLite so several processes share one quota."""
+
+    def __init__(self, rate: float, capacity: float, key: str, path: str):
+        super().__init__(rate, capacity)
+        self.key = key
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS token_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def reserve(self, tokens: float = 1) -> float:
+        # Wall clock (not monotonic) because the timestamp is compared across processes
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            row = conn.execute(
+                "SELECT tokens, updated FROM token_buckets WHERE key = ?", (self.key,)
+            ).fetchone()
+            current, updated = row if row else (self.capacity, now)
+            current = min(self.capacity, current + (now - updated) * self.rate) - tokens
+            conn.execute(
+                "INSERT OR REPLACE INTO token_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (self.key, current, now)
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return 0.0 if current >= 0 else -current / self.rate
+
 
 class RateLimiter:
-    """Thread-safe rate limiter with exponential backoff."""
-    
-    def __init__(self, max_calls: int = 3, time_window: int = 60):
+    """Token-bucket rate limiter keyed by provider (and API key), usable as a decorator."""
+
+    def __init__(
+        self,
+        max_calls: int = 3,
+        time_window: int = 60,
+        key: Optional[str] = None,
+        shared_path: Optional[str] = None
+    ):
         self.max_calls = max_calls
         self.time_window = time_window
-        self.calls = defaultdict(list)
+        self.key = key
+        self.shared_path = shared_path if shared_path is not None else SHARED_STATE_PATH
+        self.buckets: Dict[str, TokenBucket] = {}
         self.lock = threading.Lock()
-    
+
+    def bucket(self, key: str) -> TokenBucket:
+        with self.lock:
+            if key not in self.buckets:
+                rate = self.max_calls / self.time_window
+                if self.shared_path:
+                    self.buckets[key] = SQLiteTokenBucket(rate, self.max_calls, key, self.shared_path)
+                else:
+                    self.buckets[key] = TokenBucket(rate, self.max_calls)
+            return self.buckets[key]
+
+    def acquire(self, key: Optional[str] = None) -> None:
+        self.bucket(key or self.key or 'default').acquire()
+
+    async def acquire_async(self, key: Optional[str] = None) -> None:
+        await self.bucket(key or self.key or 'default').acquire_async()
+
     def __call__(self, func: Callable) -> Callable:
+        key = self.key or func.__name__
+
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs) -> Any:
+                await self.acquire_async(key)
+                return await func(*args, **kwargs)
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            with self.lock:
-                now = time.time()
-                key = func.__name__
-                
-                # Remove old calls outside time window
-                self.calls[key] = [
-                    call_time for call_time in self.calls[key]
-                    if now - call_time < self.time_window
-                ]
-                
-                # Check if we can make the call
-                if len(self.calls[key]) >= self.max_calls:
-                    sleep_time = self.time_window - (now - self.calls[key][0]) + 1
-                    print(f"⏳ Rate limit reached. Waiting {sleep_time:.1f}s...")
-                    time.sleep(sleep_time)
-                    self.calls[key] = []
-                
-                # Record this call
-                self.calls[key].append(time.time())
-            
+            self.acquire(key)
             return func(*args, **kwargs)
-        
+
         return wrapper
 
+
+# Global per-provider limiters
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, api_key: Optional[str] = None) -> Optional[RateLimiter]:
+    """
+    Shared limiter for a provider/API key pair, or None if the provider is unlimited.
+    Keys are hashed so secrets never end up in the shared SQLite file.
+    """
+    rpm = PROVIDER_LIMITS.get(provider, 0)
+    if rpm <= 0:
+        return None
+    key = provider
+    if api_key:
+        key = f"{provider}:{hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]}"
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(max_calls=rpm, time_window=60, key=key)
+        return _limiters[key]
+
+
 def retry_with_exponential_backoff(
     max_attempts: int = 5,
     initial_wait: int = 1,
     max_wait: int = 60
 ):
-    """Decorator for exponential backoff retry."""
+    """
+    Decorator for exponential backoff retry.
+    Only transient errors are retried (never auth/validation errors or open circuits),
+    a server Retry-After overrides the backoff, and every retry is charged to the
+    current run's retry budget.
+    """
+    backoff = wait_exponential(multiplier=initial_wait, max=max_wait)
+
+    def wait_for(retry_state) -> float:
+        retry_after = retry_after_seconds(retry_state.outcome.exception())
+        return min(max_wait, max(retry_after or 0.0, backoff(retry_state)))
+
+    def should_retry(exc: BaseException) -> bool:
+        if not is_retryable(exc):
+            return False
+        if not get_retry_budget().try_spend():
+            print("⛔ Run retry budget exhausted - failing fast.")
+            return False
+        return True
+
     return retry(
         stop=stop_after_attempt(max_attempts),
-        wait=wait_exponential(multiplier=initial_wait, max=max_wait),
-        retry=retry_if_exception_type((RateLimitError, Exception)),
+        wait=wait_for,
+        retry=retry_if_exception(should_retry),
         reraise=True
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,158 @@
+"""
+=========================================================
+💾 LLM RESPONSE CACHE — SQLITE, CONTENT-ADDRESSED
+=========================================================
+Stores completed LLM responses on disk keyed by
+(provider, model, temperature, sha256(messages)) so repeated
+and retried topics never pay for the same prompt twice.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Optional
+
+DEFAULT_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/llm_cache.db")
+DEFAULT_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+
+def _normalize_messages(messages: Any) -> Any:
+    """Turn str / dict / LangChain message objects into plain JSON-able data."""
+    if isinstance(messages, str):
+        return [{"role": "user", "content": messages}]
+    normalized = []
+    for message in messages or []:
+        if isinstance(message, dict):
+            normalized.append({"role": message.get("role"), "content": message.get("content")})
+        else:
+            # LangChain BaseMessage (HumanMessage, SystemMessage, ...)
+            normalized.append({
+                "role": getattr(message, "type", message.__class__.__name__),
+                "content": getattr(message, "content", str(message))
+            })
+    return normalized
+
+
+def make_cache_key(provider: str, model: str, temperature: float, messages: Any) -> str:
+    """Content address for a single chat completion request."""
+    body = json.dumps(_normalize_messages(messages), sort_keys=True, ensure_ascii=False, default=str)
+    digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+    return f"{provider}:{model}:{float(temperature):.3f}:{digest}"
+
+
+class ResponseCache:
+    """Thread-safe SQLite response cache with TTL and size-based LRU eviction."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_responses_access ON llm_responses(last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a fresh cached response, or None on miss/expiry."""
+        now = time.time()
+        with self.lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return response
+
+    def set(self, key: str, response: str, provider: str = "", model: str = "") -> None:
+        """Store a response and evict least-recently-used rows past the size cap."""
+        if not isinstance(response, str) or not response.strip():
+            return
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self.lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses "
+                "(key, provider, model, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, response, size, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Expired rows first, then LRU until we are under the byte budget
+        if self.ttl_seconds:
+            self._conn.execute(
+                "DELETE FROM llm_responses WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM llm_responses ORDER BY last_access ASC"
+        ).fetchall():
+            self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        with self.lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self.lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses"
+            ).fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes}
+
+
+# Global instance (lazy so importing the module never touches the disk)
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Shared cache instance, or None when disabled via LLM_CACHE_DISABLED=1."""
+    global _response_cache
+    if os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
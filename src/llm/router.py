@@ -0,0 +1,181 @@
+"""
+=========================================================
+🧭 LATENCY-AWARE PROVIDER ROUTER
+=========================================================
+Tracks rolling latency (EWMA + p95), error rate and remaining
+quota per provider, and picks the fastest healthy provider for
+each agent role at call time.
+"""
+import os
+import time
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+from .circuit_breaker import get_breaker
+
+LOCAL_PROVIDERS = {'ollama'}
+
+# Latency guess for providers a role has not measured yet, scaled by the role's preference order
+PRIOR_LATENCY = float(os.getenv('LLM_PRIOR_LATENCY', '2.0'))
+# Seconds for a provider's error rate to halve without new failures
+ERROR_HALF_LIFE = float(os.getenv('LLM_ERROR_HALF_LIFE', '60'))
+
+# Role -> providers in order of preference. `local_only` roles never leave the machine.
+ROLE_POLICIES = {
+    'planner': {'providers': ['groq', 'gemini', 'ollama'], 'local_only': False},
+    'researcher': {'providers': ['groq', 'gemini', 'ollama'], 'local_only': False},
+    'extractor': {'providers': ['ollama', 'groq', 'gemini'], 'local_only': False},
+    'fact_checker': {'providers': ['ollama', 'groq', 'gemini'], 'local_only': False},
+    'summarizer': {'providers': ['ollama', 'gemini', 'groq'], 'local_only': False},
+    'writer': {'providers': ['gemini', 'groq', 'ollama'], 'local_only': False},
+}
+
+# Comma separated list of roles forced onto local providers, e.g. "extractor,fact_checker"
+for _role in filter(None, os.getenv('LLM_LOCAL_ONLY_ROLES', '').split(',')):
+    if _role.strip() in ROLE_POLICIES:
+        ROLE_POLICIES[_role.strip()]['local_only'] = True
+
+
+class ProviderStats:
+    """Rolling health numbers for a single provider."""
+
+    def __init__(self, prior_latency: float, alpha: float = 0.3, window: int = 50):
+        self.alpha = alpha
+        self.ewma_latency = prior_latency
+        self.error_rate = 0.0
+        self.decayed_at = time.time()
+        self.samples = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.quota_remaining: Optional[int] = None
+        self.quota_reset_at = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def decay(self, half_life: float, now: float) -> None:
+        """Lets the error rate fade with time, so a provider that stopped failing recovers even unused."""
+        if self.error_rate and half_life > 0:
+            self.error_rate *= 0.5 ** ((now - self.decayed_at) / half_life)
+        self.decayed_at = now
+
+    def p95(self) -> float:
+        if not self.latencies:
+            return self.ewma_latency
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+    def to_dict(self) -> dict:
+        return {
+            'ewma_latency': round(self.ewma_latency, 3),
+            'p95_latency': round(self.p95(), 3),
+            'error_rate': round(self.error_rate, 3),
+            'samples': self.samples,
+            'quota_remaining': self.quota_remaining,
+            'cooling_down': self.cooldown_until > time.time(),
+        }
+
+
+class ProviderRouter:
+    """Thread-safe selector of the fastest healthy provider per role."""
+
+    def __init__(
+        self,
+        max_error_rate: float = 0.5,
+        failure_cooldown: float = 30.0,
+        max_consecutive_failures: int = 3,
+        error_half_life: float = ERROR_HALF_LIFE
+    ):
+        from .multi_provider import MultiProviderLLM
+        self.provider_meta = MultiProviderLLM.PROVIDERS
+        self.max_error_rate = max_error_rate
+        self.failure_cooldown = failure_cooldown
+        self.max_consecutive_failures = max_consecutive_failures
+        self.error_half_life = error_half_life
+        self.stats: Dict[str, ProviderStats] = {}
+        self.lock = threading.Lock()
+
+    def _stats(self, provider: str) -> ProviderStats:
+        if provider not in self.stats:
+            # Unmeasured providers start from their static priority (lower = faster guess)
+            priority = self.provider_meta.get(provider, {}).get('priority', 5)
+            self.stats[provider] = ProviderStats(prior_latency=PRIOR_LATENCY * priority)
+        s = self.stats[provider]
+        s.decay(self.error_half_life, time.time())
+        return s
+
+    # ---------- FEEDBACK ----------
+    def record_success(self, provider: str, latency: float) -> None:
+        with self.lock:
+            s = self._stats(provider)
+            s.ewma_latency = latency if s.samples == 0 else s.alpha * latency + (1 - s.alpha) * s.ewma_latency
+            s.latencies.append(latency)
+            s.error_rate = (1 - s.alpha) * s.error_rate
+            s.samples += 1
+            s.consecutive_failures = 0
+
+    def record_failure(self, provider: str, latency: Optional[float] = None) -> None:
+        with self.lock:
+            s = self._stats(provider)
+            s.error_rate = s.alpha + (1 - s.alpha) * s.error_rate
+            s.consecutive_failures += 1
+            if latency is not None:
+                s.latencies.append(latency)
+            if s.consecutive_failures >= self.max_consecutive_failures:
+                s.cooldown_until = time.time() + self.failure_cooldown
+
+    def update_quota(self, provider: str, remaining: Optional[int], reset_in: float = 0.0) -> None:
+        with self.lock:
+            s = self._stats(provider)
+            s.quota_remaining = remaining
+            s.quota_reset_at = time.time() + reset_in
+
+    # ---------- SELECTION ----------
+    def is_healthy(self, provider: str) -> bool:
+        if get_breaker(provider).is_open():
+            return False
+        with self.lock:
+            s = self._stats(provider)
+            now = time.time()
+            if s.cooldown_until > now:
+                return False
+            if s.quota_remaining is not None and s.quota_remaining <= 0 and s.quota_reset_at > now:
+                return False
+            return s.error_rate <= self.max_error_rate
+
+    def rank(self, role: str, available: List[str]) -> List[str]:
+        """All allowed providers for a role, healthiest/fastest first."""
+        policy = ROLE_POLICIES.get(role, {'providers': list(self.provider_meta), 'local_only': False})
+        allowed = [p for p in policy['providers'] if p in available]
+        if policy['local_only']:
+            allowed = [p for p in allowed if p in LOCAL_PROVIDERS]
+
+        def score(item):
+            index, provider = item
+            with self.lock:
+                s = self._stats(provider)
+                # Until measured, a provider is as fast as its place in this role's preference order
+                latency = s.ewma_latency if s.samples else PRIOR_LATENCY * (index + 1)
+            return (not self.is_healthy(provider), latency, index)
+
+        return [p for _, p in sorted(enumerate(allowed), key=score)]
+
+    def choose(self, role: str, available: List[str]) -> Optional[str]:
+        ranked = self.rank(role, available)
+        return ranked[0] if ranked else None
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self.lock:
+            return {p: self._stats(p).to_dict() for p in list(self.stats)}
+
+
+# Global instance
+_router: Optional[ProviderRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ProviderRouter:
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ProviderRouter()
+        return _router
@@ -0,0 +1,167 @@
+"""
+=========================================================
+📈 LLM TELEMETRY — TOKENS, LATENCY, PROVIDER, COST
+=========================================================
+Every provider call is timed and persisted to the `llm_calls`
+table (next to `research_history`) so stages can be compared
+by p50/p95 latency, token usage and cost.
+"""
+import os
+import time
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Optional
+
+from .token_budget import count_tokens
+from .circuit_breaker import HedgeCancelled
+from src.utils.tracing import span
+
+# USD per 1M tokens (input, output). Local models are free.
+MODEL_PRICING = {
+    'llama-3.3-70b-versatile': (0.59, 0.79),
+    'gemini-1.5-flash': (0.075, 0.30),
+    'gemini-3-flash-preview': (0.50, 3.00),
+    'llama3.1': (0.0, 0.0),
+}
+
+TELEMETRY_DISABLED = os.getenv("LLM_TELEMETRY_DISABLED", "").lower() in ("1", "true", "yes")
+
+_context = threading.local()
+
+
+# ---------- CALL CONTEXT ----------
+@contextmanager
+def llm_context(**values):
+    """Tags LLM calls made inside the block (role, run_id, retries) on this thread."""
+    previous = getattr(_context, "values", {})
+    _context.values = {**previous, **{k: v for k, v in values.items() if v is not None}}
+    try:
+        yield
+    finally:
+        _context.values = previous
+
+
+def current_context(key: str):
+    return getattr(_context, "values", {}).get(key)
+
+
+def context_snapshot() -> Dict:
+    """Copy of this thread's tags, to re-apply with llm_context(**snapshot) in worker threads."""
+    return dict(getattr(_context, "values", {}))
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    price_in, price_out = MODEL_PRICING.get(model, (0.0, 0.0))
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+
+def _message_tokens(messages) -> int:
+    if isinstance(messages, str):
+        return count_tokens(messages)
+    total = 0
+    for message in messages or []:
+        content = message.get("content") if isinstance(message, dict) else getattr(message, "content", "")
+        total += count_tokens(content if isinstance(content, str) else str(content))
+    return total
+
+
+# ---------- RECORDING ----------
+def record_llm_call(
+    provider: str,
+    model: str,
+    latency: float,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0,
+    ttft: Optional[float] = None,
+    success: bool = True,
+    error: Optional[str] = None,
+    role: Optional[str] = None,
+    retries: Optional[int] = None
+) -> None:
+    """Persist one call. Telemetry must never break a research run, so errors are swallowed."""
+    if TELEMETRY_DISABLED:
+        return
+    try:
+        from src.database.crud import create_llm_call_record
+        create_llm_call_record(
+            run_id=current_context("run_id"),
+            role=role or current_context("role"),
+            provider=provider,
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            latency_seconds=latency,
+            ttft_seconds=ttft,
+            retries=retries if retries is not None else (current_context("retries") or 0),
+            success=success,
+            error=(error or "")[:500] or None,
+            cost_usd=estimate_cost(model, prompt_tokens, completion_tokens)
+        )
+    except Exception as e:
+        print(f"⚠️ Telemetry write skipped: {e}")
+
+
+def with_telemetry(llm, provider: str, model: str):
+    """Patches `call` (CrewAI) or `invoke` (LangChain) to time and record every provider call."""
+    method = "call" if hasattr(llm, "call") else "invoke"
+    original = getattr(llm, method)
+
+    @wraps(original)
+    def instrumented(messages, *args, **kwargs):
+        with span(f"llm:{provider}", "llm", model=model, role=current_context("role")):
+            return timed(messages, *args, **kwargs)
+
+    def timed(messages, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = original(messages, *args, **kwargs)
+        except HedgeCancelled:
+            # Never reached the provider
+            raise
+        except Exception as e:
+            record_llm_call(provider, model, time.perf_counter() - started,
+                            prompt_tokens=_message_tokens(messages), success=False, error=str(e))
+            raise
+        text = getattr(result, "content", result)
+        record_llm_call(
+            provider, model, time.perf_counter() - started,
+            prompt_tokens=_message_tokens(messages),
+            completion_tokens=count_tokens(text if isinstance(text, str) else str(text))
+        )
+        return result
+
+    object.__setattr__(llm, method, instrumented)
+    return llm
+
+
+# ---------- SUMMARIES ----------
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize_calls(records, group_by: str = "role") -> List[Dict]:
+    """Aggregates LLMCallRecord rows into p50/p95 latency, tokens and cost per group."""
+    groups: Dict[str, list] = {}
+    for record in records:
+        groups.setdefault(getattr(record, group_by) or "unknown", []).append(record)
+
+    rows = []
+    for name, items in sorted(groups.items()):
+        latencies = [r.latency_seconds for r in items if r.latency_seconds is not None]
+        ttfts = [r.ttft_seconds for r in items if r.ttft_seconds is not None]
+        rows.append({
+            group_by: name,
+            'calls': len(items),
+            'errors': sum(1 for r in items if not r.success),
+            'p50_latency_s': round(_percentile(latencies, 0.50), 2),
+            'p95_latency_s': round(_percentile(latencies, 0.95), 2),
+            'p50_ttft_s': round(_percentile(ttfts, 0.50), 2) if ttfts else None,
+            'prompt_tokens': sum(r.prompt_tokens or 0 for r in items),
+            'completion_tokens': sum(r.completion_tokens or 0 for r in items),
+            'cost_usd': round(sum(r.cost_usd or 0.0 for r in items), 4),
+        })
+    return rows
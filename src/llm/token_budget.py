@@ -0,0 +1,161 @@
+"""
+=========================================================
+📏 TOKEN BUDGETING & MAP-REDUCE CONTEXT COMPACTION
+=========================================================
+Counts tokens per model, knows each model's context window,
+and shrinks oversized context (summarize chunks in parallel,
+then merge) until it fits a configurable budget.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+# Context windows (tokens) for the models this project talks to
+MODEL_CONTEXT_WINDOWS = {
+    'llama-3.3-70b-versatile': 131072,
+    'llama-3.1-70b-versatile': 131072,
+    'llama3.1': 8192,
+    'llama3': 8192,
+    'gemini-1.5-flash': 1048576,
+    'gemini-3-flash-preview': 1048576,
+    'mixtral-8x7b-32768': 32768,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Budgets actually used when building prompts. Groq's free tier rejects
+# requests above its per-minute token allowance (HTTP 413) long before the
+# model window is reached, so the writer budget is well under 128k.
+WRITER_CONTEXT_BUDGET = int(os.getenv('WRITER_CONTEXT_BUDGET', '6000'))
+EXTRACTOR_PAGE_BUDGET = int(os.getenv('EXTRACTOR_PAGE_BUDGET', '3000'))
+
+# Routed extractor / fact-checker calls may land on any of these; Ollama's 8k
+# llama3.1 window is the tightest, so per-call budgets are derived from it.
+EXTRACTOR_MODELS = ('llama3.1', 'llama-3.3-70b-versatile', 'gemini-1.5-flash')
+WRITER_MODEL = 'llama-3.3-70b-versatile'
+# Tokens kept free around the source material for task instructions and the answer
+EXTRACTOR_RESERVED = int(os.getenv('EXTRACTOR_RESERVED_TOKENS', '2560'))
+WRITER_RESERVED = int(os.getenv('WRITER_RESERVED_TOKENS', '4096'))
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+
+def _strip_provider(model: str) -> str:
+    return model.split('/', 1)[-1] if model else model
+
+
+def context_window(model: str) -> int:
+    return MODEL_CONTEXT_WINDOWS.get(_strip_provider(model), DEFAULT_CONTEXT_WINDOW)
+
+
+def prompt_budget(model: str, reserved_output: int = 2048, cap: Optional[int] = None) -> int:
+    """Tokens available for the prompt after reserving room for the completion."""
+    budget = max(256, context_window(model) - reserved_output)
+    return min(budget, cap) if cap else budget
+
+
+def fitting_budget(models, reserved_output: int = 2048, cap: Optional[int] = None) -> int:
+    """Prompt budget that fits every model in `models` (the smallest window wins)."""
+    return min(prompt_budget(model, reserved_output, cap) for model in models)
+
+
+def extractor_page_budget(pages_per_call: int = 1) -> int:
+    """Tokens per page so `pages_per_call` pages plus instructions fit any extractor model."""
+    pages_per_call = max(1, pages_per_call)
+    total = fitting_budget(EXTRACTOR_MODELS, EXTRACTOR_RESERVED, cap=EXTRACTOR_PAGE_BUDGET * pages_per_call)
+    return max(256, total // pages_per_call)
+
+
+def writer_context_budget() -> int:
+    """Writer source-material budget: WRITER_CONTEXT_BUDGET, never more than the writer model's window allows."""
+    return prompt_budget(WRITER_MODEL, WRITER_RESERVED, cap=WRITER_CONTEXT_BUDGET)
+
+
+def count_tokens(text: str) -> int:
+    """tiktoken count when available, otherwise the usual ~4 chars/token estimate."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts text to at most `max_tokens`, preferring a paragraph/sentence boundary."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _ENCODING is not None:
+        cut = _ENCODING.decode(_ENCODING.encode(text, disallowed_special=())[:max_tokens])
+    else:
+        cut = text[:max_tokens * 4]
+    for boundary in ('\n\n', '. ', '\n'):
+        index = cut.rfind(boundary)
+        if index > len(cut) * 0.8:
+            return cut[:index + len(boundary)].rstrip()
+    return cut
+
+
+def split_into_chunks(text: str, chunk_tokens: int) -> List[str]:
+    """Splits on paragraph boundaries into pieces of roughly `chunk_tokens` each."""
+    chunks, current, current_tokens = [], [], 0
+    for paragraph in text.split('\n\n'):
+        tokens = count_tokens(paragraph)
+        if tokens > chunk_tokens:
+            # A single giant paragraph: hard-split it
+            if current:
+                chunks.append('\n\n'.join(current))
+                current, current_tokens = [], 0
+            remaining = paragraph
+            while remaining:
+                piece = trim_to_tokens(remaining, chunk_tokens)
+                chunks.append(piece)
+                remaining = remaining[len(piece):].lstrip()
+            continue
+        if current and current_tokens + tokens > chunk_tokens:
+            chunks.append('\n\n'.join(current))
+            current, current_tokens = [], 0
+        current.append(paragraph)
+        current_tokens += tokens
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+def compact_context(
+    text: str,
+    budget: int,
+    summarize: Optional[Callable[[str, int], str]] = None,
+    chunk_tokens: int = 3000,
+    max_workers: int = 4,
+    max_rounds: int = 2
+) -> str:
+    """
+    Map-reduce compaction: if `text` exceeds `budget` tokens, each chunk is summarized
+    (in parallel) to its share of the budget and the results are merged. Repeats up
+    to `max_rounds` times, then hard-trims as a last resort. Without a `summarize`
+    callable, chunks are proportionally trimmed instead.
+    """
+    for _ in range(max_rounds):
+        total = count_tokens(text)
+        if total <= budget:
+            return text
+        chunks = split_into_chunks(text, chunk_tokens)
+        share = max(64, budget // max(1, len(chunks)))
+        print(f"📏 Compacting context: {total} tokens -> {budget} budget ({len(chunks)} chunks)")
+
+        def reduce_chunk(chunk: str) -> str:
+            if count_tokens(chunk) <= share:
+                return chunk
+            if summarize is not None:
+                try:
+                    return trim_to_tokens(summarize(chunk, share), share)
+                except Exception as e:
+                    print(f"⚠️ Chunk summary failed, trimming instead: {e}")
+            return trim_to_tokens(chunk, share)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            text = '\n\n'.join(pool.map(reduce_chunk, chunks))
+    return trim_to_tokens(text, budget)
@@ -2,6 +2,9 @@ from deep_translator import GoogleTranslator
 from langdetect import detect, DetectorFactory
 from typing import Optional, Dict, List
 import time
+from src.llm.circuit_breaker import get_breaker
+from src.utils.tracing import traced
+from src.utils.replay import replay_call
 
 # Set seed for consistent language detection
 DetectorFactory.seed = 0
@@ -30,6 +33,7 @@ def detect_language(text: str) -> str:
         # Default to English if detection fails
         return 'en'
 
+@traced("translate_text", "translation")
 def translate_text(
     text: str,
     target_language: str,
@@ -55,13 +59,19 @@ def translate_text(
             
         # 3. Setup Translator
         translator = GoogleTranslator(source=actual_source, target=target_language)
+        # Behind a breaker: once Google Translate is down we fall back to the original instantly
+        breaker = get_breaker("google_translate")
+        translate = lambda chunk: replay_call(
+            "translate", {"source": actual_source, "target": target_language, "text": chunk},
+            lambda: breaker.call(translator.translate, chunk)
+        )
         
         # 4. Smart Chunking (Standard 5000 limit, using 3500 for safety)
         # We split by double newlines to keep paragraphs intact for the PDF generator
         max_chars = 3500 
         
         if len(text) <= max_chars:
-            return translator.translate(text)
+            return translate(text)
         
         # Split into paragraphs to maintain Markdown structure
         paragraphs = text.split('\n\n')
@@ -74,14 +84,14 @@ def translate_text(
             else:
                 # Translate the accumulated chunk
                 if current_chunk.strip():
-                    translated_paragraphs.append(translator.translate(current_chunk.strip()))
+                    translated_paragraphs.append(translate(current_chunk.strip()))
                     # Tiny sleep to avoid Google rate-limiting
                     time.sleep(0.5) 
                 current_chunk = p + "\n\n"
 
         # Translate final chunk
         if current_chunk.strip():
-            translated_paragraphs.append(translator.translate(current_chunk.strip()))
+            translated_paragraphs.append(translate(current_chunk.strip()))
 
         final_result = '\n\n'.join(translated_paragraphs)
         
@@ -1,3 +1,4 @@
 from .helpers import convert_md_to_pdf, validate_env_variables
+from .http_session import get_session, get_async_client
 
-__all__ = ['convert_md_to_pdf', 'validate_env_variables']
\ No newline at end of file
+__all__ = ['convert_md_to_pdf', 'validate_env_variables', 'get_session', 'get_async_client']
\ No newline at end of file
@@ -0,0 +1,386 @@
+"""
+=========================================================
+🧹 HTML → TEXT EXTRACTION ENGINES (MAIN CONTENT ONLY)
+=========================================================
+Pluggable engines that turn a fetched page into the text the
+extractor reads, without menus, cookie banners or footers:
+
+  lxml    readability-style scoring over an lxml tree (C parser)
+  stream  stdlib tokenizer, no tree: keeps the dense text region
+  bs4     the original BeautifulSoup get_text() path (reference)
+
+`auto` (the default) uses lxml when it is installed, otherwise
+the stream engine. Choose one with HTML_EXTRACT_ENGINE.
+"""
+import codecs
+import os
+import re
+from html.parser import HTMLParser
+from importlib.util import find_spec
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+HtmlInput = Union[bytes, str]
+
+DEFAULT_ENGINE = os.getenv("HTML_EXTRACT_ENGINE", "auto")
+
+# Never part of the readable content. <form> and <header> are not listed: WebForms pages
+# wrap the whole body in a <form>, and an article's <header> holds its headline; class/id
+# hints and scoring decide those instead.
+BOILERPLATE_TAGS = {
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object", "embed",
+    "nav", "footer", "aside", "button", "select", "option", "label", "dialog",
+}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "dl", "dt", "dd", "table", "tr",
+    "td", "th", "pre", "blockquote", "figure", "figcaption", "h1", "h2", "h3", "h4", "h5", "h6", "br", "hr",
+}
+# Page-level containers are never discarded on class/id hints alone
+ROOT_TAGS = {"html", "body", "article", "main"}
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param",
+    "source", "track", "wbr",
+}
+
+# Class / id hints (readability's "unlikely" and "positive" candidate patterns)
+_NEGATIVE = re.compile(
+    r"cookie|consent|gdpr|banner|menu|navbar|breadcrumb|sidebar|footer|masthead|site-?header|comment|disqus|"
+    r"social|share|sharing|subscribe|newsletter|signup|popup|modal|overlay|advert|\bads?\b|sponsor|"
+    r"promo|related|recommend|widget|skip-link|pagination|pager",
+    re.IGNORECASE
+)
+_POSITIVE = re.compile(r"article|content|entry|main|post|story|text|body|blog", re.IGNORECASE)
+_HIDDEN_STYLE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.IGNORECASE)
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+_SKIPPED_BLOCK = re.compile(r"<(script|style|noscript|template|svg)\b.*?</\1\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL)
+_SKIPPED_START = re.compile(r"<(?:script|style|noscript|template|svg)\b|<!--", re.IGNORECASE)
+_TAG = re.compile(r"<[^>]*>")
+_SPACES = re.compile(r"[ \t\r\f\v ]+")
+
+# Below this the detected article is treated as a miss and the whole page is used instead
+MIN_ARTICLE_CHARS = 250
+
+
+# --- 1. Shared helpers ---
+def decode_html(html: HtmlInput, encoding: Optional[str] = None) -> str:
+    """
+    Page bytes as text: the given (HTTP header) charset, else the <meta charset>, else
+    UTF-8, else Windows-1252. Undecodable bytes are replaced, never raised.
+    """
+    if isinstance(html, str):
+        return html
+    if not encoding:
+        match = _META_CHARSET.search(html[:4096])
+        encoding = match.group(1).decode("ascii", "ignore") if match else None
+    if not encoding:
+        try:
+            return html.decode("utf-8")
+        except UnicodeDecodeError:
+            encoding = "cp1252"
+    try:
+        return html.decode(encoding, errors="replace")
+    except LookupError:
+        return html.decode("utf-8", errors="replace")
+
+
+def _is_unlikely(attrs: Dict[str, Optional[str]]) -> bool:
+    """Hidden, or a class/id that marks navigation, banners, comments, ads..."""
+    if "hidden" in attrs or (attrs.get("aria-hidden") or "").lower() == "true":
+        return True
+    if _HIDDEN_STYLE.search(attrs.get("style") or ""):
+        return True
+    hints = f"{attrs.get('class') or ''} {attrs.get('id') or ''}"
+    return bool(_NEGATIVE.search(hints)) and not _POSITIVE.search(hints)
+
+
+def _normalize_lines(text: str) -> str:
+    """Collapses runs of whitespace inside lines and drops empty lines."""
+    lines = (_SPACES.sub(" ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+class TextMeter:
+    """
+    Running estimate of the readable characters in a page arriving chunk by chunk, so a
+    download can stop once there is enough text. Regex-only (no parsing): script/style
+    bodies, comments and tags are stripped; navigation text still counts.
+    """
+
+    def __init__(self, target_chars: int, encoding: Optional[str] = None):
+        try:
+            self.decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        except LookupError:
+            self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.target_chars = target_chars
+        self.chars = 0
+        self.pending = ""
+
+    def feed(self, chunk: bytes) -> bool:
+        """Adds a chunk; True once `target_chars` of text have been seen."""
+        data = _SKIPPED_BLOCK.sub(" ", self.pending + self.decoder.decode(chunk))
+        # Hold back an unclosed script/comment or a tag cut in half until the next chunk completes it
+        cut = len(data)
+        unclosed = _SKIPPED_START.search(data)
+        if unclosed:
+            cut = unclosed.start()
+        last_open = data.rfind("<", 0, cut)
+        if last_open != -1 and data.find(">", last_open, cut) == -1:
+            cut = last_open
+        self.pending = data[cut:]
+        self.chars += len("".join(_TAG.sub(" ", data[:cut]).split()))
+        return self.chars >= self.target_chars
+
+
+# --- 2. Engine registry ---
+ENGINES: Dict[str, Callable[[HtmlInput], str]] = {}
+_REQUIRES: Dict[str, Optional[str]] = {}
+
+
+def register_engine(name: str, requires: Optional[str] = None):
+    """Registers `func(html) -> text` as engine `name` (`requires`: module it needs to be available)."""
+    def decorator(func):
+        ENGINES[name] = func
+        _REQUIRES[name] = requires
+        return func
+    return decorator
+
+
+def available_engines() -> List[str]:
+    return [name for name in ENGINES if _REQUIRES[name] is None or find_spec(_REQUIRES[name]) is not None]
+
+
+def resolve_engine(name: Optional[str] = None) -> str:
+    """Concrete engine name for `name` ('auto', empty or unavailable → lxml if installed, else stream)."""
+    name = (name or DEFAULT_ENGINE).lower()
+    if name in ENGINES and name in available_engines():
+        return name
+    if name != "auto":
+        print(f"⚠️ HTML engine '{name}' is not available - using auto.")
+    return "lxml" if HAS_LXML else "stream"
+
+
+def extract_text(html: HtmlInput, engine: Optional[str] = None, encoding: Optional[str] = None) -> str:
+    """
+    Readable main-content text of a page; falls back to the stream engine if the chosen
+    one fails. Bytes are decoded here, the same way for every engine: `encoding` (the HTTP
+    charset) first, then the page's <meta charset>, UTF-8 and Windows-1252.
+    """
+    name = resolve_engine(engine)
+    if isinstance(html, bytes):
+        html = decode_html(html, encoding)
+    try:
+        return ENGINES[name](html)
+    except Exception as e:
+        if name == "stream":
+            raise
+        print(f"⚠️ HTML engine '{name}' failed ({e}) - falling back to stream.")
+        return ENGINES["stream"](html)
+
+
+# --- 3. Reference engine (the original extraction path) ---
+@register_engine("bs4", requires="bs4")
+def extract_bs4(html: HtmlInput) -> str:
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup(["script", "style", "nav", "footer"]):
+        script.decompose()
+    return soup.get_text(separator=' ', strip=True)
+
+
+# --- 4. lxml engine (readability-style main-content detection) ---
+def _lxml_text(node) -> str:
+    """Text under `node` with one line per block element (comments and PIs skipped)."""
+    parts = []
+    for event, el in etree.iterwalk(node, events=("start", "end")):
+        is_element = isinstance(el.tag, str)
+        if event == "start":
+            if is_element:
+                if el.tag in BLOCK_TAGS:
+                    parts.append("\n")
+                if el.text:
+                    parts.append(el.text)
+        else:
+            if is_element and el.tag in BLOCK_TAGS:
+                parts.append("\n")
+            if el.tail and el is not node:
+                parts.append(el.tail)
+    return _normalize_lines("".join(parts))
+
+
+def _text_length(node) -> int:
+    return len(" ".join(node.text_content().split()))
+
+
+def _link_density(node) -> float:
+    length = _text_length(node)
+    if not length:
+        return 1.0
+    return sum(_text_length(link) for link in node.iter("a")) / length
+
+
+def _class_weight(node) -> int:
+    hints = f"{node.get('class') or ''} {node.get('id') or ''}"
+    weight = 0
+    if _NEGATIVE.search(hints):
+        weight -= 25
+    if _POSITIVE.search(hints):
+        weight += 25
+    return weight
+
+
+_TAG_BONUS = {"article": 10, "main": 10, "div": 5, "section": 3, "pre": 3, "td": 3, "blockquote": 3,
+              "form": -3, "ol": -3, "ul": -3, "li": -3, "th": -5, "h1": -5, "h2": -5, "h3": -5}
+
+
+def _lxml_document(html: HtmlInput):
+    if isinstance(html, str):
+        # lxml refuses str input that carries an XML encoding declaration
+        return lxml.html.document_fromstring(html.encode("utf-8"), parser=lxml.html.HTMLParser(encoding="utf-8"))
+    return lxml.html.document_fromstring(html)
+
+
+@register_engine("lxml", requires="lxml")
+def extract_lxml(html: HtmlInput) -> str:
+    try:
+        doc = _lxml_document(html)
+    except etree.ParserError:
+        return ""
+
+    # Strip boilerplate and unlikely candidates (drop_tree keeps the tail text in place)
+    for el in list(doc.iter()):
+        if not isinstance(el.tag, str):
+            if el.getparent() is not None:
+                el.drop_tree()
+            continue
+        if el.tag in ROOT_TAGS or el.getparent() is None:
+            continue
+        if el.tag in BOILERPLATE_TAGS or _is_unlikely(el.attrib):
+            el.drop_tree()
+
+    body = doc.find("body")
+    if body is None:
+        body = doc
+
+    # Score paragraphs into their parent (full) and grandparent (half)
+    scores = {}
+    for paragraph in body.iter("p", "pre", "td", "blockquote"):
+        text = " ".join(paragraph.text_content().split())
+        if len(text) < 25:
+            continue
+        points = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = paragraph.getparent()
+        for node, share in ((parent, 1.0), (parent.getparent() if parent is not None else None, 0.5)):
+            if node is None:
+                continue
+            if node not in scores:
+                scores[node] = _class_weight(node) + _TAG_BONUS.get(node.tag, 0)
+            scores[node] += points * share
+
+    if not scores:
+        return _lxml_text(body)
+    adjusted = {node: score * (1 - _link_density(node)) for node, score in scores.items()}
+    top = max(adjusted, key=adjusted.get)
+
+    # Siblings that score well (or are plain prose paragraphs) belong to the article too
+    parent = top.getparent()
+    threshold = max(10.0, adjusted[top] * 0.2)
+    if parent is None:
+        chosen = [top]
+    else:
+        chosen = []
+        for sibling in parent:
+            if sibling is top or adjusted.get(sibling, 0) >= threshold:
+                chosen.append(sibling)
+            elif sibling.tag == "p" and _text_length(sibling) > 80 and _link_density(sibling) < 0.25:
+                chosen.append(sibling)
+
+    text = "\n".join(part for part in (_lxml_text(node) for node in chosen) if part)
+    return text if len(text) >= MIN_ARTICLE_CHARS else _lxml_text(body)
+
+
+# --- 5. Streaming engine (stdlib tokenizer, no tree) ---
+class _BlockCollector(HTMLParser):
+    """Collects (tag, text, link chars) per text block, skipping boilerplate subtrees as they stream by."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[Tuple[str, bool]] = []
+        self.skip_depth = 0
+        self.link_depth = 0
+        self.blocks: List[Tuple[str, str, int]] = []
+        self.parts: List[str] = []
+        self.link_chars = 0
+        self.block_tag = "p"
+
+    def _flush(self):
+        text = " ".join("".join(self.parts).split())
+        if text:
+            self.blocks.append((self.block_tag, text, min(self.link_chars, len(text))))
+        self.parts, self.link_chars = [], 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            if tag in BLOCK_TAGS and not self.skip_depth:
+                self._flush()
+            return
+        skip = tag in BOILERPLATE_TAGS or (tag not in ROOT_TAGS and _is_unlikely(dict(attrs)))
+        self.stack.append((tag, skip))
+        self.skip_depth += skip
+        if tag == "a":
+            self.link_depth += 1
+        if tag in BLOCK_TAGS and not self.skip_depth:
+            self._flush()
+            self.block_tag = tag
+
+    def handle_endtag(self, tag):
+        if not any(open_tag == tag for open_tag, _ in self.stack):
+            return
+        while self.stack:
+            open_tag, skip = self.stack.pop()
+            self.skip_depth -= skip
+            if open_tag == "a":
+                self.link_depth -= 1
+            if open_tag == tag:
+                break
+        if tag in BLOCK_TAGS and not self.skip_depth:
+            self._flush()
+            self.block_tag = "p"
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        self.parts.append(data)
+        if self.link_depth:
+            self.link_chars += len(data.strip())
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+@register_engine("stream")
+def extract_stream(html: HtmlInput) -> str:
+    collector = _BlockCollector()
+    collector.feed(decode_html(html))
+    collector.close()
+    blocks = [(tag, text) for tag, text, link_chars in collector.blocks if link_chars / len(text) <= 0.5]
+
+    # The article is the region between the first and last dense prose block
+    dense = [i for i, (tag, text) in enumerate(blocks) if tag not in HEADING_TAGS and len(text) >= 80]
+    if not dense:
+        return "\n".join(text for _, text in blocks)
+    first, last = dense[0], dense[-1]
+    # Keep the heading(s) directly above the first paragraph, across a short byline/dateline
+    if first > 1 and len(blocks[first - 1][1]) < 80 and blocks[first - 2][0] in HEADING_TAGS:
+        first -= 1
+    while first > 0 and blocks[first - 1][0] in HEADING_TAGS:
+        first -= 1
+    text = "\n".join(text for _, text in blocks[first:last + 1])
+    return text if len(text) >= MIN_ARTICLE_CHARS else "\n".join(text for _, text in blocks)
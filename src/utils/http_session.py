@@ -0,0 +1,227 @@
+"""
+=========================================================
+🌐 SHARED HTTP LAYER — POOLED, TIMED, RETRYING
+=========================================================
+One keep-alive connection pool per process for every outbound
+call (LLM HTTP, scraping, exporters, readiness checks), with
+default timeouts, compressed transfers and Retry-After aware
+retries. Page scraping goes through fetch_page(), which streams
+the body under a byte cap instead of downloading it whole.
+"""
+import os
+import threading
+from typing import Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = (float(os.getenv("HTTP_CONNECT_TIMEOUT", "10")), float(os.getenv("HTTP_READ_TIMEOUT", "60")))
+MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "10"))
+MAX_HOSTS = 32
+
+try:
+    import brotli  # noqa: F401  (urllib3 decodes "br" when it is installed)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# Decoded bytes read per scraped page before the rest is abandoned
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", str(2 * 1024 * 1024)))
+FETCH_CHUNK_BYTES = 64 * 1024
+TEXT_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "text/xml", "application/xml")
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+
+
+class TimeoutSession(requests.Session):
+    """requests.Session that applies DEFAULT_TIMEOUT whenever a caller forgets one."""
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+# Methods retried automatically. POST/PATCH are not idempotent (a retried completion is
+# billed twice); callers opt in per request type with get_session(retry_post=True).
+RETRY_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _build_retry(total: int = 3, methods: frozenset = RETRY_METHODS) -> Retry:
+    # 429/503 responses carrying Retry-After are honored before retrying
+    return Retry(
+        total=total,
+        connect=total,
+        read=1,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=methods,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+
+
+def create_session(retries: int = 3, retry_post: bool = False) -> TimeoutSession:
+    """Builds a pooled session. Most callers should use get_session() instead."""
+    methods = RETRY_METHODS | {"POST"} if retry_post else RETRY_METHODS
+    session = TimeoutSession()
+    adapter = HTTPAdapter(
+        pool_connections=MAX_HOSTS,
+        pool_maxsize=MAX_CONNECTIONS_PER_HOST,
+        pool_block=True,  # caps concurrent connections per host
+        max_retries=_build_retry(retries, methods)
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING})
+    return session
+
+
+# ---------- STREAMING PAGE FETCH ----------
+class UnsupportedContent(requests.RequestException):
+    """The response is not a text page (image, PDF, archive...), so its body was never read."""
+
+
+class FetchedPage:
+    """Body (possibly only its first `max_bytes`) and metadata of one streamed GET."""
+
+    def __init__(self, url: str, status_code: int, headers, body: bytes, encoding: Optional[str], truncated: bool):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.encoding = encoding
+        self.truncated = truncated
+
+
+def _content_type(headers) -> tuple:
+    """(mime type, charset or None) from the Content-Type header."""
+    mime, _, params = (headers.get("Content-Type") or "").partition(";")
+    charset = None
+    for param in params.split(";"):
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "charset" and value:
+            charset = value.strip('"\' ').lower()
+    return mime.strip().lower(), charset
+
+
+def fetch_page(
+    url: str,
+    max_bytes: int = FETCH_MAX_BYTES,
+    headers: Optional[dict] = None,
+    timeout=15,
+    make_stop: Optional[Callable[[Optional[str]], Callable[[bytes], bool]]] = None
+) -> FetchedPage:
+    """
+    Streamed GET for scraping. Rejects non-text Content-Types before reading the body,
+    then reads it in chunks until the end, `max_bytes` of decoded content, or `stop(chunk)`
+    returning True (e.g. once enough text has arrived). `make_stop(charset)` builds that
+    `stop` once the headers are in, so it can decode with the page's charset. Raises for
+    HTTP errors; a 304 comes back with an empty body. `encoding` is the Content-Type charset, if any.
+    """
+    with get_session().get(url, headers=headers, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        mime, charset = _content_type(response.headers)
+        if response.status_code == 304:
+            return FetchedPage(response.url, 304, response.headers, b"", charset, False)
+        if mime and mime not in TEXT_CONTENT_TYPES:
+            raise UnsupportedContent(f"Unsupported content type '{mime}'", response=response)
+
+        declared = int(response.headers.get("Content-Length") or 0)
+        if declared > max_bytes:
+            print(f"✂️ {url} declares {declared / 1024:.0f} KB - reading the first {max_bytes / 1024:.0f} KB")
+
+        stop = make_stop(charset) if make_stop is not None else None
+
+        chunks, size, truncated = [], 0, False
+        for chunk in response.iter_content(chunk_size=FETCH_CHUNK_BYTES):
+            if not chunks and not mime and b"\x00" in chunk[:1024]:
+                raise UnsupportedContent("Response body looks binary", response=response)
+            chunks.append(chunk[:max_bytes - size])
+            size += len(chunks[-1])
+            if size >= max_bytes or (stop is not None and stop(chunk)):
+                truncated = True
+                break
+        return FetchedPage(response.url, response.status_code, response.headers, b"".join(chunks), charset, truncated)
+
+
+# ---------- SHARED INSTANCES ----------
+_session: Optional[TimeoutSession] = None
+_probe_session: Optional[TimeoutSession] = None
+_post_retry_session: Optional[TimeoutSession] = None
+_httpx_client = None
+_async_client = None
+_lock = threading.Lock()
+
+
+def get_session(retries: bool = True, retry_post: bool = False) -> TimeoutSession:
+    """
+    Process-wide pooled requests session. Pass retries=False for health probes,
+    which should fail fast instead of backing off, and retry_post=True only for
+    idempotent POST APIs (e.g. a search query) that are safe to resend.
+    """
+    global _session, _probe_session, _post_retry_session
+    with _lock:
+        if not retries:
+            if _probe_session is None:
+                _probe_session = create_session(retries=0)
+            return _probe_session
+        if retry_post:
+            if _post_retry_session is None:
+                _post_retry_session = create_session(retry_post=True)
+            return _post_retry_session
+        if _session is None:
+            _session = create_session()
+        return _session
+
+
+def _httpx_limits():
+    import httpx
+    return httpx.Limits(
+        max_connections=MAX_HOSTS * MAX_CONNECTIONS_PER_HOST,
+        max_keepalive_connections=MAX_HOSTS,
+        keepalive_expiry=60
+    )
+
+
+def create_httpx_client():
+    """
+    Builds a pooled sync httpx client. SDKs that rewrite base_url/auth on the client
+    they are given (e.g. notion-client) should own one of these instead of sharing.
+    """
+    import httpx
+    return httpx.Client(
+        limits=_httpx_limits(),
+        timeout=httpx.Timeout(DEFAULT_TIMEOUT[1], connect=DEFAULT_TIMEOUT[0]),
+        headers={"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING},
+        transport=httpx.HTTPTransport(retries=2),
+        follow_redirects=True
+    )
+
+
+def get_httpx_client():
+    """Process-wide sync httpx client."""
+    global _httpx_client
+    with _lock:
+        if _httpx_client is None:
+            _httpx_client = create_httpx_client()
+        return _httpx_client
+
+
+def get_async_client():
+    """Process-wide pooled httpx.AsyncClient for asyncio code paths."""
+    global _async_client
+    import httpx
+    with _lock:
+        if _async_client is None:
+            _async_client = httpx.AsyncClient(
+                limits=_httpx_limits(),
+                timeout=httpx.Timeout(DEFAULT_TIMEOUT[1], connect=DEFAULT_TIMEOUT[0]),
+                headers={"User-Agent": USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING},
+                transport=httpx.AsyncHTTPTransport(retries=2),
+                follow_redirects=True
+            )
+        return _async_client
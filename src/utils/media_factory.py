@@ -1,14 +1,27 @@
+import io
 import os
 from gtts import gTTS
 from deep_translator import GoogleTranslator
 import streamlit as st
+from src.llm.circuit_breaker import get_breaker
+from src.utils.tracing import span
+from src.utils.replay import replay_call
 
-def generate_multilingual_assets(report_path):
+def _synthesize(text, lang_code):
+    """gTTS audio as bytes (so it can be recorded and replayed like any other response)."""
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=lang_code).write_to_fp(buffer)
+    return buffer.getvalue()
+
+def generate_multilingual_assets(report_path, languages=None, audio=True, run_id=None):
     """
-    Robustly generates translated text and audio for 5 languages.
+    Robustly generates translated text and audio for 5 languages
+    (or only `languages`, without audio when `audio` is False).
+    Files go to output/<run_id>/ so concurrent jobs never overwrite each other.
     SAFE MODE: If any language fails, it skips it without crashing the app.
     """
     results = {}
+    output_dir = os.path.join("output", run_id) if run_id else "output"
     
     # 1. Validation: Ensure the source report actually exists
     if not os.path.exists(report_path):
@@ -23,16 +36,17 @@ def generate_multilingual_assets(report_path):
 
     # 2. Define User-Requested Languages
     # (Code, Display Name)
-    languages = [
+    all_languages = [
         ('en', 'English'),
         ('hi', 'Hindi'),
         ('ar', 'Arabic'),
         ('es', 'Spanish'),
         ('fr', 'French')
     ]
+    selected = [(code, name) for code, name in all_languages if languages is None or code in languages]
 
     # 3. Process Each Language Independently
-    for lang_code, lang_name in languages:
+    for lang_code, lang_name in selected:
         try:
             # --- A. TRANSLATION (With Chunking for Safety) ---
             if lang_code == 'en':
@@ -47,7 +61,11 @@ def generate_multilingual_assets(report_path):
                     if len(chunk.strip()) > 0:
                         try:
                             # Limit chunk size to 4500 to stay under API limits
-                            trans = translator.translate(chunk[:4500]) 
+                            with span(f"translate:{lang_code}", "translation", chars=len(chunk[:4500])):
+                                trans = replay_call(
+                                    "translate", {"source": "auto", "target": lang_code, "text": chunk[:4500]},
+                                    lambda: get_breaker("google_translate").call(translator.translate, chunk[:4500])
+                                )
                             translated_chunks.append(trans)
                         except Exception as e:
                             # Fallback: If translation fails, keep original text
@@ -59,26 +77,31 @@ def generate_multilingual_assets(report_path):
             # --- B. SAVE REPORT FILE (The "PDF" Equivalent) ---
             # We save as .md because generating PDFs with Hindi/Arabic fonts 
             # often crashes Python. Markdown is safer and universal.
-            os.makedirs("output", exist_ok=True)
+            os.makedirs(output_dir, exist_ok=True)
             report_filename = f"report_{lang_code}.md"
-            report_file_path = os.path.join("output", report_filename)
+            report_file_path = os.path.join(output_dir, report_filename)
             
             with open(report_file_path, "w", encoding="utf-8") as f:
                 f.write(text_content)
 
             # --- C. AUDIO GENERATION (gTTS) ---
             audio_filename = f"audio_{lang_code}.mp3"
-            audio_path = os.path.join("output", audio_filename)
+            audio_path = os.path.join(output_dir, audio_filename)
             
             # gTTS is robust. We limit text to 3000 chars to ensure speed.
-            if text_content.strip():
-                tts = gTTS(text=text_content[:3000], lang=lang_code) 
-                tts.save(audio_path)
+            if audio and text_content.strip():
+                with span(f"tts:{lang_code}", "tts", chars=len(text_content[:3000])):
+                    audio_bytes = replay_call(
+                        "tts", {"lang": lang_code, "text": text_content[:3000]},
+                        lambda: _synthesize(text_content[:3000], lang_code)
+                    )
+                with open(audio_path, "wb") as f:
+                    f.write(audio_bytes)
 
             # Store successful paths
             results[lang_name] = {
                 "text": text_content,
-                "audio_path": audio_path,
+                "audio_path": audio_path if audio else None,
                 "report_path": report_file_path 
             }
             
@@ -0,0 +1,160 @@
+"""
+=========================================================
+📄 PAGE CACHE — SQLITE, COMPRESSED, REVALIDATING
+=========================================================
+Extracted page text is stored per canonical URL (zlib
+compressed) with the page's ETag / Last-Modified. Within the
+freshness window a hit is served without any network call;
+after it, a conditional GET decides whether the cached text is
+still good (304) or the page must be extracted again.
+"""
+import os
+import time
+import zlib
+import sqlite3
+import threading
+from typing import Optional
+
+from src.utils.singleflight import normalize_url
+
+DEFAULT_PAGE_CACHE_PATH = os.getenv("PAGE_CACHE_PATH", "data/page_cache.db")
+DEFAULT_FRESH_SECONDS = int(os.getenv("PAGE_CACHE_FRESH_SECONDS", str(6 * 3600)))
+DEFAULT_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(300 * 1024 * 1024)))
+
+
+class CachedPage:
+    """One cache entry; `fresh` means it may be served without revalidation."""
+
+    def __init__(self, url: str, text: str, etag: Optional[str], last_modified: Optional[str], fresh: bool):
+        self.url = url
+        self.text = text
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh = fresh
+
+    @property
+    def can_revalidate(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """Thread-safe SQLite page cache with a freshness window and size-based LRU eviction."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PAGE_CACHE_PATH,
+        fresh_seconds: int = DEFAULT_FRESH_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.path = path
+        self.fresh_seconds = fresh_seconds
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                content BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                validated_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_access ON pages(last_access)")
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Cached page (fresh or stale), or None on a miss."""
+        key = normalize_url(url)
+        now = time.time()
+        with self.lock:
+            row = self._conn.execute(
+                "SELECT content, etag, last_modified, validated_at FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            content, etag, last_modified, validated_at = row
+            self._conn.execute("UPDATE pages SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        fresh = now - validated_at <= self.fresh_seconds
+        return CachedPage(url, zlib.decompress(content).decode("utf-8"), etag, last_modified, fresh)
+
+    def set(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Stores extracted text with its validators and evicts LRU rows past the size cap."""
+        if not isinstance(text, str) or not text.strip():
+            return
+        content = zlib.compress(text.encode("utf-8"), 6)
+        now = time.time()
+        with self.lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(key, url, content, etag, last_modified, size, validated_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (normalize_url(url), url, content, etag, last_modified, len(content), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def mark_validated(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """A 304 confirmed the cached text: restart its freshness window (and keep any new validators)."""
+        with self.lock:
+            self._conn.execute(
+                "UPDATE pages SET validated_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                (time.time(), etag, last_modified, normalize_url(url))
+            )
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM pages ORDER BY last_access ASC").fetchall():
+            self._conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        with self.lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self.lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes}
+
+
+# Global instance (lazy so importing the module never touches the disk)
+_page_cache: Optional[PageCache] = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """Shared cache instance, or None when disabled via PAGE_CACHE_DISABLED=1."""
+    global _page_cache
+    if os.getenv("PAGE_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache()
+        return _page_cache
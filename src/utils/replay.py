@@ -0,0 +1,232 @@
+"""
+=========================================================
+📼 RECORD / REPLAY CASSETTES FOR OUTBOUND CALLS
+=========================================================
+REPLAY_MODE=record captures every LLM, search/scrape tool,
+translation and TTS response of a run into a cassette file
+(REPLAY_CASSETTE). REPLAY_MODE=replay serves them back with
+no network at all, after an injected latency, so the pipeline
+can be benchmarked on an air-gapped box.
+"""
+import atexit
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+from src.llm.circuit_breaker import HedgeCancelled
+
+DEFAULT_CASSETTE = "benchmarks/cassettes/default.json"
+
+
+class ReplayMissError(RuntimeError):
+    """A replayed run made a call the cassette has no recording for."""
+
+
+class ReplayedError(RuntimeError):
+    """Stand-in for an exception the live call raised while recording."""
+
+
+def _encode(value: Any) -> Dict:
+    if isinstance(value, bytes):
+        return {"type": "bytes", "value": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, (str, int, float, bool, list, dict)) or value is None:
+        return {"type": "json", "value": value}
+    # LangChain messages and similar objects: keep the text content
+    return {"type": "message", "value": str(getattr(value, "content", value))}
+
+
+def _decode(entry: Dict) -> Any:
+    if entry["type"] == "bytes":
+        return base64.b64decode(entry["value"])
+    if entry["type"] == "message":
+        try:
+            from langchain_core.messages import AIMessage
+            return AIMessage(content=entry["value"])
+        except ImportError:
+            return entry["value"]
+    return entry["value"]
+
+
+def request_key(kind: str, request: Any) -> str:
+    payload = json.dumps(request, sort_keys=True, default=str, ensure_ascii=False)
+    return f"{kind}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]}"
+
+
+class Cassette:
+    """
+    Recorded responses keyed by call kind + request hash. Identical requests are
+    replayed in recorded order (the last one repeats once they run out); if a request
+    was never recorded, the next unused response of the same kind is served
+    (prompts can drift slightly between runs).
+    """
+
+    def __init__(self, path: str, mode: str, latency_ms: Optional[float] = None, latency_scale: float = 1.0):
+        self.path = path
+        self.mode = mode
+        self.latency_ms = latency_ms        # fixed injected latency; None = recorded latency
+        self.latency_scale = latency_scale  # multiplier applied to recorded latency
+        self.interactions: Dict[str, list] = {}
+        self.order: list = []               # (kind, key) in recording order
+        self.cursor: Dict[str, int] = {}
+        self.used = set()
+        self.injected_seconds = 0.0
+        self.calls = 0
+        self.misses = 0
+        self.metadata: Dict = {}
+        self.lock = threading.Lock()
+        if mode == "replay":
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.interactions = data.get("interactions", {})
+            self.metadata = data.get("metadata", {})
+            self.order = [tuple(item) for item in data.get("order", [])]
+
+    def call(self, kind: str, request: Any, fn: Callable[[], Any]) -> Any:
+        key = request_key(kind, request)
+        if self.mode == "record":
+            started = time.perf_counter()
+            entry = None
+            try:
+                result = fn()
+                entry = {"response": _encode(result)}
+            except HedgeCancelled:
+                # The losing side of a hedge never reached the provider: nothing to replay
+                raise
+            except Exception as e:
+                # Failures are part of the run too (retries, fallbacks): replay them
+                entry = {"error": f"{type(e).__name__}: {e}"}
+                raise
+            finally:
+                if entry is not None:
+                    entry["latency"] = time.perf_counter() - started
+                    with self.lock:
+                        self.interactions.setdefault(key, []).append(entry)
+                        self.order.append((kind, key))
+            return result
+        entry = self._lookup(kind, key)
+        delay = self.latency_ms / 1000 if self.latency_ms is not None else entry["latency"] * self.latency_scale
+        with self.lock:
+            self.calls += 1
+            self.injected_seconds += delay
+        if delay > 0:
+            time.sleep(delay)
+        if "error" in entry:
+            raise ReplayedError(entry["error"])
+        return _decode(entry["response"])
+
+    def _lookup(self, kind: str, key: str) -> Dict:
+        with self.lock:
+            recorded = self.interactions.get(key, [])
+            index = self.cursor.get(key, 0)
+            if index < len(recorded):
+                self.cursor[key] = index + 1
+                self.used.add((key, index))
+                return recorded[index]
+            if recorded:
+                # Replayed more often than recorded (e.g. calls coalesced differently)
+                return recorded[-1]
+            # Fallback: next unused recording of the same kind
+            self.misses += 1
+            for other_kind, other_key in self.order:
+                if other_kind != kind:
+                    continue
+                for i, entry in enumerate(self.interactions.get(other_key, [])):
+                    if (other_key, i) not in self.used:
+                        self.used.add((other_key, i))
+                        print(f"📼 Replay miss for {key} - serving nearest {kind} recording")
+                        return entry
+        raise ReplayMissError(f"No recording left for {kind} call {key}")
+
+    def rewind(self) -> None:
+        """Starts a fresh replay pass: every recording is unused again and the counters restart."""
+        with self.lock:
+            self.cursor.clear()
+            self.used.clear()
+            self.calls = 0
+            self.misses = 0
+            self.injected_seconds = 0.0
+
+    def save(self, metadata: Optional[Dict] = None) -> None:
+        if self.mode != "record":
+            return
+        with self.lock:
+            self.metadata.update(metadata or {})
+            data = {
+                "version": 1,
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "metadata": self.metadata,
+                "order": self.order,
+                "interactions": self.interactions,
+            }
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        print(f"📼 Cassette saved: {self.path} ({len(self.order)} call(s))")
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"mode": self.mode, "calls": self.calls, "misses": self.misses,
+                    "injected_latency_s": round(self.injected_seconds, 3)}
+
+
+# Global instance (configured from the environment on first use)
+_cassette: Optional[Cassette] = None
+_configured = False
+_cassette_lock = threading.Lock()
+
+
+def configure_replay(
+    mode: Optional[str],
+    path: str = DEFAULT_CASSETTE,
+    latency_ms: Optional[float] = None,
+    latency_scale: float = 1.0
+) -> Optional[Cassette]:
+    """Switches the process to record/replay mode (or off with mode=None)."""
+    global _cassette, _configured
+    with _cassette_lock:
+        _configured = True
+        _cassette = Cassette(path, mode, latency_ms, latency_scale) if mode in ("record", "replay") else None
+        if _cassette is not None and mode == "record":
+            atexit.register(_cassette.save)
+        return _cassette
+
+
+def get_cassette() -> Optional[Cassette]:
+    if not _configured:
+        latency = os.getenv("REPLAY_LATENCY_MS")
+        configure_replay(
+            os.getenv("REPLAY_MODE", "").lower() or None,
+            os.getenv("REPLAY_CASSETTE", DEFAULT_CASSETTE),
+            float(latency) if latency else None,
+            float(os.getenv("REPLAY_LATENCY_SCALE", "1.0"))
+        )
+    return _cassette
+
+
+def replay_call(kind: str, request: Any, fn: Callable[[], Any]) -> Any:
+    """Runs `fn` normally, records its result, or serves the recorded result - depending on the mode."""
+    cassette = get_cassette()
+    if cassette is None:
+        return fn()
+    return cassette.call(kind, request, fn)
+
+
+def replayable(kind: str, request_fn: Callable[..., Any]):
+    """Decorator form: `request_fn(*args, **kwargs)` builds the request that identifies the call."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return replay_call(kind, request_fn(*args, **kwargs), lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def is_replaying() -> bool:
+    cassette = get_cassette()
+    return cassette is not None and cassette.mode == "replay"
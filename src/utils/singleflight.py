@@ -0,0 +1,92 @@
+"""
+=========================================================
+🛬 SINGLEFLIGHT — COALESCE IDENTICAL IN-FLIGHT CALLS
+=========================================================
+When several sessions ask for the same thing at the same time
+(same prompt, same URL, same search query), only the first call
+does the work; the others wait for and share its result.
+"""
+import re
+import threading
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Process-wide request coalescer keyed by a normalized call signature."""
+
+    def __init__(self):
+        self.calls: Dict[str, _Call] = {}
+        self.lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                self.calls.pop(key, None)
+            if call.waiters:
+                print(f"🛬 Coalesced {call.waiters} duplicate call(s): {key[:80]}")
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self.lock:
+            return len(self.calls)
+
+
+# ---------- KEY NORMALIZATION ----------
+def normalize_query(query: str) -> str:
+    return re.sub(r'\s+', ' ', (query or '').strip().lower())
+
+
+def normalize_url(url: str) -> str:
+    """Lower-cases scheme/host, drops fragments and trailing slashes."""
+    parts = urlsplit((url or '').strip())
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+
+# Global instance
+_singleflight = SingleFlight()
+
+
+def coalesce(key: str, fn: Callable[[], Any]) -> Any:
+    """Runs `fn` unless an identical call (same key) is already in flight, then shares its result."""
+    return _singleflight.do(key, fn)
+
+
+def singleflight(namespace: str, key_fn: Callable[..., str]):
+    """Decorator form: `key_fn(*args, **kwargs)` builds the key inside `namespace`."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return coalesce(f"{namespace}:{key_fn(*args, **kwargs)}", lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,144 @@
+"""
+=========================================================
+🧭 SPAN TRACING — CHROME TRACE / PERFETTO EXPORT
+=========================================================
+`with span("name", key=value):` times a block. Spans are
+grouped by the current run id (the same thread-local context
+the LLM telemetry uses) and exported per run to
+output/traces/<run_id>.json, which opens in chrome://tracing
+or https://ui.perfetto.dev.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Optional
+
+TRACING_DISABLED = os.getenv("TRACING_DISABLED", "").lower() in ("1", "true", "yes")
+TRACE_DIR = os.getenv("TRACE_DIR", "output/traces")
+
+_events: Dict[str, List[dict]] = {}
+_events_lock = threading.Lock()
+
+
+def _current_run_id() -> Optional[str]:
+    from src.llm.telemetry import current_context
+    return current_context("run_id")
+
+
+def _json_safe(value):
+    return value if isinstance(value, (str, int, float, bool)) or value is None else str(value)
+
+
+@contextmanager
+def span(name: str, category: str = "app", **attributes):
+    """
+    Records a complete ('X') event for the block. Yields a dict that can be filled with
+    attributes known only at the end (e.g. token counts). No-op outside a run.
+    """
+    run_id = _current_run_id()
+    if TRACING_DISABLED or not run_id:
+        yield {}
+        return
+
+    attrs = dict(attributes)
+    started = time.time()
+    begin = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException as e:
+        attrs["error"] = str(e)[:300]
+        raise
+    finally:
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": int(started * 1_000_000),
+            "dur": int((time.perf_counter() - begin) * 1_000_000),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {key: _json_safe(value) for key, value in attrs.items()},
+        }
+        thread_name = threading.current_thread().name
+        with _events_lock:
+            events = _events.setdefault(run_id, [])
+            events.append(event)
+            events.append({"name": "thread_name", "ph": "M", "pid": event["pid"], "tid": event["tid"],
+                           "args": {"name": thread_name}})
+
+
+def traced(name: Optional[str] = None, category: str = "app"):
+    """Decorator form of `span`."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name or func.__qualname__, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_path(run_id: str) -> str:
+    return os.path.join(TRACE_DIR, f"{run_id}.json")
+
+
+def load_trace(run_id: str) -> dict:
+    path = trace_path(run_id)
+    if not os.path.exists(path):
+        return {"traceEvents": [], "displayTimeUnit": "ms"}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def flush_trace(run_id: str) -> Optional[str]:
+    """
+    Appends the run's buffered spans to its trace file and clears the buffer, so
+    later work on the same run (translation, TTS, PDF) can be added afterwards.
+    """
+    with _events_lock:
+        events = _events.pop(run_id, [])
+    if not events:
+        return None
+    try:
+        trace = load_trace(run_id)
+        seen_threads = {(e["pid"], e["tid"]) for e in trace["traceEvents"] if e.get("ph") == "M"}
+        for event in events:
+            if event["ph"] == "M":
+                if (event["pid"], event["tid"]) in seen_threads:
+                    continue
+                seen_threads.add((event["pid"], event["tid"]))
+            trace["traceEvents"].append(event)
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        with open(trace_path(run_id), "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        return trace_path(run_id)
+    except Exception as e:
+        print(f"⚠️ Trace export failed: {e}")
+        return None
+
+
+def list_traces() -> List[str]:
+    """Run ids that have a trace file, newest first."""
+    if not os.path.isdir(TRACE_DIR):
+        return []
+    files = [f for f in os.listdir(TRACE_DIR) if f.endswith(".json")]
+    files.sort(key=lambda f: os.path.getmtime(os.path.join(TRACE_DIR, f)), reverse=True)
+    return [f[:-5] for f in files]
+
+
+def summarize_trace(trace: dict) -> List[Dict]:
+    """Total/max wall time and count per span name, slowest first."""
+    groups: Dict[str, list] = {}
+    for event in trace.get("traceEvents", []):
+        if event.get("ph") == "X":
+            groups.setdefault(event["name"], []).append(event["dur"] / 1_000_000)
+    rows = [{
+        "span": name,
+        "count": len(durations),
+        "total_s": round(sum(durations), 2),
+        "max_s": round(max(durations), 2),
+    } for name, durations in groups.items()]
+    return sorted(rows, key=lambda r: r["total_s"], reverse=True)